@@ -1,21 +1,24 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 from datetime import datetime, timedelta
-import json
-import matplotlib.pyplot as plt
+import functools
 import locale
+import os
+import queue
 import threading
 import time
 
-# Se importan los módulos necesarios de ReportLab para generar el PDF.
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle, PageBreak
-from reportlab.lib.pagesizes import letter, landscape
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from reportlab.lib.units import cm
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import Paragraph, Table, TableStyle
-from reportlab.lib import colors
+import perfilado
+import exportar
+import importar
+import reportes
+from perfilado import timed
+from puntocontrol import Checkpoint
+from binario import BinaryFormatError
+from proyecto import Proyecto, ACTIVITIES_LIST, DEFECT_TYPES, day_period, week_period, parse_period, period_label
+from reloj import TickScheduler
+from tablero import Dashboard
+from tablas import VirtualTable, DefectIndex, LOG_COLUMNS, DEFECT_COLUMNS, DEFECT_FILTER_COLUMNS, log_row, defect_row
 
 # Intenta configurar la localización a español (esto puede fallar en algunos sistemas)
 try:
@@ -27,6 +30,15 @@ except locale.Error:
     except locale.Error:
         pass  # Si falla, usaremos nuestra función personalizada para formatear fechas
 
+# Tipos de archivo de proyecto: JSON (.txt), el formato binario compacto (.rtb) o SQLite (.db).
+PROJECT_FILETYPES = [("Text files", "*.txt"), ("Registro binario", "*.rtb"), ("Base de datos SQLite", "*.db")]
+
+# Opciones del selector de periodo de la tabla, las gráficas y el PDF de actividades.
+PERIOD_CHOICES = ["Todo el proyecto", "Hoy", "Esta semana", "Personalizado..."]
+
+# Segundos entre dos puntos de control de la actividad en curso (ver puntocontrol.py).
+CHECKPOINT_INTERVAL = 5
+
 class RegistroTiempo(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -43,9 +55,7 @@ class RegistroTiempo(tk.Tk):
         style.configure("Time.TLabel", font=("Serif", 24))
         style.configure("Elapsed.TLabel", font=("Serif", 48))
 
-        self.activities_list = ["Analizar", "Planificar", "Codificar", "Testear", 
-                                  "Evaluación del código", "Revisión del código", "Lanzamiento",
-                                  "Diagramar", "Reunión"]
+        self.activities_list = ACTIVITIES_LIST
 
         self.show_instructions()
 
@@ -55,28 +65,24 @@ class RegistroTiempo(tk.Tk):
 
 
         # Seleccionar o crear el archivo de datos (.txt)
-        self.filename = self.select_or_create_file()
-        self.data = self.load_data()
-        self.defects = self.data.get('defects', [])   # <-- Agrega esta línea aquí
-        self.activities = self.data.get('activities', {})
-        self.total_paused_minutes = self.data.get('total_paused_minutes', 0)
-        self.activity_logs = self.data.get('activity_logs', [])
-        self.project_name = self.data.get('project_name', None)
-        self.start_date = self.data.get('start_date', None)
+        # Si el archivo elegido está dañado, se pide otro (el dañado no se toca).
+        while True:
+            self.filename = self.select_or_create_file()
+            self.proyecto = Proyecto(self.filename, background=True)
+            if self.load_data(self.proyecto, self.filename):
+                break
+            self.proyecto.close()
 
         # Si no hay datos de proyecto (archivo nuevo), se solicitan los detalles.
-        if not self.project_name:
-            self.project_name, self.start_date = self.get_project_details()
-            self.data['project_name'] = self.project_name
-            self.data['start_date'] = self.start_date
-            self.save_data()
+        if not self.proyecto.project_name:
+            self.get_project_details()
 
         # -------------------------------
         # Creación de la interfaz con diseño mejorado
         # -------------------------------
 
         # Etiqueta del proyecto
-        self.project_label = ttk.Label(self, text=f"Proyecto: {self.project_name}", style="Header.TLabel", background="lightblue")
+        self.project_label = ttk.Label(self, text=f"Proyecto: {self.proyecto.project_name}", style="Header.TLabel", background="lightblue")
         self.project_label.pack(pady=10)
 
         # Frame para las etiquetas de tiempo
@@ -138,6 +144,19 @@ class RegistroTiempo(tk.Tk):
         self.new_project_button = ttk.Button(additional_buttons_frame, text="Nuevo Proyecto", command=self.change_project, width=20)
         self.new_project_button.grid(row=0, column=3, padx=5, pady=5)
 
+        # Selector del periodo que usan la tabla, las gráficas y el PDF de actividades.
+        period_frame = ttk.Frame(additional_buttons_frame)
+        period_frame.grid(row=1, column=0, columnspan=6, pady=5)
+        ttk.Label(period_frame, text="Periodo:").grid(row=0, column=0, padx=5)
+        self.period = None
+        self.period_box = ttk.Combobox(period_frame, state="readonly", width=20, values=PERIOD_CHOICES)
+        self.period_box.set(PERIOD_CHOICES[0])
+        self.period_box.bind("<<ComboboxSelected>>", self.select_period)
+        self.period_box.grid(row=0, column=1, padx=5)
+        self.period_label = ttk.Label(period_frame, text="")
+        self.period_label.grid(row=0, column=2, padx=5)
+        self.period_choice = PERIOD_CHOICES[0]
+
         # Marco para botones de defectos en una nueva línea
         defect_buttons_frame = ttk.Frame(self)
         defect_buttons_frame.pack(pady=10)
@@ -153,9 +172,29 @@ class RegistroTiempo(tk.Tk):
         # Botón para visualizar la tabla de defectos
         self.defects_table_button = ttk.Button(defect_buttons_frame, text="Tabla de Defectos", command=self.show_defects_table, width=20)
         self.defects_table_button.grid(row=0, column=2, padx=5, pady=5)
+
+        # Botón para exportar los registros o los defectos a CSV/JSONL
+        self.export_button = ttk.Button(additional_buttons_frame, text="Exportar Datos", command=self.export_data, width=20)
+        self.export_button.grid(row=0, column=4, padx=5, pady=5)
+
+        # Botón para importar registros o defectos desde CSV/JSONL
+        self.import_button = ttk.Button(additional_buttons_frame, text="Importar Datos", command=self.import_data, width=20)
+        self.import_button.grid(row=0, column=5, padx=5, pady=5)
+
+        # Botón para ver las métricas PSP del proyecto
+        self.metrics_button = ttk.Button(defect_buttons_frame, text="Métricas PSP", command=self.show_metrics, width=20)
+        self.metrics_button.grid(row=0, column=3, padx=5, pady=5)
+
+        # Panel de tiempos de las operaciones (solo con REGISTRO_PERFIL, ver perfilado.py).
+        if perfilado.ENABLED:
+            self.profile_button = ttk.Button(defect_buttons_frame, text="Perfil", command=self.show_profile, width=20)
+            self.profile_button.grid(row=0, column=4, padx=5, pady=5)
         
         # Variables para el cronómetro y control de actividad.
+        # Las duraciones se miden con time.monotonic(); start_time (datetime)
+        # solo se usa para mostrar la fecha y hora en el registro.
         self.start_time = None
+        self.start_monotonic = None
         self.pause_time = None
         self.total_paused_time = timedelta()
         self.current_activity = None
@@ -165,17 +204,61 @@ class RegistroTiempo(tk.Tk):
         self.activity_comments = ""
         self.notification_shown = False
 
-        self.update_current_time()
+        # Tablas de registros abiertas, que se actualizan al parar una actividad,
+        # y funciones que avisan a las tablas de defectos abiertas de un defecto nuevo o de un cambio de proyecto.
+        self.open_tables = []
+        self.open_defect_tables = []
+
+        # Tablero de estadísticas (ver tablero.py); None mientras está cerrado.
+        self.dashboard = None
+
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
-    def formatear_fecha(self, dt):
+        # Un solo reloj para todas las etiquetas de tiempo.
+        self.clock = TickScheduler(self)
+        self.timer_tokens = []
+        self.clock.subscribe(self.update_current_time)
+        # Errores del hilo que guarda el proyecto: se avisan en cuanto ocurren.
+        self.reported_write_error = None
+        self.clock.subscribe(self.check_write_error, background=True)
+
+        # Punto de control de la actividad en curso; si quedó una interrumpida, se ofrece recuperarla.
+        self.checkpoint = None
+        self.last_checkpoint = None
+        self.open_checkpoint()
+
+        # matplotlib y ReportLab se cargan en segundo plano una vez dibujada la ventana.
+        self.after(500, self.warm_up_reports)
+
+    def warm_up_reports(self):
+        threading.Thread(target=reportes.warm_up, daemon=True).start()
+
+    def on_close(self):
+        """Cierra el almacenamiento (y su diario, si lo hay) antes de salir."""
+        if self.timer_running:
+            # Se conserva el punto de control para ofrecer reanudarla al volver a abrir.
+            self.save_checkpoint()
+        self.checkpoint.close(remove=not self.timer_running)
+        self.close_project()
+        self.destroy()
+
+    def close_project(self):
         """
-        Formatea un objeto datetime a una cadena con el formato:
-        "Día, dd mes aaaa" usando arreglos con los nombres correctos en español.
+        Espera a que se escriban los cambios pendientes y cierra el
+        almacenamiento. Si la última escritura falló, se avisa.
         """
-        dias_semana = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
-        meses = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto",
-                 "septiembre", "octubre", "noviembre", "diciembre"]
-        return f"{dias_semana[dt.weekday()]}, {dt.day:02d} {meses[dt.month - 1]} {dt.year}"
+        try:
+            self.proyecto.close()
+        except OSError as exc:
+            messagebox.showerror("Error", f"No se pudieron guardar los últimos cambios en {self.filename}:\n{exc}")
+
+    def check_write_error(self, monotonic_now):
+        """Avisa (una vez por error) si el hilo que guarda el proyecto no pudo escribir."""
+        error = getattr(self.proyecto.storage, "error", None)
+        if error is not None and error is not self.reported_write_error:
+            self.reported_write_error = error
+            messagebox.showerror("Error", f"No se pudieron guardar los cambios en {self.filename}:\n{error}\n\n"
+                                          "Se volverá a intentar automáticamente.")
 
     def show_instructions(self):
         instructions = (
@@ -186,7 +269,7 @@ class RegistroTiempo(tk.Tk):
             "4.- Al iniciar la actividad, se solicitarán comentarios y el cronómetro comenzará a registrar el tiempo.\n"
             "5.- Si la actividad se pausa, el tiempo seguirá siendo registrado.\n"
             "6.- Al detener la actividad se guardará un registro con la fecha, horas, tiempos en pausa y sin pausa, actividad y comentarios.\n"
-            "7.- Después de parar la actividad se mostrarán las gráficas de los tiempos concentrados."
+            "7.- En \"Visualizar Gráficos\" se muestran los tiempos concentrados; las gráficas se actualizan mientras corre la actividad y al detenerla."
         )
         messagebox.showinfo("Instrucciones", instructions)
 
@@ -198,16 +281,16 @@ class RegistroTiempo(tk.Tk):
         respuesta = messagebox.askyesno("Seleccionar Proyecto", 
                                         "¿Desea abrir un proyecto existente?\n(Sí: Abrir | No: Crear uno nuevo)")
         if respuesta:
-            file_path = filedialog.askopenfilename(title="Seleccione un archivo de datos", filetypes=[("Text files", "*.txt")])
+            file_path = filedialog.askopenfilename(title="Seleccione un archivo de datos", filetypes=PROJECT_FILETYPES)
             if not file_path:
                 # Si se cancela la apertura, se procede a crear un nuevo archivo
                 file_path = filedialog.asksaveasfilename(title="Crear un nuevo archivo de datos", 
                                                          defaultextension=".txt", 
-                                                         filetypes=[("Text files", "*.txt")])
+                                                         filetypes=PROJECT_FILETYPES)
         else:
             file_path = filedialog.asksaveasfilename(title="Crear un nuevo archivo de datos", 
                                                      defaultextension=".txt", 
-                                                     filetypes=[("Text files", "*.txt")])
+                                                     filetypes=PROJECT_FILETYPES)
         return file_path
 
     def get_project_details(self):
@@ -242,15 +325,12 @@ class RegistroTiempo(tk.Tk):
                 break  # La fecha es válida, salimos del ciclo.
             except (ValueError, TypeError):
                 messagebox.showerror("Error", "La fecha ingresada no es válida. Asegúrese de usar el formato dd/mm/aaaa.")
-        
-        self.data['student_name'] = student_name
-        self.data['instructor_name'] = instructor_name
-        return project_name, start_date
 
-    def update_current_time(self):
+        self.proyecto.set_details(project_name, start_date, student_name, instructor_name)
+
+    def update_current_time(self, monotonic_now):
         now = datetime.now().strftime("%H:%M:%S")
         self.current_time_label.config(text=now)
-        self.after(1000, self.update_current_time)
 
     def choose_activity(self):
         activity_window = tk.Toplevel(self)
@@ -276,61 +356,171 @@ class RegistroTiempo(tk.Tk):
             # Solicitar comentarios al iniciar la actividad.
             self.activity_comments = simpledialog.askstring("Comentarios", "Ingrese comentarios para la actividad:")
             self.start_time = datetime.now()
+            self.start_monotonic = time.monotonic()
             self.total_paused_time = timedelta()
             self.paused_minutes = 0
-            self.paused_time_label.config(text="00:00:00")
-            self.start_button.config(state="disabled")
-            self.pause_button.config(state="normal", text="Pausar")
-            self.stop_button.config(state="normal")
-            self.defect_button.config(state="normal", style="DefectoActivo.TButton")
-            self.timer_running = True
             self.is_paused = False
-            self.notification_shown = False  # Reinicia la notificación
-            self.update_elapsed_time()
+            self.run_activity_timer()
+
+    def run_activity_timer(self):
+        """Habilita los controles y arranca los relojes de la actividad actual."""
+        self.start_button.config(state="disabled")
+        self.pause_button.config(state="normal", text="Reanudar" if self.is_paused else "Pausar")
+        self.stop_button.config(state="normal")
+        self.defect_button.config(state="normal", style="DefectoActivo.TButton")
+        self.timer_running = True
+        self.notification_shown = False  # Reinicia la notificación
+        self.save_checkpoint()
+        self.timer_tokens = [
+            self.clock.subscribe(self.update_elapsed_time),
+            self.clock.subscribe(self.update_paused_time),
+            # El aviso de los 60 minutos y el punto de control siguen aunque la ventana esté minimizada.
+            self.clock.subscribe(self.check_notification, background=True),
+            self.clock.subscribe(self.checkpoint_tick, background=True),
+        ]
+
+    # -------------------------------
+    # Punto de control de la actividad en curso
+    # -------------------------------
+
+    def checkpoint_state(self, monotonic_now):
+        """Estado de la actividad en curso para el punto de control."""
+        pause_elapsed = monotonic_now - self.pause_time if self.is_paused else 0.0
+        return {
+            'activity': self.current_activity,
+            'comments': self.activity_comments,
+            'start': self.start_time.timestamp(),
+            'saved_at': time.time(),
+            'elapsed': monotonic_now - self.start_monotonic,
+            'paused': self.total_paused_time.total_seconds(),
+            'pause_elapsed': pause_elapsed,
+            'is_paused': self.is_paused,
+        }
+
+    def save_checkpoint(self):
+        now = time.monotonic()
+        self.last_checkpoint = now
+        self.write_checkpoint(self.checkpoint_state(now))
+
+    def write_checkpoint(self, state):
+        """Escribe el punto de control (None: no hay actividad en curso)."""
+        try:
+            self.checkpoint.write(state)
+        except OSError:
+            # Es solo un respaldo: si no se puede escribir, la actividad sigue igual.
+            pass
+
+    def checkpoint_tick(self, monotonic_now):
+        if self.timer_running and monotonic_now - self.last_checkpoint >= CHECKPOINT_INTERVAL:
+            self.save_checkpoint()
+
+    def open_checkpoint(self):
+        """Abre el punto de control del proyecto y ofrece recuperar una actividad interrumpida."""
+        # Se escribe desde un hilo aparte: el fsync no detiene el reloj ni la ventana.
+        self.checkpoint = Checkpoint(self.filename, background=True)
+        state = self.checkpoint.read()
+        if state is None:
+            return
+        start = datetime.fromtimestamp(state['start'])
+        saved_at = datetime.fromtimestamp(state['saved_at'])
+        resume = messagebox.askyesno(
+            "Actividad interrumpida",
+            f"La actividad '{state['activity']}' iniciada el {start:%d/%m/%Y} a las {start:%H:%M:%S} "
+            f"no se paró; su último registro es de las {saved_at:%H:%M:%S}.\n"
+            "¿Desea reanudarla?\n(Sí: Reanudar | No: Pararla con la hora de su último registro)")
+        if resume:
+            self.resume_interrupted(state)
+        else:
+            self.close_interrupted(state)
+
+    def resume_interrupted(self, state):
+        """
+        Reanuda la actividad del punto de control. El tiempo que el programa
+        estuvo cerrado (y la pausa en curso, si la había) cuenta como pausa.
+        """
+        now = time.monotonic()
+        gap = max(0.0, time.time() - state['saved_at'])
+        interrupted = state['pause_elapsed'] + gap
+        self.current_activity = state['activity']
+        self.activity_comments = state['comments']
+        self.start_time = datetime.fromtimestamp(state['start'])
+        self.start_monotonic = now - (state['elapsed'] + gap)
+        self.total_paused_time = timedelta(seconds=state['paused'] + interrupted)
+        self.paused_minutes = int(interrupted // 60)
+        self.proyecto.add_paused_minutes(self.paused_minutes)
+        self.is_paused = state['is_paused']
+        self.pause_time = now
+        self.activity_name_label.config(text=f"Actividad Actual: {self.current_activity}", background="yellow")
+        self.run_activity_timer()
+
+    def close_interrupted(self, state):
+        """Guarda la actividad del punto de control terminándola en su último registro."""
+        paused = state['paused'] + state['pause_elapsed']
+        end = datetime.fromtimestamp(state['saved_at'])
+        if state['pause_elapsed'] >= 60:
+            self.proyecto.add_paused_minutes(int(state['pause_elapsed'] // 60))
+        self.proyecto.record_activity(state['activity'], datetime.fromtimestamp(state['start']), end,
+                                      int(paused // 60), int((state['elapsed'] - paused) // 60), state['comments'])
+        self.write_checkpoint(None)
+
+    def stop_timers(self):
+        for token in self.timer_tokens:
+            self.clock.unsubscribe(token)
+        self.timer_tokens = []
 
     def pause_activity(self):
         if not self.is_paused:
-            self.pause_time = datetime.now()
+            self.pause_time = time.monotonic()
             self.pause_button.config(text="Reanudar")
             self.is_paused = True
-            self.update_paused_time()
         else:
-            self.total_paused_time += datetime.now() - self.pause_time
-            paused_time_minutes = (datetime.now() - self.pause_time).seconds // 60
+            pause_duration = timedelta(seconds=time.monotonic() - self.pause_time)
+            self.total_paused_time += pause_duration
+            paused_time_minutes = int(pause_duration.total_seconds() // 60)
             self.paused_minutes += paused_time_minutes
-            self.total_paused_minutes += paused_time_minutes
-            self.save_data()
+            self.proyecto.add_paused_minutes(paused_time_minutes)
             self.pause_button.config(text="Pausar")
             self.is_paused = False
-            # Actualizamos la etiqueta para mostrar el tiempo acumulado en pausa
-            self.paused_time_label.config(text=self.format_timedelta(self.total_paused_time))
-            self.update_elapsed_time()
+        self.save_checkpoint()
+        # Actualizamos las etiquetas sin esperar al siguiente tick
+        now = time.monotonic()
+        self.update_elapsed_time(now)
+        self.update_paused_time(now)
+
+    def elapsed_time(self, monotonic_now):
+        """Tiempo efectivo de la actividad actual (sin pausas) como timedelta."""
+        elapsed = timedelta(seconds=monotonic_now - self.start_monotonic) - self.total_paused_time
+        if self.is_paused:
+            elapsed -= timedelta(seconds=monotonic_now - self.pause_time)
+        return elapsed
 
-    def update_elapsed_time(self):
+    def update_elapsed_time(self, monotonic_now):
         if self.timer_running and not self.is_paused:
-            elapsed_time = datetime.now() - self.start_time - self.total_paused_time
-            self.elapsed_time_label.config(text=str(elapsed_time).split(".")[0])
-            # Mostrar notificación si la actividad dura 60 minutos o más.
-            if elapsed_time >= timedelta(minutes=60) and not self.notification_shown:
-                self.notification_shown = True
-                self.show_notification()
-            self.after(1000, self.update_elapsed_time)
+            self.elapsed_time_label.config(text=self.format_timedelta(self.elapsed_time(monotonic_now)))
+            if self.dashboard is not None:
+                self.dashboard.set_live(self.live_activity(monotonic_now))
+
+    def check_notification(self, monotonic_now):
+        # Mostrar notificación si la actividad dura 60 minutos o más.
+        if self.timer_running and not self.notification_shown \
+                and self.elapsed_time(monotonic_now) >= timedelta(minutes=60):
+            self.notification_shown = True
+            self.show_notification()
 
     def show_notification(self):
         self.bell()
         messagebox.showinfo("Notificación", f"La actividad '{self.current_activity}' ha durado 60 minutos o más.")
         self.notification_shown = False
 
-    def update_paused_time(self):
+    def update_paused_time(self, monotonic_now):
         """
         Actualiza la etiqueta de tiempo en pausa mostrando el tiempo acumulado (más el actual si se está pausado)
         en formato hh:mm:ss.
         """
+        total_pause = self.total_paused_time
         if self.is_paused:
-            current_pause_duration = datetime.now() - self.pause_time
-            total_pause = self.total_paused_time + current_pause_duration
-            self.paused_time_label.config(text=self.format_timedelta(total_pause))
-            self.after(1000, self.update_paused_time)
+            total_pause += timedelta(seconds=monotonic_now - self.pause_time)
+        self.paused_time_label.config(text=self.format_timedelta(total_pause))
 
     def format_timedelta(self, td):
         """
@@ -342,26 +532,20 @@ class RegistroTiempo(tk.Tk):
         return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
 
     def stop_activity(self):
-        end_time = datetime.now()
-        active_duration = end_time - self.start_time - self.total_paused_time
+        now = time.monotonic()
+        if self.is_paused:
+            # Parar durante una pausa cierra la pausa en curso.
+            self.pause_activity()
+        end_time = self.start_time + timedelta(seconds=now - self.start_monotonic)
+        active_duration = self.elapsed_time(now)
         active_minutes = int(active_duration.total_seconds() // 60)
         paused_minutes = int(self.total_paused_time.total_seconds() // 60)
 
         if self.current_activity:
-            self.activities[self.current_activity] = self.activities.get(self.current_activity, 0) + active_minutes
-
-            log_entry = {
-                "fecha_inicio": self.formatear_fecha(self.start_time),
-                "hora_inicio": self.start_time.strftime("%H:%M:%S"),
-                "hora_fin": end_time.strftime("%H:%M:%S"),
-                "tiempo_en_pausa_min": paused_minutes,
-                "tiempo_no_pausado_min": active_minutes,
-                "actividad": self.current_activity,
-                "comentarios": self.activity_comments
-            }
-            self.activity_logs.append(log_entry)
-            self.data["activity_logs"] = self.activity_logs
-            self.save_data()
+            self.proyecto.record_activity(self.current_activity, self.start_time, end_time,
+                                          paused_minutes, active_minutes, self.activity_comments)
+            for table in self.open_tables:
+                table.rows_added()
 
             if active_minutes >= 60:
                 messagebox.showinfo("Notificación", f"La actividad '{self.current_activity}' ha durado 60 minutos o más.")
@@ -371,11 +555,14 @@ class RegistroTiempo(tk.Tk):
         self.pause_button.config(state="disabled", text="Pausar")
         self.stop_button.config(state="disabled")
         self.defect_button.config(state="disabled", style="TButton")
+        self.stop_timers()
         self.timer_running = False
+        self.write_checkpoint(None)
         self.elapsed_time_label.config(text="00:00:00")
         self.paused_time_label.config(text="00:00:00")
         self.activity_name_label.config(text="")
-        self.show_statistics()
+        # El tablero, si está abierto, solo cambia alturas y textos.
+        self.refresh_dashboard()
 
     def open_defect_form(self):
         # Crear ventana para registrar defecto
@@ -391,16 +578,15 @@ class RegistroTiempo(tk.Tk):
         instructor_frame = ttk.Frame(defect_window, padding="10 10")
         instructor_frame.pack(fill="x", padx=15, pady=10)
 
-        instructor_name = self.data.get('instructor_name', 'No especificado')
+        instructor_name = self.proyecto.data.get('instructor_name', 'No especificado')
         instructor_label = ttk.Label(instructor_frame, text=f"Instructor: {instructor_name}", font=("Helvetica", 11, "bold"))
         instructor_label.pack(side="top", anchor="w", padx=15, pady=(0, 5))
 
         def modify_instructor():
             new_name = simpledialog.askstring("Modificar Instructor", "Ingrese nuevo nombre del instructor:", parent=defect_window)
             if new_name:
-                self.data['instructor_name'] = new_name
+                self.proyecto.set_instructor(new_name)
                 instructor_label.config(text=f"Instructor: {new_name}")
-                self.save_data()
 
         modify_button = ttk.Button(instructor_frame, text="Modificar", command=modify_instructor)
         modify_button.pack(side="top", anchor="w", padx=15)
@@ -411,7 +597,7 @@ class RegistroTiempo(tk.Tk):
         current_date = datetime.now().strftime("%d/%m/%Y")
 
         # Número: se calcula en base a la cantidad de defectos guardados
-        defect_number = len(self.defects) + 1
+        defect_number = self.proyecto.next_defect_number()
 
         # Campo Fecha
         tk.Label(defect_window, text="Fecha:").pack(anchor="w", padx=10, pady=5)
@@ -430,8 +616,7 @@ class RegistroTiempo(tk.Tk):
 
         # Campo Tipo
         tk.Label(defect_window, text="Tipo:").pack(anchor="w", padx=10, pady=5)
-        tipos = [ "10.- Documentación", "20.- Sintáxis", "30.- Construcción, Empacar", "40.- Asignación", "50.- Interfaz", "60.- Chequeo", "70.- Datos", "80.- Función", "90.- Sistema", "100.- Ambiente" ] 
-        tipo_cb = ttk.Combobox(defect_window, values=tipos, state="readonly") 
+        tipo_cb = ttk.Combobox(defect_window, values=DEFECT_TYPES, state="readonly")
         tipo_cb.pack(fill="x", padx=10) 
         tipo_cb.current(0)
 
@@ -455,14 +640,13 @@ class RegistroTiempo(tk.Tk):
         tiempo_label = tk.Label(defect_window, text="00:00:00", font=("Helvetica", 12))
         tiempo_label.pack(fill="x", padx=10)
 
-        start_defect_time = datetime.now()
-        def update_defect_timer():
-            elapsed = datetime.now() - start_defect_time
-            tiempo_label.config(text=str(elapsed).split(".")[0])
-            if not getattr(defect_window, "timer_stopped", False):
-                defect_window.after(1000, update_defect_timer)
-        defect_window.timer_stopped = False
-        update_defect_timer()
+        start_defect_time = time.monotonic()
+        def update_defect_timer(monotonic_now):
+            elapsed = timedelta(seconds=monotonic_now - start_defect_time)
+            tiempo_label.config(text=self.format_timedelta(elapsed))
+        defect_timer = self.clock.subscribe(update_defect_timer)
+        defect_window.bind("<Destroy>",
+                           lambda event: event.widget is defect_window and self.clock.unsubscribe(defect_timer))
 
         # Campo Defecto arreglado (Si o No)
         tk.Label(defect_window, text="Defecto arreglado:").pack(anchor="w", padx=10, pady=5)
@@ -477,11 +661,9 @@ class RegistroTiempo(tk.Tk):
 
         # Función para guardar el defecto
         def save_defect():
-            defect_window.timer_stopped = True
-            elapsed_str = tiempo_label.cget("text")
-            h, m, s = map(int, elapsed_str.split(":"))
-            total_minutes = h * 60 + m
+            self.clock.unsubscribe(defect_timer)
             #tomamos solo la parte entera de minutos
+            total_minutes = int((time.monotonic() - start_defect_time) // 60)
             
             # Obtener solo el número del tipo seleccionado
             tipo_seleccionado = tipo_cb.get()  # Ej: "10.- Documentación"
@@ -497,9 +679,9 @@ class RegistroTiempo(tk.Tk):
                 "defecto_arreglado": arreglado_cb.get(),
                 "descripcion": descripcion_text.get("1.0", "end").strip()
             }
-            self.defects.append(defect_record)
-            self.data["defects"] = self.defects
-            self.save_data()
+            self.proyecto.record_defect(defect_record)
+            for defects_added in self.open_defect_tables:
+                defects_added()
             messagebox.showinfo("Defecto guardado", "El defecto ha sido guardado correctamente.")
             defect_window.destroy()
 
@@ -510,151 +692,76 @@ class RegistroTiempo(tk.Tk):
 
 
 
-    def load_data(self):
+    def select_period(self, event=None):
+        """Cambia el periodo según la opción elegida; "Personalizado..." pide las fechas."""
+        choice = self.period_box.get()
+        today = datetime.now()
+        if choice == "Hoy":
+            period = day_period(today)
+        elif choice == "Esta semana":
+            period = week_period(today)
+        elif choice == "Personalizado...":
+            desde = simpledialog.askstring("Periodo", "Desde (dd/mm/aaaa):", parent=self)
+            hasta = desde and simpledialog.askstring("Periodo", "Hasta (dd/mm/aaaa):", parent=self)
+            if not hasta:
+                self.period_box.set(self.period_choice)
+                return
+            try:
+                period = parse_period(desde, hasta)
+            except ValueError:
+                messagebox.showerror("Error", "Fechas inválidas. Use el formato dd/mm/aaaa.")
+                self.period_box.set(self.period_choice)
+                return
+        else:
+            period = None
+        self.period = period
+        self.period_choice = choice
+        self.period_label.config(text=period_label(*period) if period else "")
+        self.refresh_dashboard()
+
+    @timed()
+    def load_data(self, proyecto, filename):
+        """
+        Lee el proyecto con carga diferida: los registros y defectos se leen
+        cuando se abren la tabla o un PDF. Si el archivo está dañado se avisa
+        y devuelve False; el proyecto no se debe usar, para no guardar uno
+        vacío encima del archivo.
+        """
         try:
-            with open(self.filename, "r", encoding="utf-8") as file:
-                data = json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
-            data = {}
-        if 'activities' not in data:
-            data['activities'] = {}
-        if 'total_paused_minutes' not in data:
-            data['total_paused_minutes'] = 0
-        if 'activity_logs' not in data:
-            data['activity_logs'] = []
-        if 'student_name' not in data:
-            data['student_name'] = ''
-        if 'instructor_name' not in data:
-            data['instructor_name'] = ''
-        if 'defects' not in data:
-            data['defects'] = []
-        return data
-
-    def save_data(self):
-        with open(self.filename, "w", encoding="utf-8") as file:
-            data = {
-                'project_name': self.project_name,
-                'start_date': self.start_date,
-                'student_name': self.data.get('student_name', ''),
-                'instructor_name': self.data.get('instructor_name', ''),
-                'activities': self.activities,
-                'total_paused_minutes': self.total_paused_minutes,
-                'activity_logs': self.activity_logs,
-                'defects': self.defects
-            }
-            json.dump(data, file, indent=4, ensure_ascii=False)
-
+            proyecto.reload(lazy=True)
+        except BinaryFormatError as exc:
+            messagebox.showerror("Error", f"No se pudo leer el proyecto {filename}:\n{exc}\n\n"
+                                          "El archivo no se modificará. Elija otro proyecto.")
+            return False
+        return True
+
+    @timed()
     def show_statistics(self):
-        # Esta función muestra las gráficas en pantalla (para uso interactivo)
-        activities = [activity for activity in self.activities_list]
-        minutes = [self.activities.get(activity, 0) for activity in activities]
-        total_minutes = sum(minutes)
-        total_time_effective = f"{int(total_minutes)} minutos"
-        total_paused_time_str = f"{self.total_paused_minutes} minutos en pausa"
-
-        if total_minutes > 0:
-            percentages = [f"{(m / total_minutes) * 100:.2f}%" for m in minutes]
+        """Abre el tablero de estadísticas, o lo trae al frente y lo actualiza si ya está abierto."""
+        if self.dashboard is None:
+            self.dashboard = Dashboard(self)
+            self.dashboard.bind("<Destroy>", self.on_dashboard_destroyed)
         else:
-            percentages = ["0.00%" for _ in activities]
-
-        # Valores para la gráfica de pastel
-        effective_time = total_minutes
-        paused_time = self.total_paused_minutes
-
-        # Validación para la gráfica de pastel:
-        if effective_time + paused_time == 0:
-            messagebox.showwarning("Advertencia", "No se puede mostrar la gráfica de pastel debido a que no hay datos suficientes.")
-            # Mostrar solo la gráfica de barras:
-            fig, ax = plt.subplots(figsize=(7, 5))
-            bars = ax.bar(activities, minutes, color='blue')
-            ax.set_xlabel('Actividad')
-            ax.set_ylabel('Minutos')
-            ax.set_title(f'Tiempo empleado en actividades\nTiempo total efectivo: {total_time_effective}\n{total_paused_time_str}')
-            ax.set_xticklabels(activities, rotation=45)
-            for bar, m, percentage in zip(bars, minutes, percentages):
-                yval = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2, yval, f"{m} min\n{percentage}", ha='center', va='bottom', fontsize=10)
-            plt.tight_layout()
-            plt.show()
-            return
-
-        # Si hay datos suficientes, se muestran ambas gráficas (barras y pastel)
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 5))
-
-        # Gráfica de barras:
-        bars = ax1.bar(activities, minutes, color='blue')
-        ax1.set_xlabel('Actividad')
-        ax1.set_ylabel('Minutos')
-        ax1.set_title(f'Tiempo empleado en actividades\nTiempo total efectivo: {total_time_effective}\n{total_paused_time_str}')
-        ax1.set_xticklabels(activities, rotation=45)
-        for bar, m, percentage in zip(bars, minutes, percentages):
-            yval = bar.get_height()
-            ax1.text(bar.get_x() + bar.get_width()/2, yval, f"{m} min\n{percentage}", ha='center', va='bottom', fontsize=10)
-
-        # Gráfica de pastel:
-        def make_autopct(values):
-            def my_autopct(pct):
-                total = sum(values)
-                val = int(round(pct * total / 100.0))
-                return f'{pct:.1f}%\n({val} min)'
-            return my_autopct
-
-        ax2.pie(
-            [effective_time, paused_time],
-            labels=["Tiempo Efectivo", "Tiempo en Pausa"],
-            autopct=make_autopct([effective_time, paused_time]),
-            colors=['green', 'red'],
-            startangle=90
-        )
-        ax2.set_title("Comparación: Tiempo Efectivo vs en Pausa")
-        plt.tight_layout()
-        plt.show()
-
-    def generate_bar_chart_image(self, filename):
-        """Genera la imagen de la gráfica de barras y la guarda en 'filename'."""
-        activities = [activity for activity in self.activities_list]
-        minutes = [self.activities.get(activity, 0) for activity in activities]
-        total_minutes = sum(minutes)
-        total_time_effective = f"{int(total_minutes)} minutos"
-        total_paused_time_str = f"{self.total_paused_minutes} minutos en pausa"
-
-        plt.figure(figsize=(10, 5))
-        bars = plt.bar(activities, minutes, color='blue')
-        plt.xlabel('Actividad')
-        plt.ylabel('Minutos')
-        plt.title(f'Tiempo empleado en actividades\nTiempo total efectivo: {total_time_effective}\n{total_paused_time_str}')
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig(filename)
-        plt.close()
-
-    def generate_pie_chart_image(self, filename):
-        """Genera la imagen de la gráfica de pastel y la guarda en 'filename'."""
-        activities = [activity for activity in self.activities_list]
-        minutes = [self.activities.get(activity, 0) for activity in activities]
-        total_minutes = sum(minutes)
-        effective_time = total_minutes
-        paused_time = self.total_paused_minutes
-
-        def make_autopct(values):
-            def my_autopct(pct):
-                total = sum(values)
-                val = int(round(pct * total / 100.0))
-                return f'{pct:.1f}%\n({val} min)'
-            return my_autopct
-
-        plt.figure(figsize=(10, 5))
-        plt.pie(
-            [effective_time, paused_time],
-            labels=["Tiempo Efectivo", "Tiempo en Pausa"],
-            autopct=make_autopct([effective_time, paused_time]),
-            colors=['green', 'red'],
-            startangle=90
-        )
-        plt.title("Comparación: Tiempo Efectivo vs en Pausa")
-        plt.tight_layout()
-        plt.savefig(filename)
-        plt.close()
+            self.dashboard.lift()
+        self.refresh_dashboard()
+
+    def on_dashboard_destroyed(self, event):
+        if event.widget is self.dashboard:
+            self.dashboard = None
+
+    def refresh_dashboard(self):
+        """Pone al día el tablero abierto con el periodo seleccionado, sin redibujarlo desde cero."""
+        if self.dashboard is not None:
+            summary = self.proyecto.time_summary(*(self.period or (None, None)))
+            self.dashboard.show(summary, self.live_activity(time.monotonic()))
+
+    def live_activity(self, monotonic_now):
+        """(actividad, minutos efectivos) de la actividad en curso si cae en el periodo; si no, None."""
+        if not self.timer_running:
+            return None
+        if self.period is not None and not self.period[0] <= self.start_time < self.period[1]:
+            return None
+        return self.current_activity, self.elapsed_time(monotonic_now).total_seconds() / 60
 
     def produce_pdf(self):
         # Solicitar el nombre del archivo PDF
@@ -666,129 +773,11 @@ class RegistroTiempo(tk.Tk):
         if not pdf_file:
             return
 
-        # Configurar el documento en orientación horizontal con márgenes de 2 cm
-        doc = SimpleDocTemplate(
-            pdf_file,
-            pagesize=landscape(letter),
-            title="Reporte de Actividades",
-            author="Registro de Tiempo",
-            leftMargin=2 * cm,
-            rightMargin=2 * cm,
-            topMargin=2 * cm,
-            bottomMargin=2 * cm
-        )
-
-        styles = getSampleStyleSheet()
-        body_style = styles["BodyText"]
-
-        # Función para dibujar el encabezado en cada página
-        def header(canvas, doc):
-            canvas.saveState()
-            project_text = f"Proyecto: {self.project_name}"
-            fecha_inicio_dt = datetime.strptime(self.start_date, '%d/%m/%Y')
-            date_text = (
-                f"Fecha de inicio: {self.formatear_fecha(fecha_inicio_dt)}    "
-                f"Fecha de generación: {self.formatear_fecha(datetime.now())}"
-            )
-            canvas.setFont('Helvetica-Bold', 10)
-            width, height = doc.pagesize
-            canvas.drawCentredString(width / 2.0, height - 40, project_text)
-            canvas.drawCentredString(width / 2.0, height - 55, date_text)
-            canvas.restoreState()
-
-        Story = []
-
-        # --- Primera Página: Gráfica de Barras ---
-        bar_chart_file = "temp_bar_chart.png"
-        self.generate_bar_chart_image(bar_chart_file)
-        im_bar = Image(bar_chart_file)
-        available_width = doc.width
-        available_height = doc.height
-        aspect_ratio = im_bar.imageWidth / im_bar.imageHeight
-        if available_width / aspect_ratio <= available_height:
-            im_bar.drawWidth = available_width
-            im_bar.drawHeight = available_width / aspect_ratio
-        else:
-            im_bar.drawHeight = available_height
-            im_bar.drawWidth = available_height * aspect_ratio
-        im_bar.hAlign = 'CENTER'
-        Story.append(im_bar)
-
-        # Salto de página para la gráfica de pastel o mensaje
-        Story.append(PageBreak())
-
-        # --- Segunda Página: Gráfica de Pastel o Mensaje ---
-        # Se calculan los tiempos:
-        activities = [activity for activity in self.activities_list]
-        minutes = [self.activities.get(activity, 0) for activity in activities]
-        total_minutes = sum(minutes)
-        effective_time = total_minutes
-        paused_time = self.total_paused_minutes
-
-        if effective_time + paused_time == 0:
-            # No hay datos suficientes para la gráfica de pastel
-            Story.append(Paragraph("No se puede mostrar la gráfica de pastel debido a que no hay datos suficientes.", body_style))
-        else:
-            pie_chart_file = "temp_pie_chart.png"
-            self.generate_pie_chart_image(pie_chart_file)
-            im_pie = Image(pie_chart_file)
-            aspect_ratio = im_pie.imageWidth / im_pie.imageHeight
-            if available_width / aspect_ratio <= available_height:
-                im_pie.drawWidth = available_width
-                im_pie.drawHeight = available_width / aspect_ratio
-            else:
-                im_pie.drawHeight = available_height
-                im_pie.drawWidth = available_height * aspect_ratio
-            im_pie.hAlign = 'CENTER'
-            Story.append(im_pie)
-
-        # Salto de página para que la tabla inicie en la siguiente página
-        Story.append(PageBreak())
-
-        # --- Tercera Página en Adelante: Tabla de Registros ---
-        headers = ["Fecha", "Inicio", "Fin", "Interrupción (min)", "A Tiempo(min)", "Actividad", "Comentarios"]
-        table_data = [headers]
-        for log in self.activity_logs:
-            row = [
-                Paragraph(log.get("fecha_inicio", ""), body_style),
-                Paragraph(log.get("hora_inicio", ""), body_style),
-                Paragraph(log.get("hora_fin", ""), body_style),
-                Paragraph(str(log.get("tiempo_en_pausa_min", "")), body_style),
-                Paragraph(str(log.get("tiempo_no_pausado_min", "")), body_style),
-                Paragraph(log.get("actividad", ""), body_style),
-                Paragraph(log.get("comentarios", ""), body_style)
-            ]
-            table_data.append(row)
-
-        total_width = doc.width
-        num_columns = len(headers)
-        col_widths = [total_width / num_columns] * num_columns
-
-        t = Table(table_data, colWidths=col_widths, repeatRows=1)
-        t.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-        ]))
-        Story.append(t)
-
-        doc.build(Story, onFirstPage=header, onLaterPages=header)
-        messagebox.showinfo("PDF Generado", "El PDF ha sido generado exitosamente.")
+        self.run_export("Generando PDF", functools.partial(reportes.produce_pdf, period=self.period), pdf_file,
+                        "El PDF ha sido generado exitosamente.")
 
     def produce_defects_pdf(self):
-        """
-        Genera un PDF en orientación horizontal con:
-        - Tipos de defectos en la parte superior.
-        - Datos de estudiante, instructor, fecha de generación, proyecto.
-        - Tabla de defectos: Fecha, Número, Tipo, Encontrado, Removido, Tiempo de compostura, Defecto arreglado, Descripción
-        """
-        # 1. Pedir ruta donde guardar el PDF
+        """Pide la ruta del PDF de defectos y lo genera (ver reportes.produce_defects_pdf)."""
         pdf_file = filedialog.asksaveasfilename(
             title="Guardar PDF de Defectos",
             defaultextension=".pdf",
@@ -797,209 +786,403 @@ class RegistroTiempo(tk.Tk):
         if not pdf_file:
             return  # Si el usuario cancela, no hace nada
 
-        # 2. Configurar el documento en orientación horizontal (landscape)
-        doc = SimpleDocTemplate(
-            pdf_file,
-            pagesize=landscape(letter),
-            title="Reporte de Defectos",
-            author="Registro de Tiempo",
-            leftMargin=2 * cm,
-            rightMargin=2 * cm,
-            topMargin=2 * cm,
-            bottomMargin=2 * cm
-        )
+        self.run_export("Generando PDF de defectos", reportes.produce_defects_pdf, pdf_file,
+                        "El PDF de defectos ha sido generado exitosamente.")
 
-        styles = getSampleStyleSheet()
-        style_normal = styles["Normal"]
-        style_title = styles["Title"]
-        style_heading = styles["Heading2"]
-
-        # 3. Función para dibujar el encabezado en cada página
-        def header(canvas, doc):
-            canvas.saveState()
-            width, height = doc.pagesize
-
-            # Encabezado principal
-            text_encabezado = f"Reporte de Defectos - Proyecto: {self.project_name}"
-            canvas.setFont('Helvetica-Bold', 12)
-            canvas.drawCentredString(width / 2.0, height - 30, text_encabezado)
-
-            # Fecha de generación
-            fecha_hoy = datetime.now().strftime("%d/%m/%Y")
-            text_fecha = f"Fecha de generación: {fecha_hoy}"
-            canvas.setFont('Helvetica', 10)
-            canvas.drawCentredString(width / 2.0, height - 45, text_fecha)
-
-            canvas.restoreState()
-
-        Story = []
-
-        # 4. Agregar datos del alumno, instructor, fecha inicio y tipos de defectos en la parte superior
-        #   - Estudiante, Instructor, Fecha de inicio, etc. están en self.data (o en variables)
-        estudiante = self.data.get('student_name', 'No especificado')
-        instructor = self.data.get('instructor_name', 'No especificado')
-        fecha_inicio = self.data.get('start_date', 'No especificada')
-        #   - O si prefieres usar datetime.strptime(fecha_inicio, '%d/%m/%Y') para formatear.
-
-        # Título del PDF
-        Story.append(Paragraph("Formato del Registro de Defectos", style_heading))
-        Story.append(Spacer(1, 12))
-
-        # Datos de alumno, instructor, fecha, proyecto
-        info_text = (
-            f"<b>Estudiante:</b> {estudiante} &nbsp;&nbsp;&nbsp;"
-            f"<b>Instructor:</b> {instructor} &nbsp;&nbsp;&nbsp;"
-            f"<b>Fecha Inicio:</b> {fecha_inicio} &nbsp;&nbsp;&nbsp;"
-            f"<b>Proyecto:</b> {self.project_name}"
-        )
-        Story.append(Paragraph(info_text, style_normal))
-        Story.append(Spacer(1, 12))
-
-        # Lista de tipos de defectos (sección superior)
-        tipos_defectos_text = (
-            "Tipos de Defectos:<br/>"
-            "10 Documentación &nbsp;&nbsp; 20 Sintáxis &nbsp;&nbsp; 30 Construcción, Empacar &nbsp;&nbsp; 40 Asignación<br/>"
-            "50 Interfaz &nbsp;&nbsp; 60 Chequeo &nbsp;&nbsp; 70 Datos &nbsp;&nbsp; 80 Función &nbsp;&nbsp; 90 Sistema &nbsp;&nbsp; 100 Ambiente"
-        )
-        Story.append(Paragraph(tipos_defectos_text, style_normal))
-        Story.append(Spacer(1, 12))
-
-        # 5. Construir la tabla de defectos
-        #    Encabezados
-        headers = [
-            "Fecha",
-            "Número",
-            "Tipo",
-            "Encontrado",
-            "Removido",
-            "T. de compostura",
-            "Defecto arreglado",
-            "Descripción"
-        ]
-        table_data = [headers]
-
-        #    Cargar los defectos de self.defects
-        for defect in self.defects:
-            row = [
-                Paragraph(defect.get("fecha", ""), style_normal),
-                Paragraph(defect.get("numero", ""), style_normal),
-                Paragraph(str(defect.get("tipo", "")), style_normal),
-                Paragraph(defect.get("encontrado", ""), style_normal),
-                Paragraph(defect.get("removido", ""), style_normal),
-                Paragraph(str(defect.get("tiempo_compostura", "")), style_normal),
-                Paragraph(defect.get("defecto_arreglado", ""), style_normal),
-                Paragraph(defect.get("descripcion", ""), style_normal)
-            ]
-            table_data.append(row)
-
-        # 6. Crear la tabla con reportlab
-        #    Ajustar anchos de columna si lo deseas
-        defect_table = Table(table_data, repeatRows=1)
-
-        defect_table = Table(table_data,  repeatRows=1)
-        defect_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ]))
-
-        Story.append(defect_table)
-
-        # 7. Generar el documento
-        doc.build(Story, onFirstPage=header, onLaterPages=header)
-
-        messagebox.showinfo("PDF Generado", "El PDF de defectos ha sido generado exitosamente.")
+    def run_export(self, title, produce, pdf_file, done_message,
+                   done_title="PDF Generado", error_message="No se pudo generar el PDF"):
+        """
+        Genera un PDF en un hilo aparte sobre una copia de los datos, mostrando
+        el avance y un botón para cancelar. El hilo solo deja mensajes en una
+        cola; la ventana los revisa con after(), así mainloop nunca se bloquea.
+        """
+        snapshot = self.proyecto.snapshot()
+        events = queue.Queue()
+        cancel = threading.Event()
+
+        progress_window = tk.Toplevel(self)
+        progress_window.title(title)
+        progress_window.geometry("350x130")
+        progress_window.transient(self)
+        status_label = ttk.Label(progress_window, text="Preparando...")
+        status_label.pack(pady=10)
+        progress_bar = ttk.Progressbar(progress_window, mode="indeterminate", length=300)
+        progress_bar.pack(padx=10)
+        progress_bar.start(15)
+        cancel_button = ttk.Button(progress_window, text="Cancelar", command=cancel.set)
+        cancel_button.pack(pady=10)
+        progress_window.protocol("WM_DELETE_WINDOW", cancel.set)
+
+        def progress(done, total, unit):
+            if cancel.is_set():
+                raise reportes.ExportCancelled()
+            events.put(("progress", done, total, unit))
+
+        # Se genera en un temporal (con la misma extensión) que reemplaza al
+        # destino solo si termina bien: cancelar no borra un archivo anterior.
+        directory, name = os.path.split(pdf_file)
+        temp_file = os.path.join(directory, ".tmp-" + name)
+
+        def work():
+            try:
+                produce(snapshot, temp_file, progress=progress)
+                os.replace(temp_file, pdf_file)
+                events.put(("done",))
+            except reportes.ExportCancelled:
+                events.put(("cancelled",))
+            except Exception as exc:
+                events.put(("error", str(exc)))
+            finally:
+                snapshot.close()
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+
+        def poll():
+            try:
+                while True:
+                    event = events.get_nowait()
+                    if event[0] == "progress":
+                        _, done, total, unit = event
+                        if total:
+                            progress_bar.stop()
+                            progress_bar.config(mode="determinate", maximum=total, value=done)
+                            status_label.config(text=f"{done} de {total} {unit}")
+                        else:
+                            status_label.config(text=f"{done} {unit}")
+                        continue
+                    progress_window.destroy()
+                    if event[0] == "done":
+                        messagebox.showinfo(done_title, done_message)
+                    elif event[0] == "error":
+                        messagebox.showerror("Error", f"{error_message}:\n{event[1]}")
+                    return
+            except queue.Empty:
+                pass
+            if cancel.is_set():
+                status_label.config(text="Cancelando...")
+                cancel_button.config(state="disabled")
+            progress_window.after(100, poll)
+
+        threading.Thread(target=work, daemon=True).start()
+        poll()
+
+    def export_data(self):
+        """
+        Exporta los registros o los defectos a CSV o JSONL (ver exportar.py),
+        con las columnas elegidas y, si hay uno seleccionado, solo el periodo.
+        """
+        export_window = tk.Toplevel(self)
+        export_window.title("Exportar Datos")
+        export_window.geometry("360x420")
+        export_window.transient(self)
+
+        ttk.Label(export_window, text="Datos:").pack(anchor="w", padx=10, pady=(10, 0))
+        kind_box = ttk.Combobox(export_window, state="readonly", values=list(exportar.KINDS))
+        kind_box.set("registros")
+        kind_box.pack(fill="x", padx=10)
+
+        ttk.Label(export_window, text="Columnas:").pack(anchor="w", padx=10, pady=(10, 0))
+        columns_list = tk.Listbox(export_window, selectmode="multiple", exportselection=False, height=10)
+        columns_list.pack(fill="both", expand=True, padx=10)
+
+        def fill_columns(event=None):
+            columns_list.delete(0, "end")
+            for column in exportar.KINDS[kind_box.get()][1]:
+                columns_list.insert("end", column)
+            columns_list.select_set(0, "end")
+        kind_box.bind("<<ComboboxSelected>>", fill_columns)
+        fill_columns()
+
+        only_period = tk.BooleanVar(value=self.period is not None)
+        period_text = f"Solo el periodo ({period_label(*self.period)})" if self.period else "Solo el periodo (no hay uno seleccionado)"
+        ttk.Checkbutton(export_window, text=period_text, variable=only_period,
+                        state="normal" if self.period else "disabled").pack(anchor="w", padx=10, pady=10)
+
+        def start_export():
+            columns = [columns_list.get(i) for i in columns_list.curselection()]
+            if not columns:
+                messagebox.showerror("Error", "Seleccione al menos una columna.", parent=export_window)
+                return
+            path = filedialog.asksaveasfilename(
+                title="Exportar a", defaultextension=".csv", parent=export_window,
+                filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"),
+                           ("CSV comprimido", "*.csv.gz"), ("JSON Lines comprimido", "*.jsonl.gz")])
+            if not path:
+                return
+            try:
+                exportar.output_format(path)
+            except ValueError as exc:
+                messagebox.showerror("Error", str(exc), parent=export_window)
+                return
+            start, end = self.period if only_period.get() and self.period else (None, None)
+            kind = kind_box.get()
+            export_window.destroy()
+            self.run_export("Exportando datos",
+                            functools.partial(exportar.export, kind=kind, columns=columns, start=start, end=end),
+                            path, f"Se exportaron los {kind} a {path}.",
+                            done_title="Datos Exportados", error_message="No se pudieron exportar los datos")
 
+        ttk.Button(export_window, text="Exportar", command=start_export).pack(pady=10)
 
+    def import_data(self):
+        """
+        Importa registros o defectos de un CSV o JSONL (ver importar.py). Las
+        filas inválidas no se importan; se informa cuántas fueron y se ofrece
+        guardarlas con su motivo.
+        """
+        import_window = tk.Toplevel(self)
+        import_window.title("Importar Datos")
+        import_window.geometry("300x130")
+        import_window.transient(self)
+
+        ttk.Label(import_window, text="Datos:").pack(anchor="w", padx=10, pady=(10, 0))
+        kind_box = ttk.Combobox(import_window, state="readonly", values=list(importar.KINDS))
+        kind_box.set("registros")
+        kind_box.pack(fill="x", padx=10)
+
+        def start_import():
+            path = filedialog.askopenfilename(
+                title="Importar desde", parent=import_window,
+                filetypes=[("CSV o JSON Lines", "*.csv *.jsonl *.csv.gz *.jsonl.gz"), ("Todos", "*.*")])
+            if not path:
+                return
+            kind = kind_box.get()
+            import_window.destroy()
+            self.config(cursor="watch")
+            self.update_idletasks()
+            try:
+                result = importar.import_file(self.proyecto, path, kind, activities=self.activities_list)
+            except (OSError, ValueError) as exc:
+                messagebox.showerror("Error", f"No se pudieron importar los datos:\n{exc}")
+                return
+            finally:
+                self.config(cursor="")
+            if result['imported']:
+                if kind == "registros":
+                    for table in self.open_tables:
+                        table.rows_added()
+                    self.refresh_dashboard()
+                else:
+                    for defects_added in self.open_defect_tables:
+                        defects_added()
+            rejected = result['rejected']
+            message = f"Se importaron {result['imported']} de {result['read']} filas."
+            if not rejected:
+                messagebox.showinfo("Datos Importados", message)
+                return
+            first = "\n".join(f"Línea {line}: {reason}" for line, reason, _ in rejected[:5])
+            if messagebox.askyesno("Datos Importados",
+                                   f"{message}\n{len(rejected)} filas rechazadas, por ejemplo:\n{first}\n\n"
+                                   "¿Desea guardar las filas rechazadas en un CSV?"):
+                report = filedialog.asksaveasfilename(title="Guardar filas rechazadas", defaultextension=".csv",
+                                                      filetypes=[("CSV", "*.csv")])
+                if report:
+                    importar.write_rejected(report, rejected)
+
+        ttk.Button(import_window, text="Elegir archivo...", command=start_import).pack(pady=10)
+
+    @timed()
     def show_table(self):
-        """Abre una nueva ventana que muestra los registros en una tabla."""
+        """
+        Abre una nueva ventana que muestra los registros en una tabla.
+        Solo se crean las filas visibles, y la tabla recibe los registros nuevos
+        mientras la ventana siga abierta. Si hay un periodo seleccionado, solo
+        se muestran los registros que empiezan en él.
+        """
         table_window = tk.Toplevel(self)
         table_window.title("Registro de Actividades")
         table_window.geometry("1000x400")
 
-        # Definición de columnas para el Treeview
-        columns = ("fecha", "inicio", "fin", "interrupcion", "tiempo", "actividad", "comentarios")
-        tree = ttk.Treeview(table_window, columns=columns, show="headings")
-
-        # Configuración de los encabezados de las columnas
-        tree.heading("fecha", text="Fecha")
-        tree.heading("inicio", text="Inicio")
-        tree.heading("fin", text="Fin")
-        tree.heading("interrupcion", text="Interrupción (min)")
-        tree.heading("tiempo", text="A Tiempo (min)")
-        tree.heading("actividad", text="Actividad")
-        tree.heading("comentarios", text="Comentarios")
-
-        # Opcional: definir el ancho y la alineación de las columnas
-        tree.column("fecha", width=100, anchor="center")
-        tree.column("inicio", width=100, anchor="center")
-        tree.column("fin", width=100, anchor="center")
-        tree.column("interrupcion", width=120, anchor="center")
-        tree.column("tiempo", width=120, anchor="center")
-        tree.column("actividad", width=120, anchor="center")
-        tree.column("comentarios", width=300, anchor="center")
-
-        # Insertar los datos de cada registro en el Treeview
-        for log in self.activity_logs:
-            tree.insert("", "end", values=(
-                log.get("fecha_inicio", ""),
-                log.get("hora_inicio", ""),
-                log.get("hora_fin", ""),
-                log.get("tiempo_en_pausa_min", ""),
-                log.get("tiempo_no_pausado_min", ""),
-                log.get("actividad", ""),
-                log.get("comentarios", "")
-            ))
-
-        tree.pack(fill="both", expand=True)
-
-        # Agregar una barra de desplazamiento vertical
-        scrollbar = ttk.Scrollbar(table_window, orient="vertical", command=tree.yview)
-        tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side="right", fill="y")
+        if self.period is None:
+            row_count = lambda: len(self.proyecto.activity_logs)
+            row_values = lambda i: log_row(self.proyecto.activity_logs[i])
+        else:
+            # Solo los registros del periodo, buscados en el índice por fecha.
+            start, end = self.period
+            table_window.title(f"Registro de Actividades - {period_label(start, end)}")
+            view = {'rows': [], 'logs': None, 'size': None}
+
+            def row_count():
+                # Las posiciones del periodo se buscan de nuevo solo si los
+                # registros cambiaron (otro proyecto o registros nuevos).
+                logs = self.proyecto.activity_logs
+                if view['logs'] is not logs or view['size'] != len(logs):
+                    view['rows'] = self.proyecto.logs_in_period(start, end)
+                    view['logs'], view['size'] = logs, len(logs)
+                return len(view['rows'])
+
+            row_values = lambda i: log_row(self.proyecto.activity_logs[view['rows'][i]])
+
+        table = VirtualTable(table_window, LOG_COLUMNS, row_count=row_count, row_values=row_values)
+        table.pack(fill="both", expand=True)
 
+        self.open_tables.append(table)
+        table_window.bind("<Destroy>", lambda event: event.widget is table_window and self.open_tables.remove(table))
+
+    @timed()
     def show_defects_table(self):
-        """Abre una nueva ventana que muestra los defectos en una tabla."""
+        """
+        Abre una nueva ventana que muestra los defectos en una tabla.
+        Los encabezados ordenan la tabla y los filtros de la parte superior
+        usan los índices de DefectIndex en lugar de recorrer todos los defectos.
+        """
         table_window = tk.Toplevel(self)
         table_window.title("Registro de Defectos")
         table_window.geometry("1400x400")
 
-        columns = ("fecha", "numero", "tipo", "encontrado", "removido", "tiempo", "arreglado", "descripcion")
-        tree = ttk.Treeview(table_window, columns=columns, show="headings")
-
-        tree.heading("fecha", text="Fecha")
-        tree.heading("numero", text="Número")
-        tree.heading("tipo", text="Tipo")
-        tree.heading("encontrado", text="Encontrado")
-        tree.heading("removido", text="Removido")
-        tree.heading("tiempo", text="Tiempo de compostura (min)")
-        tree.heading("arreglado", text="Arreglado")
-        tree.heading("descripcion", text="Descripción")
-
-        for defect in getattr(self, 'defects', []):
-            tree.insert("", "end", values=(
-                defect.get("fecha", ""),
-                defect.get("numero", ""),
-                defect.get("tipo", ""),
-                defect.get("encontrado", ""),
-                defect.get("removido", ""),
-                defect.get("tiempo_compostura", ""),
-                defect.get("defecto_arreglado", ""),
-                defect.get("descripcion", "")
-            ))
-
-        tree.pack(fill="both", expand=True)
-        scrollbar = ttk.Scrollbar(table_window, orient="vertical", command=tree.yview)
-        tree.configure(yscroll=scrollbar.set)
-        scrollbar.pack(side="right", fill="y")
-        h_scrollbar = ttk.Scrollbar(table_window, orient="horizontal", command=tree.xview) 
-        tree.configure(xscrollcommand=h_scrollbar.set) 
-        h_scrollbar.pack(side="bottom", fill="x")
+        view = {'index': DefectIndex(self.proyecto.defects), 'rows': [], 'sort': None, 'descending': False}
+        any_value = "(Todos)"
+
+        # Controles de filtro: uno por columna indexada.
+        filter_frame = ttk.Frame(table_window, padding="5 5")
+        filter_frame.pack(fill="x")
+        headings = {column_id: heading for column_id, heading, _ in DEFECT_COLUMNS}
+        filter_boxes = {}
+        for column, column_id in enumerate(DEFECT_FILTER_COLUMNS):
+            ttk.Label(filter_frame, text=f"{headings[column_id]}:").grid(row=0, column=column * 2, padx=(10, 2))
+            box = ttk.Combobox(filter_frame, state="readonly", width=18)
+            box.grid(row=0, column=column * 2 + 1)
+            box.bind("<<ComboboxSelected>>", lambda event: apply_view())
+            filter_boxes[column_id] = box
+
+        table = VirtualTable(table_window, DEFECT_COLUMNS,
+                             row_count=lambda: len(view['rows']),
+                             row_values=lambda i: defect_row(self.proyecto.defects[view['rows'][i]]),
+                             anchor="w", horizontal=True)
+        table.pack(fill="both", expand=True)
+
+        def refresh_filter_values():
+            for column_id, box in filter_boxes.items():
+                values = view['index'].values(column_id)
+                box.config(values=[any_value] + values)
+                if box.get() not in values:
+                    box.set(any_value)
+
+        def apply_view():
+            filters = {column_id: box.get() for column_id, box in filter_boxes.items() if box.get() != any_value}
+            view['rows'] = view['index'].query(filters, view['sort'], view['descending'])
+            for column_id, heading, _ in DEFECT_COLUMNS:
+                arrow = ""
+                if column_id == view['sort']:
+                    arrow = " ▼" if view['descending'] else " ▲"
+                table.tree.heading(column_id, text=heading + arrow)
+            table.first = 0
+            table.render()
+
+        def sort_by(column_id):
+            if view['sort'] == column_id:
+                view['descending'] = not view['descending']
+            else:
+                view['sort'], view['descending'] = column_id, False
+            apply_view()
+
+        def defects_added():
+            # Si se cambió de proyecto (o se recargó), la lista es otra: se reconstruye el índice.
+            if view['index'].defects is self.proyecto.defects:
+                view['index'].catch_up()
+            else:
+                view['index'] = DefectIndex(self.proyecto.defects)
+            refresh_filter_values()
+            apply_view()
+
+        def clear_filters():
+            for box in filter_boxes.values():
+                box.set(any_value)
+            apply_view()
+
+        for column_id, _, _ in DEFECT_COLUMNS:
+            table.tree.heading(column_id, command=lambda c=column_id: sort_by(c))
+        ttk.Button(filter_frame, text="Limpiar filtros", command=clear_filters).grid(
+            row=0, column=len(DEFECT_FILTER_COLUMNS) * 2, padx=10)
+
+        refresh_filter_values()
+        apply_view()
+
+        self.open_defect_tables.append(defects_added)
+        table_window.bind("<Destroy>",
+                          lambda event: event.widget is table_window and self.open_defect_tables.remove(defects_added))
+
+    @timed()
+    def show_metrics(self):
+        """
+        Ventana con las métricas PSP del proyecto (ver metricas.py): resumen,
+        tiempo y defectos por fase, y tiempos de compostura por tipo.
+        """
+        import metricas
+
+        metrics_window = tk.Toplevel(self)
+        metrics_window.title("Métricas PSP")
+        metrics_window.geometry("1100x750")
+
+        summary_frame = ttk.Frame(metrics_window, padding="10 10")
+        summary_frame.pack(fill="x")
+
+        def make_tree(title, headers, height):
+            ttk.Label(metrics_window, text=title, style="Title.TLabel").pack(anchor="w", padx=10)
+            tree = ttk.Treeview(metrics_window, columns=[str(i) for i in range(len(headers))],
+                                show="headings", height=height)
+            for i, header in enumerate(headers):
+                tree.heading(str(i), text=header)
+                tree.column(str(i), width=130, anchor="w" if i == 0 else "e")
+            tree.pack(fill="x", padx=10, pady=(0, 10))
+            return tree
+
+        phase_tree = make_tree("Tiempo y defectos por fase", metricas.PHASE_HEADERS, len(ACTIVITIES_LIST))
+        type_tree = make_tree("Tiempo de compostura por tipo de defecto", metricas.FIX_TYPE_HEADERS, len(DEFECT_TYPES))
+        histogram_tree = make_tree("Distribución del tiempo de compostura", metricas.FIX_HISTOGRAM_HEADERS,
+                                   len(metricas.FIX_TIME_LABELS))
+
+        def refresh():
+            metrics = metricas.compute(self.proyecto)
+            for child in summary_frame.winfo_children():
+                child.destroy()
+            for row, (label, value) in enumerate(metricas.summary_lines(metrics)):
+                ttk.Label(summary_frame, text=f"{label}:", font=("Helvetica", 11, "bold")).grid(
+                    row=row, column=0, sticky="w", padx=5)
+                ttk.Label(summary_frame, text=value, font=("Helvetica", 11)).grid(row=row, column=1, sticky="w", padx=5)
+            for tree, rows in ((phase_tree, metricas.phase_rows(metrics)),
+                               (type_tree, metricas.fix_type_rows(metrics)),
+                               (histogram_tree, metricas.fix_histogram_rows(metrics))):
+                tree.delete(*tree.get_children())
+                for values in rows:
+                    tree.insert("", "end", values=values)
+
+        ttk.Button(metrics_window, text="Actualizar", command=refresh).pack(pady=5)
+        refresh()
+
+    def show_profile(self):
+        """Ventana con las llamadas y los percentiles de tiempo de cada operación medida."""
+        profile_window = tk.Toplevel(self)
+        profile_window.title("Perfil de tiempos")
+        profile_window.geometry("900x350")
+
+        columns = [("operation", "Operación", 260), ("count", "Llamadas", 80), ("mean", "Media (ms)", 90),
+                   ("p50", "p50 (ms)", 90), ("p90", "p90 (ms)", 90), ("p99", "p99 (ms)", 90), ("max", "Máx. (ms)", 90)]
+        tree = ttk.Treeview(profile_window, columns=[c[0] for c in columns], show="headings")
+        for column_id, title, width in columns:
+            tree.heading(column_id, text=title)
+            tree.column(column_id, width=width, anchor="w" if column_id == "operation" else "e")
+        tree.pack(fill="both", expand=True, padx=10, pady=10)
+
+        def refresh():
+            tree.delete(*tree.get_children())
+            for name, entry in perfilado.summary().items():
+                tree.insert("", "end", values=[name, entry['count']] + [
+                    f"{entry[key] * 1000:.1f}" for key in ("mean", "p50", "p90", "p99", "max")])
+
+        def save():
+            try:
+                filename = perfilado.dump()
+            except OSError as exc:
+                messagebox.showerror("Error", f"No se pudo guardar el perfil:\n{exc}", parent=profile_window)
+                return
+            messagebox.showinfo("Perfil", f"Se guardó el perfil en {os.path.abspath(filename)}", parent=profile_window)
+
+        buttons = ttk.Frame(profile_window)
+        buttons.pack(pady=5)
+        ttk.Button(buttons, text="Actualizar", command=refresh).grid(row=0, column=0, padx=5)
+        ttk.Button(buttons, text="Guardar JSON", command=save).grid(row=0, column=1, padx=5)
+        refresh()
 
     def change_project(self):
         """Permite al usuario cambiar de proyecto (abrir uno existente o crear uno nuevo)."""
@@ -1011,31 +1194,36 @@ class RegistroTiempo(tk.Tk):
         respuesta = messagebox.askyesno("Cambiar Proyecto", 
                                         "¿Desea abrir un proyecto existente?\n(Sí: Abrir | No: Crear uno nuevo)")
         if respuesta:
-            new_file = filedialog.askopenfilename(title="Seleccione un archivo de datos", filetypes=[("Text files", "*.txt")])
+            new_file = filedialog.askopenfilename(title="Seleccione un archivo de datos", filetypes=PROJECT_FILETYPES)
             if not new_file:
                 return
         else:
             new_file = filedialog.asksaveasfilename(title="Crear un nuevo archivo de datos", 
                                                      defaultextension=".txt", 
-                                                     filetypes=[("Text files", "*.txt")])
+                                                     filetypes=PROJECT_FILETYPES)
             if not new_file:
                 return
 
-        # Actualizar la ruta del archivo y recargar los datos.
+        # Se lee el proyecto nuevo antes de cerrar el actual: si está dañado, se sigue con el actual.
+        proyecto = Proyecto(new_file, background=True)
+        if not self.load_data(proyecto, new_file):
+            proyecto.close()
+            return
+        self.checkpoint.close(remove=True)
+        self.close_project()
         self.filename = new_file
-        self.data = self.load_data()
-        self.activities = self.data.get('activities', {})
-        self.total_paused_minutes = self.data.get('total_paused_minutes', 0)
-        self.activity_logs = self.data.get('activity_logs', [])
-        self.project_name = self.data.get('project_name', None)
-        self.start_date = self.data.get('start_date', None)
-        if not self.project_name:
-            self.project_name, self.start_date = self.get_project_details()
-            self.data['project_name'] = self.project_name
-            self.data['start_date'] = self.start_date
-            self.save_data()
-        self.project_label.config(text=f"Proyecto: {self.project_name}")
-        messagebox.showinfo("Proyecto Actualizado", f"Se ha cargado el proyecto: {self.project_name}")
+        self.proyecto = proyecto
+        if not self.proyecto.project_name:
+            self.get_project_details()
+        self.project_label.config(text=f"Proyecto: {self.proyecto.project_name}")
+        for table in self.open_tables:
+            table.first = 0
+            table.render()
+        for defects_added in self.open_defect_tables:
+            defects_added()
+        self.refresh_dashboard()
+        self.open_checkpoint()
+        messagebox.showinfo("Proyecto Actualizado", f"Se ha cargado el proyecto: {self.proyecto.project_name}")
 
 if __name__ == "__main__":
     app = RegistroTiempo()
@@ -0,0 +1,172 @@
+"""
+Estadísticas combinadas de todos los proyectos de un grupo.
+
+Suma los minutos por actividad, los minutos en pausa y los defectos por tipo
+de varios proyectos y dibuja las mismas gráficas de "Visualizar Gráficos".
+
+Leer el JSON completo de cada alumno en cada consulta es lento, así que el
+resumen de cada proyecto se guarda en un caché (.resumen_cache.json) junto
+con la fecha de modificación y el tamaño del archivo y de su diario. Solo se
+vuelven a leer los proyectos que cambiaron.
+
+Uso:
+    python -m agregado proyectos/
+    python -m agregado proyectos/ --imagen grupo.png
+    python -m agregado "proyectos/*.txt" --mostrar
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from lote import find_projects, fingerprint
+from proyecto import ACTIVITIES_LIST, DEFECT_TYPE_CODES, Proyecto, build_time_summary
+
+CACHE_FILE = ".resumen_cache.json"
+CACHE_VERSION = 1
+
+
+def project_summary(path):
+    """Resumen de un proyecto con lo necesario para las estadísticas del grupo."""
+    proyecto = Proyecto.load(path)
+    proyecto.close()
+    if not proyecto.project_name:
+        raise ValueError("no es un proyecto válido (no tiene nombre)")
+    return {
+        'project_name': proyecto.project_name,
+        'student_name': proyecto.student_name,
+        'activities': dict(proyecto.activities),
+        'paused_minutes': proyecto.total_paused_minutes,
+        'logs': len(proyecto.activity_logs),
+        'defects_by_type': {code: n for code, n in proyecto.defect_summary()['by_type'].items() if n},
+    }
+
+
+def load_cache(cache_file):
+    try:
+        with open(cache_file, "r", encoding="utf-8") as file:
+            cache = json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if cache.get('version') != CACHE_VERSION:
+        return {}
+    return cache.get('projects', {})
+
+
+def save_cache(cache_file, entries):
+    with open(cache_file, "w", encoding="utf-8") as file:
+        json.dump({'version': CACHE_VERSION, 'projects': entries}, file, indent=4, ensure_ascii=False)
+
+
+def collect(paths, cache_file):
+    """
+    Devuelve ({ruta: resumen}, leídos, del caché, errores) usando el caché
+    para los proyectos que no cambiaron. El caché se reescribe solo si algo cambió.
+    """
+    cached = load_cache(cache_file)
+    entries, summaries, errors = {}, {}, []
+    read = 0
+    for path in find_projects(paths):
+        key = os.path.abspath(path)
+        stamp = fingerprint(path)
+        entry = cached.get(key)
+        if entry is None or entry.get('fingerprint') != stamp:
+            try:
+                entry = {'fingerprint': stamp, 'summary': project_summary(path)}
+            except Exception as exc:
+                errors.append((path, exc))
+                continue
+            read += 1
+        entries[key] = entry
+        summaries[path] = entry['summary']
+    # Se conservan las entradas de proyectos de otros directorios que todavía existen.
+    for key, entry in cached.items():
+        if key not in entries and os.path.exists(key):
+            entries[key] = entry
+    if read or entries.keys() != cached.keys():
+        save_cache(cache_file, entries)
+    return summaries, read, len(summaries) - read, errors
+
+
+def combine(summaries):
+    """Suma los resúmenes: el resumen de tiempos (como time_summary) y los defectos por tipo."""
+    minutes, paused = {}, 0
+    defects = {code: 0 for code in DEFECT_TYPE_CODES}
+    for summary in summaries:
+        for activity, value in summary['activities'].items():
+            minutes[activity] = minutes.get(activity, 0) + value
+        paused += summary['paused_minutes']
+        for code, n in summary['defects_by_type'].items():
+            defects[code] = defects.get(code, 0) + n
+    return build_time_summary(minutes, paused), defects
+
+
+def pause_ratio(effective, paused):
+    """Porcentaje del tiempo total que se pasó en pausa."""
+    total = effective + paused
+    return 100 * paused / total if total else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m agregado",
+                                     description="Estadísticas combinadas de varios proyectos.")
+    parser.add_argument("rutas", nargs="+", help="directorios, patrones o archivos de proyecto (.txt, .rtb o .db)")
+    parser.add_argument("--cache", help=f"archivo del caché de resúmenes (por defecto, {CACHE_FILE} "
+                                        "en el primer directorio)")
+    parser.add_argument("--imagen", help="guarda las gráficas combinadas en este PNG")
+    parser.add_argument("--mostrar", action="store_true", help="muestra las gráficas combinadas en pantalla")
+    args = parser.parse_args(argv)
+
+    cache_file = args.cache
+    if cache_file is None:
+        first = args.rutas[0]
+        cache_file = os.path.join(first if os.path.isdir(first) else ".", CACHE_FILE)
+
+    started = time.perf_counter()
+    summaries, read, from_cache, errors = collect(args.rutas, cache_file)
+    for path, exc in errors:
+        print(f"ERROR {path}: {exc}", file=sys.stderr)
+    if not summaries:
+        print("No se encontraron proyectos.", file=sys.stderr)
+        return 1
+
+    for path, summary in summaries.items():
+        effective = sum(summary['activities'].get(activity, 0) for activity in ACTIVITIES_LIST)
+        defects = sum(summary['defects_by_type'].values())
+        print(f"{summary['student_name'] or '(sin alumno)'} - {summary['project_name']}: "
+              f"{effective} min efectivos, {summary['paused_minutes']} min en pausa "
+              f"({pause_ratio(effective, summary['paused_minutes']):.1f}%), {defects} defectos")
+
+    time_summary, defects = combine(summaries.values())
+    print()
+    print(f"Total del grupo: {time_summary['total_minutes']} min efectivos, "
+          f"{time_summary['paused_minutes']} min en pausa "
+          f"({pause_ratio(time_summary['total_minutes'], time_summary['paused_minutes']):.1f}%)")
+    for activity, minutes, percentage in zip(time_summary['activities'], time_summary['minutes'],
+                                             time_summary['percentages']):
+        print(f"  {activity}: {minutes} min ({percentage})")
+    total_defects = sum(defects.values())
+    print(f"Defectos por tipo ({total_defects}):")
+    for code, n in defects.items():
+        share = 100 * n / total_defects if total_defects else 0.0
+        print(f"  {code}: {n} ({share:.1f}%)")
+    print(f"{len(summaries)} proyectos ({read} leídos, {from_cache} del caché) en "
+          f"{time.perf_counter() - started:.2f} s")
+
+    if args.imagen:
+        # Se importa aquí para que el resumen en texto no necesite matplotlib.
+        import reportes
+        with open(args.imagen, "wb") as file:
+            file.write(reportes.statistics_png(time_summary))
+    if args.mostrar:
+        import matplotlib.pyplot as plt
+        import reportes
+        plt.figure(figsize=(14, 5) if reportes.has_pie_data(time_summary) else (7, 5))
+        reportes.draw_statistics(plt.gcf(), time_summary)
+        plt.show()
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,622 @@
+"""
+Almacenamiento de los archivos de proyecto del Registro de Tiempo.
+
+Hay dos modos:
+- "json": el formato original. Cada cambio reescribe el archivo .txt completo.
+- "diario": cada registro nuevo (actividad, defecto o cambio de datos del
+  proyecto) se agrega como una línea a un archivo de diario (<proyecto>.journal).
+  El .txt queda como una instantánea que se reconstruye en segundo plano
+  cuando el diario crece más allá de un umbral.
+
+El modo se elige con la variable de entorno REGISTRO_ALMACENAMIENTO
+("json", "diario" o "sqlite"). Si ya existe un diario junto al proyecto se usa
+siempre el modo "diario" para no perder los registros pendientes.
+
+Los proyectos con extensión .rtb usan el formato binario de binario.py y
+los .db (o los que ya se migraron a SQLite) la base de datos de basedatos.py.
+
+Las escrituras completas son atómicas (archivo temporal, fsync y rename).
+En la interfaz se escribe desde un hilo aparte (BackgroundWriter), que
+junta los cambios de una ráfaga en una sola escritura.
+"""
+import json
+import os
+import re
+import threading
+import time
+
+from perfilado import timed
+
+# Valores por defecto de las claves de un proyecto.
+DATA_DEFAULTS = {
+    'activities': dict,
+    'total_paused_minutes': lambda: 0,
+    'activity_logs': list,
+    'student_name': str,
+    'instructor_name': str,
+    'defects': list,
+}
+
+
+def normalize_data(data):
+    """Completa las claves que falten en los datos de un proyecto."""
+    for key, factory in DATA_DEFAULTS.items():
+        if key not in data:
+            data[key] = factory()
+    return data
+
+
+def read_json(filename):
+    """Lee un proyecto en JSON. Devuelve un diccionario vacío si no existe o está dañado."""
+    try:
+        with open(filename, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+# Listas grandes de un proyecto: en la carga diferida no se leen hasta que se necesitan.
+DEFERRED_KEYS = ('activity_logs', 'defects')
+# Claves que la carga diferida necesita encontrar antes de las listas. Si
+# alguna falta (un archivo escrito con otro orden, o de una versión anterior),
+# podría estar después de las listas y se lee el archivo completo.
+HEADER_KEYS = ('project_name', 'start_date', 'student_name', 'instructor_name',
+               'activities', 'total_paused_minutes')
+# Bloque que se lee del archivo para buscar la cabecera.
+HEADER_CHUNK = 64 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+
+def _scan_members(text, pos, stop_at=()):
+    """
+    Lee los pares clave/valor de un objeto JSON desde 'pos' (justo después
+    de '{' o de una coma) hasta '}' o hasta una clave de 'stop_at'.
+    Devuelve (pares, clave donde se detuvo o None, posición de su valor).
+    """
+    members = {}
+    pos = _WHITESPACE.match(text, pos).end()
+    if text[pos:pos + 1] == '}':
+        return members, None, None
+    while True:
+        pos = _WHITESPACE.match(text, pos).end()
+        key, pos = _decoder.raw_decode(text, pos)
+        pos = _WHITESPACE.match(text, pos).end()
+        if text[pos:pos + 1] != ':':
+            raise json.JSONDecodeError("se esperaba ':'", text, pos)
+        pos = _WHITESPACE.match(text, pos + 1).end()
+        if key in stop_at:
+            return members, key, pos
+        members[key], pos = _decoder.raw_decode(text, pos)
+        pos = _WHITESPACE.match(text, pos).end()
+        separator = text[pos:pos + 1]
+        if separator == '}':
+            return members, None, None
+        if separator != ',':
+            raise json.JSONDecodeError("se esperaba ',' o '}'", text, pos)
+        pos += 1
+
+
+def read_header(filename):
+    """
+    Lee las claves de un proyecto JSON que están antes de la primera lista
+    grande (ver DEFERRED_KEYS), sin leer esa lista. Devuelve (cabecera, clave,
+    posición del valor de esa clave en el texto), o (cabecera, None, None) si
+    el archivo no tiene listas grandes. Si no existe o está dañado devuelve
+    ({}, None, None), igual que read_json.
+    """
+    try:
+        with open(filename, "r", encoding="utf-8") as file:
+            text = ""
+            while True:
+                chunk = file.read(HEADER_CHUNK)
+                text += chunk
+                try:
+                    pos = _WHITESPACE.match(text).end()
+                    if text[pos:pos + 1] != '{':
+                        return {}, None, None
+                    return _scan_members(text, pos + 1, DEFERRED_KEYS)
+                except json.JSONDecodeError:
+                    # La cabecera no cupo en lo leído: se lee otro bloque.
+                    if not chunk:
+                        return {}, None, None
+    except FileNotFoundError:
+        return {}, None, None
+
+
+class DeferredTail:
+    """
+    El resto de un proyecto JSON a partir de su primera lista grande. Se lee
+    (una sola vez, con un candado) la primera vez que se pide.
+    """
+
+    def __init__(self, filename, key, pos):
+        self.filename = filename
+        self.key = key
+        self.pos = pos
+        self.values = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self.values is not None
+
+    def load(self):
+        with self._lock:
+            if self.values is None:
+                with open(self.filename, "r", encoding="utf-8") as file:
+                    text = file.read()
+                value, pos = _decoder.raw_decode(text, self.pos)
+                values = {self.key: value}
+                pos = _WHITESPACE.match(text, pos).end()
+                if text[pos:pos + 1] == ',':
+                    members, _, _ = _scan_members(text, pos + 1)
+                    values.update(members)
+                self.values = values
+        return self.values
+
+
+class DeferredRows:
+    """
+    Lista de registros o defectos que se lee del archivo la primera vez que
+    se recorre o se pide una posición. Mientras no se ha leído, len() usa el
+    número guardado en los totales del proyecto (si se conoce) y lo que se
+    agregue se guarda aparte para unirlo después. La lectura y el cambio de
+    'pendientes' a 'leídos' se hacen con un candado: la ventana y el hilo que
+    escribe el archivo pueden pedir la lista al mismo tiempo.
+    """
+
+    def __init__(self, tail, key, count=None):
+        self._tail = tail
+        self._key = key
+        self._count = count
+        self._items = None
+        self._pending = []
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._items is not None
+
+    def _loaded(self):
+        items = self._items
+        if items is not None:
+            return items
+        with self._lock:
+            if self._items is None:
+                self._items = list(self._tail.load().get(self._key, [])) + self._pending
+                self._pending = None
+            return self._items
+
+    def __len__(self):
+        with self._lock:
+            if self._items is None and self._count is not None:
+                return self._count + len(self._pending)
+        return len(self._loaded())
+
+    def __getitem__(self, index):
+        # Lo agregado después de la carga se puede pedir sin leer el archivo.
+        if self._items is None and self._count is not None and isinstance(index, slice) \
+                and index.step in (None, 1) and (index.start or 0) >= self._count:
+            with self._lock:
+                if self._items is None:
+                    stop = None if index.stop is None else index.stop - self._count
+                    return self._pending[index.start - self._count:stop]
+        return self._loaded()[index]
+
+    def __iter__(self):
+        return iter(self._loaded())
+
+    def append(self, item):
+        with self._lock:
+            if self._items is None:
+                self._pending.append(item)
+                return
+        self._items.append(item)
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+
+def plain_data(data):
+    """Copia de los datos con las listas grandes como listas normales, para json.dump."""
+    data = dict(data)
+    for key in DEFERRED_KEYS:
+        if key in data and not isinstance(data[key], list):
+            data[key] = list(data[key])
+    return data
+
+
+def write_json_atomic(filename, data):
+    """Escribe el JSON en un archivo temporal y lo mueve sobre el destino."""
+    temp_file = filename + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=4, ensure_ascii=False)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_file, filename)
+
+
+def apply_record(data, record):
+    """Aplica un registro del diario sobre los datos de un proyecto."""
+    op = record.get("op")
+    if op == "log":
+        data['activity_logs'].append(record["entry"])
+        data['activities'][record["activity"]] = record["minutes"]
+    elif op == "defect":
+        data['defects'].append(record["record"])
+    elif op == "meta":
+        data.update(record["fields"])
+
+
+class JsonStorage:
+    """Almacenamiento original: el proyecto completo en un solo archivo JSON."""
+
+    mode = "json"
+
+    def __init__(self, filename):
+        self.filename = filename
+        # Función opcional que recibe los datos ya reconstruidos al compactar
+        # (el modelo la usa para poner al día sus totales guardados).
+        self.on_fold = None
+        # Resto del archivo pendiente de leer en la carga diferida (DeferredTail).
+        self._tail = None
+
+    def load(self, lazy=False):
+        """
+        Lee el proyecto. Con lazy=True solo se leen los datos que están antes
+        de los registros y los defectos; esas listas (DeferredRows) se leen
+        del archivo la primera vez que se necesitan.
+        """
+        self._tail = None
+        if not lazy:
+            return normalize_data(read_json(self.filename))
+        return normalize_data(self._read_lazy())
+
+    def _read_lazy(self):
+        data, key, pos = read_header(self.filename)
+        if key is not None and not all(name in data for name in HEADER_KEYS):
+            return read_json(self.filename)
+        if key is not None:
+            self._tail = DeferredTail(self.filename, key, pos)
+            aggregates = data.get('aggregates') or {}
+            data['activity_logs'] = DeferredRows(self._tail, 'activity_logs', aggregates.get('log_count'))
+            data['defects'] = DeferredRows(self._tail, 'defects', aggregates.get('defect_count'))
+        return data
+
+    def _load_deferred(self, data=None):
+        """
+        Lee lo pendiente del archivo antes de reescribirlo. Si se da 'data',
+        le agrega las claves que estaban después de las listas y 'data' no
+        tiene, para no perderlas al reescribir.
+        """
+        if self._tail is not None:
+            values = self._tail.load()
+            for key, value in values.items() if data is not None else ():
+                if key not in DEFERRED_KEYS and key not in data:
+                    data[key] = value
+
+    def save(self, data):
+        data = plain_data(data)
+        self._load_deferred(data)
+        write_json_atomic(self.filename, data)
+
+    def append(self, op, payload, data):
+        """
+        Registra un cambio incremental. En este modo no hay diario,
+        así que se reescribe el proyecto completo.
+        """
+        self.save(data)
+
+    def close(self):
+        pass
+
+
+class JournalStorage(JsonStorage):
+    """
+    Almacenamiento con diario de solo agregado.
+
+    Cada registro del diario lleva un número de secuencia. La instantánea
+    guarda en 'journal_seq' el último número ya incorporado, así que un
+    corte a mitad de una compactación nunca aplica dos veces el mismo registro.
+    """
+
+    mode = "diario"
+    suffix = ".journal"
+    compacting_suffix = ".journal.compacting"
+    # Tamaño del diario (en bytes) a partir del cual se compacta.
+    compact_threshold = 256 * 1024
+
+    def __init__(self, filename, compact_threshold=None):
+        super().__init__(filename)
+        if compact_threshold is not None:
+            self.compact_threshold = compact_threshold
+        self.journal_file = filename + self.suffix
+        self.compacting_file = filename + self.compacting_suffix
+        self._lock = threading.Lock()
+        self._file = None
+        self._seq = 0
+        self._journal_size = 0
+        self._compaction = None
+
+    def _read_records(self, path):
+        """Lee los registros de un diario, ignorando una última línea incompleta."""
+        records = []
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break
+        except FileNotFoundError:
+            pass
+        return records
+
+    def load(self, lazy=False):
+        self._tail = None
+        data = self._read_lazy() if lazy else read_json(self.filename)
+        if self._tail is not None and 'journal_seq' not in data:
+            # Instantánea anterior, con 'journal_seq' al final: hace falta leerla completa.
+            self._tail.load()
+            data['journal_seq'] = self._tail.values.get('journal_seq', 0)
+        snapshot_seq = data.pop('journal_seq', 0)
+        normalize_data(data)
+        self._seq = snapshot_seq
+        for path in (self.compacting_file, self.journal_file):
+            for record in self._read_records(path):
+                if record.get("seq", 0) > snapshot_seq:
+                    apply_record(data, record)
+                    self._seq = max(self._seq, record["seq"])
+        try:
+            self._journal_size = os.path.getsize(self.journal_file)
+        except OSError:
+            self._journal_size = 0
+        # Una compactación anterior quedó a medias: se termina en segundo plano.
+        if os.path.exists(self.compacting_file):
+            self._start_compaction(rotate=False)
+        return data
+
+    def save(self, data):
+        """Escribe una instantánea completa y vacía el diario."""
+        self._wait_compaction()
+        data = plain_data(data)
+        self._load_deferred(data)
+        with self._lock:
+            # 'journal_seq' va primero para que la carga diferida lo lea en la cabecera.
+            snapshot = {'journal_seq': self._seq}
+            snapshot.update(data)
+            write_json_atomic(self.filename, snapshot)
+            self._close_file()
+            for path in (self.journal_file, self.compacting_file):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._journal_size = 0
+
+    def append(self, op, payload, data):
+        with self._lock:
+            self._seq += 1
+            record = {"seq": self._seq, "op": op}
+            record.update(payload)
+            line = json.dumps(record, ensure_ascii=False) + "\n"
+            if self._file is None:
+                self._file = open(self.journal_file, "a", encoding="utf-8")
+            self._file.write(line)
+            self._file.flush()
+            self._journal_size += len(line.encode("utf-8"))
+            needs_compaction = self._journal_size >= self.compact_threshold
+        if needs_compaction:
+            self._start_compaction()
+
+    def close(self):
+        self._wait_compaction()
+        with self._lock:
+            self._close_file()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _wait_compaction(self):
+        if self._compaction is not None:
+            self._compaction.join()
+            self._compaction = None
+
+    def _start_compaction(self, rotate=True):
+        """
+        Aparta el diario actual y lo incorpora a la instantánea en un hilo.
+        Los registros nuevos siguen llegando a un diario vacío mientras tanto.
+        """
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+        with self._lock:
+            if rotate:
+                if os.path.exists(self.compacting_file):
+                    return
+                self._close_file()
+                os.replace(self.journal_file, self.compacting_file)
+                self._journal_size = 0
+        self._compaction = threading.Thread(target=self._compact, daemon=True)
+        self._compaction.start()
+
+    def _compact(self):
+        # Lo que la carga diferida no ha leído se lee antes de que cambie el archivo.
+        self._load_deferred()
+        snapshot = read_json(self.filename)
+        snapshot_seq = snapshot.get('journal_seq', 0)
+        normalize_data(snapshot)
+        last_seq = snapshot_seq
+        for record in self._read_records(self.compacting_file):
+            if record.get("seq", 0) > snapshot_seq:
+                apply_record(snapshot, record)
+                last_seq = max(last_seq, record["seq"])
+        if self.on_fold is not None:
+            self.on_fold(snapshot)
+        snapshot.pop('journal_seq', None)
+        compacted = {'journal_seq': last_seq}
+        compacted.update(snapshot)
+        write_json_atomic(self.filename, compacted)
+        os.remove(self.compacting_file)
+
+
+class BackgroundWriter:
+    """
+    Envoltura de un almacenamiento que escribe en un hilo aparte.
+
+    save() y append() solo dejan la petición en una cola y regresan. El hilo
+    espera 'delay' segundos a que se junten las peticiones de una ráfaga
+    (pausar, reanudar, guardar un defecto...) y las escribe de una vez:
+
+    - Sin diario, cualquier número de cambios es una sola reescritura
+      (atómica) con los datos más recientes.
+    - Con diario, los registros se agregan en orden; si en la ráfaga hay un
+      save(), basta con la instantánea, que ya los incluye.
+
+    Los datos se piden a 'data_source' en el momento de escribir; el modelo
+    los copia bajo su candado, así que el hilo nunca los lee a medio cambiar.
+
+    Si una escritura falla, el error queda en 'error' (la ventana lo revisa
+    para avisar) y cada 'retry_delay' segundos se reintenta con una
+    instantánea completa, aunque no haya cambios nuevos. close() escribe lo
+    pendiente, reintenta la instantánea si la última escritura falló y
+    después cierra el almacenamiento.
+    """
+
+    delay = 0.3
+    retry_delay = 5
+
+    def __init__(self, storage, data_source):
+        self.storage = storage
+        self.data_source = data_source
+        self.mode = storage.mode
+        # Último error de escritura; close() lo vuelve a lanzar.
+        self.error = None
+        self._pending = []
+        self._condition = threading.Condition()
+        self._writing = False
+        self._closed = False
+        # flush() pidió escribir sin esperar el resto de la ráfaga.
+        self._urgent = False
+        # Una escritura falló: la siguiente es una instantánea completa.
+        self._needs_save = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def on_fold(self):
+        return self.storage.on_fold
+
+    @on_fold.setter
+    def on_fold(self, function):
+        self.storage.on_fold = function
+
+    def load(self, lazy=False):
+        self.flush()
+        return self.storage.load(lazy=lazy)
+
+    def save(self, data):
+        self._request(("save",))
+
+    def append(self, op, payload, data):
+        self._request(("append", op, payload))
+
+    def _request(self, task):
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("el almacenamiento ya está cerrado")
+            self._pending.append(task)
+            self._condition.notify_all()
+
+    def flush(self):
+        """Espera a que se escriba todo lo pendiente."""
+        with self._condition:
+            if self._pending:
+                self._urgent = True
+                self._condition.notify_all()
+            while self._pending or self._writing:
+                self._condition.wait()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        if self._needs_save:
+            # Último intento: si el disco ya se recuperó, no se pierde nada.
+            try:
+                self.storage.save(self.data_source())
+                self.error = None
+                self._needs_save = False
+            except Exception as exc:
+                self.error = exc
+        self.storage.close()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    if not self._needs_save:
+                        self._condition.wait()
+                    elif not self._condition.wait(self.retry_delay):
+                        # Reintento de la escritura fallida aunque no haya cambios nuevos.
+                        self._pending.append(("save",))
+                if not self._pending:
+                    return
+                # Se espera un poco para juntar la ráfaga (salvo al cerrar o con flush()).
+                deadline = time.monotonic() + self.delay
+                while not (self._closed or self._urgent):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                self._urgent = False
+                tasks, self._pending = self._pending, []
+                self._writing = True
+            try:
+                self._write(tasks)
+                self.error = None
+                self._needs_save = False
+            except Exception as exc:
+                self.error = exc
+                self._needs_save = True
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+    @timed()
+    def _write(self, tasks):
+        journal = isinstance(self.storage, JournalStorage)
+        if journal and not self._needs_save and all(task[0] == "append" for task in tasks):
+            for _, op, payload in tasks:
+                self.storage.append(op, payload, None)
+        else:
+            self.storage.save(self.data_source())
+
+
+def open_storage(filename):
+    """Devuelve el almacenamiento adecuado para el archivo de proyecto."""
+    if filename.lower().endswith(".rtb"):
+        # Formato binario compacto (ver binario.py); siempre por extensión.
+        from binario import BinaryStorage
+        return BinaryStorage(filename)
+    mode = os.environ.get("REGISTRO_ALMACENAMIENTO", "json")
+    # SQLite (ver basedatos.py): archivos .db, el modo "sqlite" o un proyecto
+    # que ya se migró y tiene al lado el .db que salió de él (no cualquier .db
+    # con el mismo nombre).
+    if filename.lower().endswith(".db") or mode == "sqlite":
+        from basedatos import SqliteStorage
+        return SqliteStorage(filename)
+    if os.path.exists(os.path.splitext(filename)[0] + ".db"):
+        from basedatos import SqliteStorage, migrated_from
+        if migrated_from(filename) == os.path.basename(filename):
+            return SqliteStorage(filename)
+    if mode == JournalStorage.mode or os.path.exists(filename + JournalStorage.suffix) \
+            or os.path.exists(filename + JournalStorage.compacting_suffix):
+        return JournalStorage(filename)
+    return JsonStorage(filename)
@@ -0,0 +1,341 @@
+"""
+Almacenamiento de un proyecto en una base de datos SQLite (.db).
+
+Los registros de actividad y los defectos son filas de sus tablas, con
+índices por fecha, actividad y tipo de defecto; el resto de los datos del
+proyecto (nombre, totales por actividad, índice de totales, etc.) son pares
+clave/valor en la tabla meta. Registrar una actividad o un defecto es un solo
+INSERT más la actualización de los totales, en una transacción, en lugar de
+reescribir el archivo completo.
+
+Al cargar, activity_logs y defects no se leen completos: son secuencias
+(SqlRows) que consultan por páginas las filas que se piden, así que abrir el
+proyecto o mostrar la parte visible de una tabla no lee toda la historia.
+
+Se usa para los archivos .db y, con REGISTRO_ALMACENAMIENTO=sqlite, también
+para los proyectos .txt: la primera vez se migra el JSON (y su diario) a un
+.db con el mismo nombre, que desde entonces es el que se usa. El .txt se
+conserva sin cambios como respaldo. La migración deja en meta el nombre del
+.txt de origen (MIGRATED_FROM): sin el modo "sqlite", un .txt solo se abre
+con el .db de al lado si ese .db dice que salió de él.
+"""
+import json
+import os
+import sqlite3
+from collections import OrderedDict
+
+from almacenamiento import JournalStorage, JsonStorage, normalize_data
+
+EXTENSION = ".db"
+# Clave de meta con el nombre del .txt del que se migró la base de datos; no es
+# parte de los datos del proyecto.
+MIGRATED_FROM = "_migrado_de"
+
+# Columnas de cada tabla, en el orden de las claves de un registro normal.
+LOG_FIELDS = ("fecha_inicio", "hora_inicio", "hora_fin", "ts_inicio", "ts_fin", "tiempo_en_pausa_min",
+              "tiempo_no_pausado_min", "actividad", "comentarios")
+# Claves que los registros anteriores no tienen; si la columna es NULL no se agregan.
+OPTIONAL_FIELDS = ("ts_inicio", "ts_fin")
+DEFECT_FIELDS = ("fecha", "numero", "tipo", "encontrado", "removido",
+                 "tiempo_compostura", "defecto_arreglado", "descripcion")
+TABLE_FIELDS = {"activity_logs": LOG_FIELDS, "defects": DEFECT_FIELDS}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS activity_logs (
+    id INTEGER PRIMARY KEY,
+    fecha_inicio, hora_inicio, hora_fin, ts_inicio, ts_fin, tiempo_en_pausa_min, tiempo_no_pausado_min,
+    actividad, comentarios,
+    inicio INTEGER,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS activity_logs_inicio ON activity_logs (inicio);
+CREATE INDEX IF NOT EXISTS activity_logs_actividad ON activity_logs (actividad);
+CREATE TABLE IF NOT EXISTS defects (
+    id INTEGER PRIMARY KEY,
+    fecha, numero, tipo, encontrado, removido, tiempo_compostura, defecto_arreglado, descripcion,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS defects_fecha ON defects (fecha);
+CREATE INDEX IF NOT EXISTS defects_tipo ON defects (tipo);
+"""
+
+
+def database_path(filename):
+    """Ruta de la base de datos de un proyecto (x.txt -> x.db)."""
+    if filename.lower().endswith(EXTENSION):
+        return filename
+    return os.path.splitext(filename)[0] + EXTENSION
+
+
+def migrated_from(filename):
+    """
+    Nombre del .txt del que se migró la base de datos de este proyecto, o
+    None si no existe, no es una base de datos o no viene de una migración.
+    """
+    try:
+        connection = sqlite3.connect(f"file:{database_path(filename)}?mode=ro", uri=True)
+    except sqlite3.Error:
+        return None
+    try:
+        row = connection.execute("SELECT valor FROM meta WHERE clave = ?", (MIGRATED_FROM,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+    except (sqlite3.Error, ValueError):
+        return None
+    finally:
+        connection.close()
+
+
+def _is_scalar(value):
+    return value is None or (isinstance(value, (str, int, float)) and not isinstance(value, bool))
+
+
+def _is_plain(record, fields):
+    """Si el registro se puede guardar solo en sus columnas sin perder nada."""
+    keys = tuple(record)
+    if keys != fields and keys != tuple(field for field in fields if field not in OPTIONAL_FIELDS):
+        return False
+    if any(record.get(field, 0) is None for field in OPTIONAL_FIELDS):
+        return False
+    return all(_is_scalar(value) for value in record.values())
+
+
+def _log_start(log):
+    # Se importa aquí: proyecto.py importa este módulo a través de almacenamiento.
+    from proyecto import log_timestamps
+    stamps = log_timestamps(log)
+    return stamps[0] if stamps is not None else None
+
+
+class SqlRows:
+    """
+    Secuencia de solo agregado respaldada por una tabla. La posición i es la
+    fila con id i + 1. Se guardan en memoria unas pocas páginas recientes.
+    """
+
+    page_size = 256
+    cached_pages = 8
+
+    def __init__(self, storage, table, length=None):
+        self.storage = storage
+        self.table = table
+        self.fields = TABLE_FIELDS[table]
+        self._pages = OrderedDict()
+        if length is None:
+            (length,) = storage.connect().execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+        self._length = length
+
+    def snapshot(self):
+        """
+        Vista de las filas actuales (no ve las que se agreguen después) con
+        su propia conexión, que se abre al leerla: así la puede recorrer otro
+        hilo (una conexión de sqlite3 no se comparte entre hilos) sin copiar
+        antes todas las filas. Solo se lee; se cierra con storage.close().
+        """
+        return SqlRows(SqliteStorage(self.storage.filename), self.table, length=self._length)
+
+    def _row(self, row):
+        *values, extra = row
+        if extra is not None:
+            return json.loads(extra)
+        return {field: value for field, value in zip(self.fields, values)
+                if value is not None or field not in OPTIONAL_FIELDS}
+
+    def _page(self, number):
+        page = self._pages.get(number)
+        if page is None:
+            first = number * self.page_size
+            cursor = self.storage.connect().execute(
+                f"SELECT {', '.join(self.fields)}, extra FROM {self.table} "
+                "WHERE id > ? AND id <= ? ORDER BY id", (first, first + self.page_size))
+            page = self._pages[number] = [self._row(row) for row in cursor]
+            while len(self._pages) > self.cached_pages:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(number)
+        return page
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step == 1:
+                # Página por página, sin buscar cada fila por separado.
+                result = []
+                while start < stop:
+                    number, offset = divmod(start, self.page_size)
+                    chunk = self._page(number)[offset:offset + stop - start]
+                    result.extend(chunk)
+                    start += len(chunk)
+                return result
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError(f"{self.table}: posición {index} fuera de rango")
+        number, offset = divmod(index, self.page_size)
+        return self._page(number)[offset]
+
+    def __iter__(self):
+        for number in range((self._length + self.page_size - 1) // self.page_size):
+            yield from self._page(number)
+
+    def append(self, record):
+        """Inserta la fila; se confirma junto con los totales en SqliteStorage.append()."""
+        self.storage.insert(self.table, self._length + 1, record)
+        number, offset = divmod(self._length, self.page_size)
+        if number in self._pages:
+            self._pages[number].append(record)
+        self._length += 1
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+
+class SqliteStorage(JsonStorage):
+    """Almacenamiento en SQLite; la interfaz es la misma que la de JsonStorage."""
+
+    mode = "sqlite"
+
+    def __init__(self, filename):
+        super().__init__(filename)
+        self.db_file = database_path(filename)
+        self.connection = None
+
+    def connect(self):
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.db_file)
+            self.connection.executescript(SCHEMA)
+            # Bases creadas antes de que los registros tuvieran ts_inicio/ts_fin.
+            columns = {row[1] for row in self.connection.execute("PRAGMA table_info(activity_logs)")}
+            for field in OPTIONAL_FIELDS:
+                if field not in columns:
+                    self.connection.execute(f"ALTER TABLE activity_logs ADD COLUMN {field}")
+            self.connection.commit()
+        return self.connection
+
+    def _migrate(self):
+        """Copia a la base de datos el proyecto JSON (con su diario, si lo tiene)."""
+        if os.path.exists(self.filename + JournalStorage.suffix) \
+                or os.path.exists(self.filename + JournalStorage.compacting_suffix):
+            source = JournalStorage(self.filename)
+        else:
+            source = JsonStorage(self.filename)
+        data = source.load()
+        source.close()
+        # Se guardan los totales al día para no recorrer los registros al abrir.
+        if self.on_fold is not None:
+            self.on_fold(data)
+        self.save(data)
+
+    def load(self, lazy=False):
+        migrate = self.db_file != self.filename and not os.path.exists(self.db_file) \
+            and os.path.exists(self.filename)
+        self.connect()
+        if migrate:
+            self._migrate()
+        if self.db_file != self.filename:
+            # Con el modo "sqlite" el .db pasa a ser el de este .txt (también
+            # los migrados antes de que existiera la marca).
+            with self.connection:
+                self.connection.execute("INSERT OR REPLACE INTO meta (clave, valor) VALUES (?, ?)",
+                                        (MIGRATED_FROM, json.dumps(os.path.basename(self.filename))))
+        data = {clave: json.loads(valor) for clave, valor in self.connection.execute(
+            "SELECT clave, valor FROM meta WHERE clave != ?", (MIGRATED_FROM,))}
+        data['activity_logs'] = SqlRows(self, "activity_logs")
+        data['defects'] = SqlRows(self, "defects")
+        return normalize_data(data)
+
+    @staticmethod
+    def _insert_sql(table):
+        columns = ["id"] + list(TABLE_FIELDS[table]) + (["inicio"] if table == "activity_logs" else []) + ["extra"]
+        return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+    @staticmethod
+    def _values(table, row_id, record):
+        fields = TABLE_FIELDS[table]
+        # Un registro fuera de lo normal se guarda completo en 'extra'; en las
+        # columnas solo quedan los valores simples, para los índices.
+        values = [row_id] + [value if _is_scalar(value) else None for value in (record.get(field) for field in fields)]
+        if table == "activity_logs":
+            values.append(_log_start(record))
+        values.append(None if _is_plain(record, fields) else json.dumps(record, ensure_ascii=False))
+        return values
+
+    def insert(self, table, row_id, record):
+        self.connect().execute(self._insert_sql(table), self._values(table, row_id, record))
+
+    def _write_meta(self, data):
+        self.connect().executemany(
+            "INSERT OR REPLACE INTO meta (clave, valor) VALUES (?, ?)",
+            [(key, json.dumps(value, ensure_ascii=False)) for key, value in data.items()
+             if key not in ('activity_logs', 'defects')])
+
+    def save(self, data):
+        """
+        Guarda los datos del proyecto. Las filas solo se reescriben si los
+        registros no son ya las secuencias de esta base de datos (por ejemplo,
+        al migrar desde JSON).
+        """
+        connection = self.connect()
+        with connection:
+            self._write_meta(data)
+            for table in ("activity_logs", "defects"):
+                rows = data.get(table, [])
+                if isinstance(rows, SqlRows) and rows.storage is self:
+                    continue
+                connection.execute(f"DELETE FROM {table}")
+                connection.executemany(self._insert_sql(table),
+                                       (self._values(table, position + 1, record)
+                                        for position, record in enumerate(rows)))
+
+    def append(self, op, payload, data):
+        """
+        La fila nueva ya se insertó al agregarla a la secuencia; aquí se
+        actualizan los totales y se confirma todo en una sola transacción.
+        """
+        with self.connect():
+            self._write_meta(data)
+
+    def _period_condition(self, start, end):
+        conditions, params = ["inicio IS NOT NULL"], []
+        if start is not None:
+            conditions.append("inicio >= ?")
+            params.append(int(start.timestamp()))
+        if end is not None:
+            conditions.append("inicio < ?")
+            params.append(int(end.timestamp()))
+        return " AND ".join(conditions), params
+
+    def period_positions(self, start=None, end=None):
+        """Posiciones de los registros que empiezan en [start, end), ordenadas por fecha."""
+        where, params = self._period_condition(start, end)
+        return [row_id - 1 for (row_id,) in self.connect().execute(
+            f"SELECT id FROM activity_logs WHERE {where} ORDER BY inicio, id", params)]
+
+    def period_totals(self, start=None, end=None):
+        """
+        Minutos efectivos por actividad y minutos en pausa de los registros
+        que empiezan en [start, end), consultando el índice por fecha.
+        """
+        where, params = self._period_condition(start, end)
+        by_activity, paused = {}, 0
+        for activity, active, paused_minutes in self.connect().execute(
+                "SELECT actividad, SUM(COALESCE(tiempo_no_pausado_min, 0)), SUM(COALESCE(tiempo_en_pausa_min, 0)) "
+                f"FROM activity_logs WHERE {where} GROUP BY actividad", params):
+            if active:
+                by_activity[activity] = active
+            paused += paused_minutes
+        return by_activity, paused
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.commit()
+            self.connection.close()
+            self.connection = None
@@ -0,0 +1,310 @@
+"""
+Formato binario compacto para los proyectos (.rtb).
+
+El .txt repite en cada registro la fecha completa ("Miércoles, 05 marzo
+2025"), el nombre de la actividad y, en cada defecto, los nombres de las
+fases. En el .rtb:
+
+- Todas las cadenas se guardan una sola vez en una tabla de cadenas y los
+  registros las referencian por su posición.
+- El inicio y el fin de cada registro son segundos enteros (hora local,
+  sin zona) y la fecha y las horas se reconstruyen al leer. Las marcas
+  'ts_inicio'/'ts_fin' de los registros nuevos se guardan como int64.
+- Los registros de actividad y los defectos son de ancho fijo (struct), así
+  que se leen con un solo struct.iter_unpack por bloque.
+
+Estructura del archivo:
+
+    cabecera   MAGIC, largo de los metadatos, número de cadenas,
+               número de registros, número de defectos
+    metadatos  JSON (UTF-8) con todo lo que no son registros ni defectos
+    cadenas    por cada una: largo (uint32) + UTF-8
+    registros  LOG_RECORD por registro de actividad
+    defectos   DEFECT_RECORD por defecto
+
+Un registro o defecto que no se pueda reconstruir exactamente a partir de
+sus campos (fecha con otro formato, claves adicionales, números como texto,
+etc.) guarda además su JSON original en la tabla de cadenas ('extra'), así
+que la conversión en ambos sentidos nunca pierde datos.
+
+Conversión desde la línea de comandos (el formato sale de la extensión):
+    python -m binario proyecto.txt proyecto.rtb
+    python -m binario proyecto.rtb proyecto.txt
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+from datetime import datetime, timedelta
+
+from almacenamiento import JsonStorage, normalize_data, open_storage
+from proyecto import formatear_fecha, parse_log_times
+
+EXTENSION = ".rtb"
+MAGIC = b"RTB2"
+HEADER = struct.Struct("<4sIIII")
+STRING_LENGTH = struct.Struct("<I")
+# inicio, fin, ts_inicio, ts_fin, minutos en pausa, minutos efectivos, actividad, comentarios, extra
+LOG_RECORD = struct.Struct("<qqqqiiIII")
+# Versión anterior, sin ts_inicio/ts_fin; se sigue pudiendo leer.
+MAGIC_V1 = b"RTB1"
+LOG_RECORD_V1 = struct.Struct("<qqiiIII")
+# fecha, numero, tipo, encontrado, removido, minutos de compostura, arreglado, descripcion, extra
+DEFECT_RECORD = struct.Struct("<IIIIIiIII")
+# Referencia a "ninguna cadena" (None).
+NO_STRING = 0xFFFFFFFF
+# Registro sin ts_inicio/ts_fin.
+NO_STAMP = -(2 ** 63)
+
+# Los segundos se cuentan desde esta fecha sin zona horaria, para que un
+# cambio de horario de verano no mueva las horas guardadas.
+EPOCH = datetime(1970, 1, 1)
+
+DEFECT_STRING_FIELDS = ("fecha", "numero", "tipo", "encontrado", "removido")
+DEFECT_TAIL_FIELDS = ("defecto_arreglado", "descripcion")
+
+
+class BinaryFormatError(ValueError):
+    pass
+
+
+class StringTable:
+    """Asigna a cada cadena distinta una posición en la tabla."""
+
+    def __init__(self):
+        self.strings = []
+        self._positions = {}
+
+    def ref(self, value):
+        if value is None:
+            return NO_STRING
+        if not isinstance(value, str):
+            raise TypeError(f"se esperaba una cadena, no {type(value).__name__}")
+        position = self._positions.get(value)
+        if position is None:
+            position = self._positions[value] = len(self.strings)
+            self.strings.append(value)
+        return position
+
+
+def _seconds(dt):
+    return int((dt - EPOCH).total_seconds())
+
+
+class _Decoder:
+    """Reconstruye registros y defectos a partir de la tabla de cadenas."""
+
+    def __init__(self, strings):
+        self.strings = strings
+        # Fecha y horas en texto ya formateadas, para no repetir el trabajo en cada registro.
+        self._dates = {}
+        self._times = {}
+
+    def string(self, ref):
+        return None if ref == NO_STRING else self.strings[ref]
+
+    def _date(self, seconds):
+        day = seconds // 86400
+        text = self._dates.get(day)
+        if text is None:
+            text = self._dates[day] = formatear_fecha(EPOCH + timedelta(days=day))
+        return text
+
+    def _time(self, seconds):
+        seconds %= 86400
+        text = self._times.get(seconds)
+        if text is None:
+            minutes, second = divmod(seconds, 60)
+            hour, minute = divmod(minutes, 60)
+            text = self._times[seconds] = f"{hour:02d}:{minute:02d}:{second:02d}"
+        return text
+
+    def log(self, start, end, ts_start, ts_end, paused, active, activity, comments, extra):
+        if extra != NO_STRING:
+            return json.loads(self.strings[extra])
+        strings = self.strings
+        log = {
+            "fecha_inicio": self._date(start),
+            "hora_inicio": self._time(start),
+            "hora_fin": self._time(end),
+        }
+        if ts_start != NO_STAMP:
+            log["ts_inicio"] = ts_start
+            log["ts_fin"] = ts_end
+        log.update({
+            "tiempo_en_pausa_min": paused,
+            "tiempo_no_pausado_min": active,
+            "actividad": None if activity == NO_STRING else strings[activity],
+            "comentarios": None if comments == NO_STRING else strings[comments]
+        })
+        return log
+
+    def log_v1(self, start, end, paused, active, activity, comments, extra):
+        return self.log(start, end, NO_STAMP, NO_STAMP, paused, active, activity, comments, extra)
+
+    def defect(self, fecha, numero, tipo, encontrado, removido, minutes, arreglado, descripcion, extra):
+        if extra != NO_STRING:
+            return json.loads(self.strings[extra])
+        return {
+            "fecha": self.string(fecha),
+            "numero": self.string(numero),
+            "tipo": self.string(tipo),
+            "encontrado": self.string(encontrado),
+            "removido": self.string(removido),
+            "tiempo_compostura": minutes,
+            "defecto_arreglado": self.string(arreglado),
+            "descripcion": self.string(descripcion)
+        }
+
+
+def _pack_log(log, table, decoder):
+    """Empaqueta un registro; si no se reconstruye igual, se guarda también su JSON."""
+    times = parse_log_times(log)
+    try:
+        if times is not None:
+            stamps = (log["ts_inicio"], log["ts_fin"]) if "ts_inicio" in log else (NO_STAMP, NO_STAMP)
+            fields = (_seconds(times[0]), _seconds(times[1])) + stamps \
+                + (log.get("tiempo_en_pausa_min"), log.get("tiempo_no_pausado_min"),
+                   table.ref(log.get("actividad")), table.ref(log.get("comentarios")), NO_STRING)
+            packed = LOG_RECORD.pack(*fields)
+            if decoder.log(*fields) == log:
+                return packed
+    except (struct.error, TypeError, KeyError):
+        pass
+    return LOG_RECORD.pack(0, 0, NO_STAMP, NO_STAMP, 0, 0, NO_STRING, NO_STRING, table.ref(json.dumps(log, ensure_ascii=False)))
+
+
+def _pack_defect(defect, table, decoder):
+    try:
+        fields = tuple(table.ref(defect.get(key)) for key in DEFECT_STRING_FIELDS) \
+            + (defect.get("tiempo_compostura"),) \
+            + tuple(table.ref(defect.get(key)) for key in DEFECT_TAIL_FIELDS) + (NO_STRING,)
+        packed = DEFECT_RECORD.pack(*fields)
+        if decoder.defect(*fields) == defect:
+            return packed
+    except (struct.error, TypeError):
+        pass
+    return DEFECT_RECORD.pack(*([NO_STRING] * 5 + [0] + [NO_STRING] * 2),
+                              table.ref(json.dumps(defect, ensure_ascii=False)))
+
+
+def encode(data):
+    """Convierte los datos de un proyecto al formato binario (bytes)."""
+    table = StringTable()
+    decoder = _Decoder(table.strings)
+    logs = data.get('activity_logs', [])
+    defects = data.get('defects', [])
+    log_block = b"".join(_pack_log(log, table, decoder) for log in logs)
+    defect_block = b"".join(_pack_defect(defect, table, decoder) for defect in defects)
+    meta = {key: value for key, value in data.items() if key not in ('activity_logs', 'defects')}
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+
+    parts = [HEADER.pack(MAGIC, len(meta_bytes), len(table.strings), len(logs), len(defects)), meta_bytes]
+    for text in table.strings:
+        encoded = text.encode("utf-8")
+        parts.append(STRING_LENGTH.pack(len(encoded)))
+        parts.append(encoded)
+    parts.append(log_block)
+    parts.append(defect_block)
+    return b"".join(parts)
+
+
+def decode(buffer):
+    """Recupera los datos de un proyecto a partir de los bytes del formato binario."""
+    if len(buffer) < HEADER.size:
+        raise BinaryFormatError("archivo incompleto")
+    magic, meta_length, string_count, log_count, defect_count = HEADER.unpack_from(buffer)
+    if magic not in (MAGIC, MAGIC_V1):
+        raise BinaryFormatError("no es un proyecto en formato binario")
+    offset = HEADER.size
+    data = json.loads(buffer[offset:offset + meta_length].decode("utf-8"))
+    offset += meta_length
+
+    view = memoryview(buffer)
+    strings = []
+    for _ in range(string_count):
+        (length,) = STRING_LENGTH.unpack_from(buffer, offset)
+        offset += STRING_LENGTH.size
+        strings.append(str(view[offset:offset + length], "utf-8"))
+        offset += length
+    decoder = _Decoder(strings)
+
+    log_record, decode_log = (LOG_RECORD, decoder.log) if magic == MAGIC else (LOG_RECORD_V1, decoder.log_v1)
+    end = offset + log_count * log_record.size
+    data['activity_logs'] = [decode_log(*fields) for fields in log_record.iter_unpack(view[offset:end])]
+    offset = end
+    end = offset + defect_count * DEFECT_RECORD.size
+    data['defects'] = [decoder.defect(*fields) for fields in DEFECT_RECORD.iter_unpack(view[offset:end])]
+    if end != len(buffer):
+        raise BinaryFormatError("el tamaño del archivo no corresponde con su cabecera")
+    return data
+
+
+class BinaryStorage(JsonStorage):
+    """
+    Almacenamiento en formato binario. Como el JSON, cada cambio reescribe
+    el archivo completo (de forma atómica), pero es mucho más chico y rápido
+    de leer.
+    """
+
+    mode = "binario"
+
+    def load(self, lazy=False):
+        """Lanza BinaryFormatError si el archivo está truncado o dañado."""
+        try:
+            with open(self.filename, "rb") as file:
+                return normalize_data(decode(file.read()))
+        except FileNotFoundError:
+            return normalize_data({})
+        except BinaryFormatError:
+            raise
+        except (struct.error, ValueError, IndexError, OverflowError) as exc:
+            raise BinaryFormatError(f"archivo dañado ({exc})") from exc
+
+    def save(self, data):
+        temp_file = self.filename + ".tmp"
+        with open(temp_file, "wb") as file:
+            file.write(encode(data))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_file, self.filename)
+
+
+def storage_for_path(filename):
+    """Almacenamiento para escribir 'filename' según su extensión."""
+    if filename.lower().endswith(EXTENSION):
+        return BinaryStorage(filename)
+    return JsonStorage(filename)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m binario",
+                                     description="Convierte un proyecto entre JSON (.txt) y binario (.rtb).")
+    parser.add_argument("entrada", help="proyecto a convertir")
+    parser.add_argument("salida", help="archivo nuevo; el formato se elige por la extensión")
+    args = parser.parse_args(argv)
+
+    if os.path.abspath(args.entrada) == os.path.abspath(args.salida):
+        print("La entrada y la salida deben ser archivos distintos.", file=sys.stderr)
+        return 1
+    source = open_storage(args.entrada)
+    try:
+        data = source.load()
+    except BinaryFormatError as exc:
+        print(f"{args.entrada}: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        source.close()
+    if not data.get('project_name'):
+        print(f"{args.entrada}: no es un proyecto válido.", file=sys.stderr)
+        return 1
+    storage_for_path(args.salida).save(data)
+    before, after = os.path.getsize(args.entrada), os.path.getsize(args.salida)
+    print(f"{args.salida}: {len(data['activity_logs'])} registros, {len(data['defects'])} defectos, "
+          f"{before} -> {after} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
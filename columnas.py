@@ -0,0 +1,240 @@
+"""
+Representación columnar (NumPy) de los registros de actividad y de los defectos.
+
+En lugar de una lista de diccionarios con fechas y horas como texto, cada
+campo es un arreglo: inicio y fin en segundos desde la época, minutos en
+pausa y efectivos en int32 y la actividad como código entero. Las sumas por
+actividad o por periodo se hacen con operaciones vectorizadas.
+
+Los defectos se guardan igual: tipo, fase en que se encontró y fase en que
+se removió como códigos, y los minutos de compostura en int32 (métricas PSP
+en metricas.py).
+"""
+import numpy as np
+
+from proyecto import ACTIVITIES_LIST, DEFECT_TYPE_CODES, log_timestamps
+
+# Marca de inicio/fin desconocido (registro con fecha u hora inválida).
+MISSING_TIME = np.iinfo(np.int64).min
+
+
+class ActivityColumns:
+    """Columnas de los registros de actividad, con espacio de reserva para agregar."""
+
+    def __init__(self, capacity=1024):
+        capacity = max(capacity, 16)
+        self._size = 0
+        self._start = np.empty(capacity, dtype=np.int64)
+        self._end = np.empty(capacity, dtype=np.int64)
+        self._paused = np.empty(capacity, dtype=np.int32)
+        self._active = np.empty(capacity, dtype=np.int32)
+        self._activity = np.empty(capacity, dtype=np.int16)
+        # Las actividades conocidas tienen siempre los mismos códigos.
+        self.categories = list(ACTIVITIES_LIST)
+        self._codes = {name: code for code, name in enumerate(self.categories)}
+
+    @classmethod
+    def from_logs(cls, logs):
+        columns = cls(capacity=len(logs) * 2)
+        rows = [columns._row(log) for log in logs]
+        n = len(rows)
+        if n:
+            start, end, paused, active, activity = zip(*rows)
+            columns._start[:n] = start
+            columns._end[:n] = end
+            columns._paused[:n] = paused
+            columns._active[:n] = active
+            columns._activity[:n] = activity
+        columns._size = n
+        return columns
+
+    def _code(self, activity):
+        code = self._codes.get(activity)
+        if code is None:
+            code = self._codes[activity] = len(self.categories)
+            self.categories.append(activity)
+        return code
+
+    def _row(self, log):
+        stamps = log_timestamps(log)
+        if stamps is None:
+            start = end = MISSING_TIME
+        else:
+            start, end = stamps
+        return (start, end, log.get("tiempo_en_pausa_min") or 0, log.get("tiempo_no_pausado_min") or 0,
+                self._code(log.get("actividad", "")))
+
+    def append(self, log):
+        if self._size == len(self._start):
+            self._grow()
+        i = self._size
+        self._start[i], self._end[i], self._paused[i], self._active[i], self._activity[i] = self._row(log)
+        self._size += 1
+
+    def _grow(self):
+        capacity = len(self._start) * 2
+        for name in ("_start", "_end", "_paused", "_active", "_activity"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def copy(self):
+        """Copia independiente (para generar reportes en otro hilo)."""
+        columns = ActivityColumns(capacity=len(self._start))
+        for name in ("_start", "_end", "_paused", "_active", "_activity"):
+            getattr(columns, name)[:self._size] = getattr(self, name)[:self._size]
+        columns._size = self._size
+        columns.categories = list(self.categories)
+        columns._codes = dict(self._codes)
+        return columns
+
+    def __len__(self):
+        return self._size
+
+    # Vistas de solo lectura sobre la parte ocupada de cada columna.
+    @property
+    def start(self):
+        return self._start[:self._size]
+
+    @property
+    def end(self):
+        return self._end[:self._size]
+
+    @property
+    def paused(self):
+        return self._paused[:self._size]
+
+    @property
+    def active(self):
+        return self._active[:self._size]
+
+    @property
+    def activity(self):
+        return self._activity[:self._size]
+
+    # -------------------------------
+    # Consultas vectorizadas
+    # -------------------------------
+
+    def period_mask(self, start=None, end=None):
+        """Máscara de los registros que empiezan en [start, end) (datetime o None)."""
+        mask = self.start != MISSING_TIME
+        if start is not None:
+            mask &= self.start >= int(start.timestamp())
+        if end is not None:
+            mask &= self.start < int(end.timestamp())
+        return mask
+
+    def minutes_by_activity(self, mask=None):
+        """Minutos efectivos por actividad: {actividad: minutos}."""
+        codes, active = self.activity, self.active
+        if mask is not None:
+            codes, active = codes[mask], active[mask]
+        totals = np.bincount(codes, weights=active, minlength=len(self.categories))
+        return {name: int(totals[code]) for code, name in enumerate(self.categories) if totals[code]}
+
+    def sessions_by_activity(self, mask=None):
+        codes = self.activity if mask is None else self.activity[mask]
+        counts = np.bincount(codes, minlength=len(self.categories))
+        return {name: int(counts[code]) for code, name in enumerate(self.categories) if counts[code]}
+
+    def paused_total(self, mask=None):
+        paused = self.paused if mask is None else self.paused[mask]
+        return int(paused.sum(dtype=np.int64))
+
+    def active_total(self, mask=None):
+        active = self.active if mask is None else self.active[mask]
+        return int(active.sum(dtype=np.int64))
+
+
+class DefectColumns:
+    """Columnas de los defectos: tipo, fase encontrada, fase removida y minutos de compostura."""
+
+    def __init__(self, capacity=1024):
+        capacity = max(capacity, 16)
+        self._size = 0
+        self._type = np.empty(capacity, dtype=np.int16)
+        self._found = np.empty(capacity, dtype=np.int16)
+        self._removed = np.empty(capacity, dtype=np.int16)
+        self._fix = np.empty(capacity, dtype=np.int32)
+        # Los tipos y las fases conocidos tienen siempre los mismos códigos.
+        self.types = list(DEFECT_TYPE_CODES)
+        self._type_codes = {code: i for i, code in enumerate(self.types)}
+        self.phases = list(ACTIVITIES_LIST)
+        self._phase_codes = {name: i for i, name in enumerate(self.phases)}
+
+    @classmethod
+    def from_defects(cls, defects):
+        columns = cls(capacity=len(defects) * 2)
+        rows = [columns._row(defect) for defect in defects]
+        n = len(rows)
+        if n:
+            tipo, found, removed, fix = zip(*rows)
+            columns._type[:n] = tipo
+            columns._found[:n] = found
+            columns._removed[:n] = removed
+            columns._fix[:n] = fix
+        columns._size = n
+        return columns
+
+    @staticmethod
+    def _code(codes, names, value):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(names)
+            names.append(value)
+        return code
+
+    def _row(self, defect):
+        fix = defect.get("tiempo_compostura")
+        return (self._code(self._type_codes, self.types, str(defect.get("tipo", ""))),
+                self._code(self._phase_codes, self.phases, defect.get("encontrado") or ""),
+                self._code(self._phase_codes, self.phases, defect.get("removido") or ""),
+                fix if isinstance(fix, int) and not isinstance(fix, bool) else 0)
+
+    def append(self, defect):
+        if self._size == len(self._type):
+            self._grow()
+        i = self._size
+        self._type[i], self._found[i], self._removed[i], self._fix[i] = self._row(defect)
+        self._size += 1
+
+    def _grow(self):
+        capacity = len(self._type) * 2
+        for name in ("_type", "_found", "_removed", "_fix"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def copy(self):
+        """Copia independiente (para generar reportes en otro hilo)."""
+        columns = DefectColumns(capacity=len(self._type))
+        for name in ("_type", "_found", "_removed", "_fix"):
+            getattr(columns, name)[:self._size] = getattr(self, name)[:self._size]
+        columns._size = self._size
+        columns.types = list(self.types)
+        columns._type_codes = dict(self._type_codes)
+        columns.phases = list(self.phases)
+        columns._phase_codes = dict(self._phase_codes)
+        return columns
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def type(self):
+        return self._type[:self._size]
+
+    @property
+    def found(self):
+        return self._found[:self._size]
+
+    @property
+    def removed(self):
+        return self._removed[:self._size]
+
+    @property
+    def fix_minutes(self):
+        return self._fix[:self._size]
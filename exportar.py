@@ -0,0 +1,182 @@
+"""
+Exportación de los registros de actividad y de los defectos a CSV o JSONL.
+
+Las filas salen una por una de un generador y se escriben directamente en
+el archivo (comprimido con gzip si se pide), así que la memoria no crece con
+el tamaño de la historia: nunca se arma la salida completa. Se puede elegir
+qué columnas exportar y un periodo (los registros que empiezan en él, o los
+defectos con fecha en él). El archivo se escribe en un temporal que se mueve
+sobre el destino al terminar.
+
+El formato sale de la extensión (.csv, .jsonl, y .gz para comprimir).
+
+Uso:
+    python -m exportar proyecto.txt registros.csv
+    python -m exportar proyecto.txt defectos.jsonl.gz --tipo defectos
+    python -m exportar proyecto.txt semana.csv --desde 03/03/2025 --hasta 09/03/2025 \\
+        --columnas fecha_inicio actividad tiempo_no_pausado_min
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from basedatos import DEFECT_FIELDS, LOG_FIELDS
+from proyecto import Proyecto, parse_period
+
+KINDS = {"registros": ("activity_logs", LOG_FIELDS), "defectos": ("defects", DEFECT_FIELDS)}
+FORMATS = ("csv", "jsonl")
+# Cada cuántas filas se informa el avance.
+PROGRESS_EVERY = 10000
+GZIP_LEVEL = 1
+WRITE_BUFFER = 1 << 20
+
+
+def output_format(path):
+    """('csv' o 'jsonl', comprimido) según la extensión del archivo."""
+    name = path.lower()
+    compressed = name.endswith(".gz")
+    if compressed:
+        name = name[:-3]
+    for fmt in FORMATS:
+        if name.endswith("." + fmt):
+            return fmt, compressed
+    raise ValueError(f"{path}: la extensión debe ser .csv o .jsonl (con .gz opcional)")
+
+
+def _defect_date(defect):
+    try:
+        return datetime.strptime(defect.get("fecha") or "", "%d/%m/%Y")
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_records(proyecto, kind, start=None, end=None):
+    """
+    Genera los registros ('registros') o defectos ('defectos') del proyecto.
+    Con periodo, los registros salen en orden de inicio (del índice por
+    fecha) y los defectos en su orden, si su fecha cae en [start, end).
+    """
+    if kind == "registros":
+        logs = proyecto.activity_logs
+        if start is None and end is None:
+            yield from logs
+        else:
+            for position in proyecto.logs_in_period(start, end):
+                yield logs[position]
+        return
+    for defect in proyecto.defects:
+        if start is not None or end is not None:
+            date = _defect_date(defect)
+            if date is None or (start is not None and date < start) or (end is not None and date >= end):
+                continue
+        yield defect
+
+
+def _open_output(path, compressed):
+    if compressed:
+        # GzipFile comprime en cada write(); con un búfer grande delante se
+        # comprime por bloques, varias veces más rápido que fila por fila.
+        raw = gzip.GzipFile(path, "wb", compresslevel=GZIP_LEVEL)
+        return io.TextIOWrapper(io.BufferedWriter(raw, buffer_size=WRITE_BUFFER), encoding="utf-8", newline="")
+    return open(path, "w", encoding="utf-8", newline="", buffering=WRITE_BUFFER)
+
+
+def export(proyecto, path, kind="registros", columns=None, start=None, end=None, fmt=None, compressed=None,
+           progress=None):
+    """
+    Escribe los registros o defectos en 'path' y devuelve cuántas filas se
+    escribieron. 'columns' es la lista de claves a exportar: en CSV, por
+    omisión son las columnas normales (LOG_FIELDS o DEFECT_FIELDS); en JSONL,
+    por omisión se escribe cada registro completo. 'progress', si se da,
+    recibe progress(filas hechas, total o None, "filas").
+    """
+    if kind not in KINDS:
+        raise ValueError(f"tipo desconocido '{kind}' (debe ser {' o '.join(KINDS)})")
+    key, fields = KINDS[kind]
+    if columns:
+        unknown = [column for column in columns if column not in fields]
+        if unknown:
+            raise ValueError(f"columnas desconocidas: {', '.join(unknown)} (disponibles: {', '.join(fields)})")
+    if fmt is None or compressed is None:
+        detected, detected_compressed = output_format(path)
+        fmt = fmt or detected
+        compressed = detected_compressed if compressed is None else compressed
+
+    total = len(getattr(proyecto, key)) if start is None and end is None else None
+    temp_file = path + ".tmp"
+    written = 0
+    try:
+        with _open_output(temp_file, compressed) as file:
+            if fmt == "csv":
+                header = list(columns or fields)
+                writer = csv.writer(file)
+                writer.writerow(header)
+                write = lambda record: writer.writerow([record.get(column, "") for column in header])
+            else:
+                dumps = json.JSONEncoder(ensure_ascii=False).encode
+                if columns:
+                    write = lambda record: file.write(dumps({column: record.get(column) for column in columns}) + "\n")
+                else:
+                    write = lambda record: file.write(dumps(record) + "\n")
+            for record in iter_records(proyecto, kind, start, end):
+                write(record)
+                written += 1
+                if progress is not None and written % PROGRESS_EVERY == 0:
+                    progress(written, total, "filas")
+        if progress is not None:
+            progress(written, total, "filas")
+        os.replace(temp_file, path)
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m exportar",
+                                     description="Exporta los registros o defectos de un proyecto a CSV o JSONL.")
+    parser.add_argument("proyecto", help="archivo del proyecto (.txt, .rtb o .db)")
+    parser.add_argument("salida", help="archivo .csv o .jsonl (agregue .gz para comprimir)")
+    parser.add_argument("--tipo", choices=list(KINDS), default="registros", help="qué exportar")
+    parser.add_argument("--columnas", nargs="+", help="columnas a exportar, en ese orden")
+    parser.add_argument("--desde", help="primer día del periodo (dd/mm/aaaa)")
+    parser.add_argument("--hasta", help="último día del periodo (dd/mm/aaaa)")
+    parser.add_argument("--gzip", action="store_true", help="comprime aunque la salida no termine en .gz")
+    args = parser.parse_args(argv)
+
+    start = end = None
+    if args.desde or args.hasta:
+        if not (args.desde and args.hasta):
+            parser.error("--desde y --hasta se usan juntos")
+        try:
+            start, end = parse_period(args.desde, args.hasta)
+        except ValueError as exc:
+            parser.error(f"periodo inválido: {exc}")
+    try:
+        fmt, compressed = output_format(args.salida)
+    except ValueError as exc:
+        parser.error(str(exc))
+    proyecto = Proyecto.load(args.proyecto)
+    proyecto.close()
+    if not proyecto.project_name:
+        print(f"{args.proyecto}: no es un proyecto válido.", file=sys.stderr)
+        return 1
+    started = time.perf_counter()
+    try:
+        written = export(proyecto, args.salida, args.tipo, args.columnas, start, end,
+                         fmt=fmt, compressed=compressed or args.gzip)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    print(f"{args.salida}: {written} filas en {time.perf_counter() - started:.2f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
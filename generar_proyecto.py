@@ -0,0 +1,144 @@
+"""
+Generador de proyectos sintéticos para medir el rendimiento.
+
+Escribe un proyecto con el número de registros de actividad que se pida y
+los defectos correspondientes (DEFECTS_PER_LOG por registro, en promedio),
+con las actividades y los tipos de defecto reales. Los registros
+son jornadas de trabajo consecutivas: varias sesiones por día, con pausas,
+comentarios y las marcas ts_inicio/ts_fin que guarda la versión actual.
+La misma semilla genera siempre el mismo proyecto.
+
+El formato sale de la extensión: .txt (JSON), .rtb (binario) o .db (SQLite).
+
+Uso:
+    python -m generar_proyecto grande.txt --registros 100000
+    python -m generar_proyecto grande.rtb --registros 1000000 --semilla 7
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from almacenamiento import normalize_data
+from proyecto import ACTIVITIES_LIST, AggregateIndex, DEFECT_TYPE_CODES, formatear_fecha
+
+# Defectos por registro de actividad, en promedio.
+DEFECTS_PER_LOG = 0.1
+COMMENTS = ["", "Sin comentarios", "Continuación del día anterior", "Revisión con el equipo",
+            "Corrección de pruebas", "Ajustes al diseño", "Documentación pendiente",
+            "Interrupción por reunión", "Refactorización del módulo principal"]
+DEFECT_DESCRIPTIONS = ["Falta validar la entrada", "Nombre de variable incorrecto", "Ciclo fuera de rango",
+                       "Error de sintaxis", "Parámetro en el orden equivocado", "Falta documentar la función",
+                       "No se cierra el archivo", "Condición invertida"]
+
+
+def generate(log_count, defect_count=None, seed=0, start=datetime(2020, 1, 6, 8, 0)):
+    """Datos de un proyecto con 'log_count' registros de actividad."""
+    rng = random.Random(seed)
+    if defect_count is None:
+        defect_count = int(log_count * DEFECTS_PER_LOG)
+    logs = []
+    activities = {}
+    total_paused = 0
+    day = start
+    clock = day
+    sessions_left = rng.randint(3, 8)
+    for _ in range(log_count):
+        if sessions_left == 0:
+            day += timedelta(days=1)
+            clock = day + timedelta(minutes=rng.randint(0, 90))
+            sessions_left = rng.randint(3, 8)
+        sessions_left -= 1
+        activity = rng.choice(ACTIVITIES_LIST)
+        active = rng.randint(5, 120)
+        paused = rng.choice((0, 0, 0, rng.randint(1, 15)))
+        end = clock + timedelta(minutes=active + paused, seconds=rng.randint(0, 59))
+        logs.append({
+            "fecha_inicio": formatear_fecha(clock),
+            "hora_inicio": clock.strftime("%H:%M:%S"),
+            "hora_fin": end.strftime("%H:%M:%S"),
+            "ts_inicio": int(clock.timestamp()),
+            "ts_fin": int(end.timestamp()),
+            "tiempo_en_pausa_min": paused,
+            "tiempo_no_pausado_min": active,
+            "actividad": activity,
+            "comentarios": rng.choice(COMMENTS)
+        })
+        activities[activity] = activities.get(activity, 0) + active
+        total_paused += paused
+        clock = end + timedelta(minutes=rng.randint(0, 20))
+
+    defects = []
+    span_days = max(1, (day - start).days + 1)
+    for number in range(1, defect_count + 1):
+        found = rng.randrange(len(ACTIVITIES_LIST))
+        removed = rng.randrange(found, len(ACTIVITIES_LIST))
+        date = start + timedelta(days=span_days * (number - 1) // max(1, defect_count))
+        defects.append({
+            "fecha": date.strftime("%d/%m/%Y"),
+            "numero": str(number),
+            "tipo": rng.choice(DEFECT_TYPE_CODES),
+            "encontrado": ACTIVITIES_LIST[found],
+            "removido": ACTIVITIES_LIST[removed],
+            "tiempo_compostura": rng.randint(1, 60),
+            "defecto_arreglado": rng.choice(("X", "✓", "✓")),
+            "descripcion": rng.choice(DEFECT_DESCRIPTIONS)
+        })
+
+    # Mismo orden de claves que Proyecto.project_data(): los registros y los
+    # defectos al final, para que la carga diferida lea solo la cabecera.
+    return normalize_data({
+        'project_name': f"Proyecto sintético ({log_count} registros)",
+        'start_date': start.strftime("%d/%m/%Y"),
+        'student_name': "Alumno de prueba",
+        'instructor_name': "Instructor de prueba",
+        'activities': activities,
+        'total_paused_minutes': total_paused,
+        'aggregates': AggregateIndex.from_data({'activity_logs': logs, 'defects': defects}).to_dict(),
+        'activity_logs': logs,
+        'defects': defects,
+    })
+
+
+def storage_for(filename):
+    """Almacenamiento para escribir un proyecto nuevo según la extensión."""
+    if filename.lower().endswith(".db"):
+        from basedatos import SqliteStorage
+        return SqliteStorage(filename)
+    from binario import storage_for_path
+    return storage_for_path(filename)
+
+
+def write(filename, data):
+    """Escribe los datos en 'filename' (reemplaza el proyecto si ya existe)."""
+    for stale in (filename, filename + ".journal", filename + ".journal.compacting"):
+        if os.path.exists(stale):
+            os.remove(stale)
+    storage = storage_for(filename)
+    try:
+        storage.save(data)
+    finally:
+        storage.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m generar_proyecto",
+                                     description="Genera un proyecto sintético para medir el rendimiento.")
+    parser.add_argument("salida", help="archivo del proyecto (.txt, .rtb o .db)")
+    parser.add_argument("--registros", type=int, default=10000, help="número de registros de actividad")
+    parser.add_argument("--defectos", type=int, help=f"número de defectos (por defecto, {DEFECTS_PER_LOG:g} por registro)")
+    parser.add_argument("--semilla", type=int, default=0, help="semilla de los datos aleatorios")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    data = generate(args.registros, args.defectos, args.semilla)
+    write(args.salida, data)
+    print(f"{args.salida}: {len(data['activity_logs'])} registros, {len(data['defects'])} defectos, "
+          f"{os.path.getsize(args.salida)} bytes en {time.perf_counter() - started:.2f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
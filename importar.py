@@ -0,0 +1,268 @@
+"""
+Importación masiva de registros de actividad o de defectos desde CSV o JSONL.
+
+Para quien lleva sus tiempos en una hoja de cálculo: en lugar de capturar
+cada sesión con "Iniciar"/"Parar" y cada defecto con su formulario, se leen
+de un archivo con las mismas columnas que produce exportar.py.
+
+El archivo se lee fila por fila (un generador). Cada fila se valida: la actividad (y
+las fases de un defecto) deben estar en la lista de actividades, el tipo de
+defecto debe ser uno de los códigos "10" a "100" (o "10.- Documentación"),
+los minutos enteros no negativos y las fechas y horas válidas. Las filas
+válidas se normalizan al formato de la aplicación; las demás se informan con
+su número de línea y el motivo. Las filas válidas se conservan en memoria
+hasta el final (de todos modos van a quedar en el proyecto) y se agregan
+todas de una vez (Proyecto.import_records): los totales por actividad, el
+índice de totales y la numeración de los defectos se actualizan en la misma
+pasada y el proyecto se guarda con una sola escritura. Si el archivo no se
+puede leer completo, el proyecto no se modifica.
+
+Para los registros, la fecha puede ser "Lunes, 03 marzo 2025" o
+"03/03/2025" (fecha_inicio, hora_inicio y hora_fin), o bien las marcas
+ts_inicio y ts_fin en segundos desde la época.
+
+Uso:
+    python -m importar proyecto.txt registros.csv
+    python -m importar proyecto.txt defectos.jsonl --tipo defectos --rechazos rechazos.csv
+"""
+import argparse
+import csv
+import gzip
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+from proyecto import ACTIVITIES_LIST, DEFECT_TYPE_CODES, Proyecto, formatear_fecha, parse_log_times
+
+KINDS = ("registros", "defectos")
+FIXED_VALUES = ("X", "✓")
+
+
+class RowError(ValueError):
+    """Una fila no se puede importar; el mensaje es el motivo."""
+
+
+def _open_input(path):
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8-sig", newline="")
+
+
+def read_rows(path):
+    """
+    Genera (número de línea, fila) de un CSV (con encabezado) o un JSONL.
+    Una línea de JSONL que no es un objeto JSON se genera como (línea, RowError).
+    """
+    name = path.lower()[:-3] if path.lower().endswith(".gz") else path.lower()
+    if not name.endswith((".csv", ".jsonl")):
+        raise ValueError(f"{path}: la extensión debe ser .csv o .jsonl (con .gz opcional)")
+    with _open_input(path) as file:
+        if name.endswith(".csv"):
+            reader = csv.DictReader(file)
+            try:
+                for row in reader:
+                    yield reader.line_num, row
+            except csv.Error as exc:
+                raise ValueError(f"{path}: CSV inválido en la línea {reader.line_num}: {exc}") from None
+        else:
+            for line_number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield line_number, RowError(f"JSON inválido: {exc.msg}")
+                    continue
+                if not isinstance(row, dict):
+                    row = RowError("la línea no es un objeto JSON")
+                yield line_number, row
+
+
+def _text(row, key, default=None):
+    value = row.get(key)
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if default is None:
+            raise RowError(f"falta '{key}'")
+        return default
+    return value.strip() if isinstance(value, str) else value
+
+
+def _string(row, key, default=None):
+    value = _text(row, key, default)
+    if not isinstance(value, str):
+        raise RowError(f"'{key}' debe ser texto ({value!r})")
+    return value
+
+
+def _minutes(row, key, default=None):
+    value = _text(row, key, default)
+    if isinstance(value, str) and value.isdigit():
+        value = int(value)
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise RowError(f"'{key}' no es un número de minutos válido ({value!r})")
+    return value
+
+
+def _stamp(value):
+    if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+        return int(value)
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def _log_times(row):
+    """(inicio, fin) como datetime a partir de las marcas o de la fecha y las horas."""
+    start, end = _stamp(row.get("ts_inicio")), _stamp(row.get("ts_fin"))
+    if start is not None and end is not None:
+        if end < start:
+            raise RowError("'ts_fin' es anterior a 'ts_inicio'")
+        try:
+            return datetime.fromtimestamp(start), datetime.fromtimestamp(end)
+        except (ValueError, OverflowError, OSError):
+            raise RowError(f"marcas fuera de rango ({start}, {end})") from None
+    fecha = _string(row, "fecha_inicio")
+    hora_inicio, hora_fin = _string(row, "hora_inicio"), _string(row, "hora_fin")
+    times = parse_log_times({"fecha_inicio": fecha, "hora_inicio": hora_inicio, "hora_fin": hora_fin})
+    if times is not None:
+        return times
+    try:
+        date = datetime.strptime(fecha, "%d/%m/%Y")
+        start = datetime.combine(date, datetime.strptime(hora_inicio, "%H:%M:%S").time())
+        end = datetime.combine(date, datetime.strptime(hora_fin, "%H:%M:%S").time())
+    except ValueError:
+        raise RowError(f"fecha u hora inválida ('{fecha}', '{hora_inicio}', '{hora_fin}')") from None
+    if end < start:
+        end += timedelta(days=1)
+    return start, end
+
+
+def validate_log(row, activities=ACTIVITIES_LIST):
+    """Registro de actividad normalizado (como los de Proyecto.record_activity) o RowError."""
+    activity = _text(row, "actividad")
+    if activity not in activities:
+        raise RowError(f"actividad desconocida '{activity}'")
+    start, end = _log_times(row)
+    return {
+        "fecha_inicio": formatear_fecha(start),
+        "hora_inicio": start.strftime("%H:%M:%S"),
+        "hora_fin": end.strftime("%H:%M:%S"),
+        "ts_inicio": int(start.timestamp()),
+        "ts_fin": int(end.timestamp()),
+        "tiempo_en_pausa_min": _minutes(row, "tiempo_en_pausa_min", 0),
+        "tiempo_no_pausado_min": _minutes(row, "tiempo_no_pausado_min"),
+        "actividad": activity,
+        "comentarios": str(_text(row, "comentarios", "")),
+    }
+
+
+def validate_defect(row, activities=ACTIVITIES_LIST):
+    """
+    Defecto normalizado (como los del formulario) o RowError. El número se
+    asigna al importarlo (Proyecto.import_records); el del archivo se ignora.
+    """
+    fecha = _string(row, "fecha")
+    try:
+        datetime.strptime(fecha, "%d/%m/%Y")
+    except ValueError:
+        raise RowError(f"fecha inválida '{fecha}' (se espera dd/mm/aaaa)") from None
+    tipo = str(_text(row, "tipo")).split(".-")[0].strip()
+    if tipo not in DEFECT_TYPE_CODES:
+        raise RowError(f"tipo de defecto desconocido '{tipo}'")
+    found = _text(row, "encontrado")
+    if found not in activities:
+        raise RowError(f"actividad desconocida '{found}' en 'encontrado'")
+    removed = _text(row, "removido", "")
+    if removed and removed not in activities:
+        raise RowError(f"actividad desconocida '{removed}' en 'removido'")
+    fixed = _text(row, "defecto_arreglado", "X")
+    if fixed not in FIXED_VALUES:
+        raise RowError(f"'defecto_arreglado' debe ser {' o '.join(FIXED_VALUES)} ({fixed!r})")
+    return {
+        "fecha": fecha,
+        "numero": "",
+        "tipo": tipo,
+        "encontrado": found,
+        "removido": removed,
+        "tiempo_compostura": _minutes(row, "tiempo_compostura", 0),
+        "defecto_arreglado": fixed,
+        "descripcion": str(_text(row, "descripcion", "")),
+    }
+
+
+def import_file(proyecto, path, kind="registros", activities=ACTIVITIES_LIST):
+    """
+    Lee, valida e importa el archivo en el proyecto. Devuelve
+    {'read', 'imported', 'rejected': [(línea, motivo, fila)]}. Si ninguna
+    fila es válida, el proyecto no se modifica ni se guarda. Un valor
+    inesperado en una fila solo rechaza esa fila; un archivo que no se puede
+    leer lanza OSError o ValueError.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"tipo desconocido '{kind}' (debe ser {' o '.join(KINDS)})")
+    validate = validate_log if kind == "registros" else validate_defect
+    accepted, rejected = [], []
+    read = 0
+    for line_number, row in read_rows(path):
+        read += 1
+        try:
+            if isinstance(row, RowError):
+                raise row
+            accepted.append(validate(row, activities))
+        except RowError as exc:
+            rejected.append((line_number, str(exc), row if isinstance(row, dict) else None))
+        except (TypeError, ValueError, OverflowError, OSError) as exc:
+            rejected.append((line_number, f"valor inválido: {exc}", row))
+    if accepted:
+        if kind == "registros":
+            proyecto.import_records(logs=accepted)
+        else:
+            proyecto.import_records(defects=accepted)
+    return {'read': read, 'imported': len(accepted), 'rejected': rejected}
+
+
+def write_rejected(path, rejected):
+    """Guarda las filas rechazadas en un CSV: línea, motivo y la fila original en JSON."""
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["linea", "motivo", "fila"])
+        for line_number, reason, row in rejected:
+            writer.writerow([line_number, reason, "" if row is None else json.dumps(row, ensure_ascii=False)])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m importar",
+                                     description="Importa registros o defectos de un CSV o JSONL a un proyecto.")
+    parser.add_argument("proyecto", help="archivo del proyecto (.txt, .rtb o .db)")
+    parser.add_argument("entrada", help="archivo .csv o .jsonl (con .gz opcional)")
+    parser.add_argument("--tipo", choices=KINDS, default="registros", help="qué contiene el archivo")
+    parser.add_argument("--rechazos", help="guarda aquí (CSV) las filas rechazadas")
+    args = parser.parse_args(argv)
+
+    proyecto = Proyecto.load(args.proyecto)
+    started = time.perf_counter()
+    try:
+        if not proyecto.project_name:
+            print(f"{args.proyecto}: no es un proyecto válido.", file=sys.stderr)
+            return 1
+        try:
+            result = import_file(proyecto, args.entrada, args.tipo)
+        except (OSError, ValueError) as exc:
+            print(exc, file=sys.stderr)
+            return 1
+    finally:
+        proyecto.close()
+
+    print(f"{args.entrada}: {result['read']} filas leídas, {result['imported']} importadas, "
+          f"{len(result['rejected'])} rechazadas en {time.perf_counter() - started:.2f} s")
+    for line_number, reason, _ in result['rejected'][:20]:
+        print(f"  línea {line_number}: {reason}")
+    if len(result['rejected']) > 20:
+        print(f"  ... y {len(result['rejected']) - 20} más")
+    if args.rechazos and result['rejected']:
+        write_rejected(args.rechazos, result['rejected'])
+        print(f"Filas rechazadas en {args.rechazos}")
+    return 1 if result['rejected'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
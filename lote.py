@@ -0,0 +1,178 @@
+"""
+Procesamiento por lotes de proyectos, sin interfaz gráfica.
+
+Valida cada proyecto y genera sus dos PDF (actividades y defectos),
+repartiendo los proyectos entre varios procesos. Se informa el tiempo de
+cada archivo y los que fallaron. Los proyectos que no cambiaron desde su
+último reporte se omiten: en el directorio de salida se guarda
+.lote_estado.json con la fecha de modificación y el tamaño de cada
+proyecto (y de su diario, si lo tiene) al generar sus PDF.
+
+Uso:
+    python -m lote proyectos/ --salida reportes/
+    python -m lote "proyectos/*.txt" --procesos 8
+    python -m lote proyectos/ --validar
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from almacenamiento import JournalStorage
+from basedatos import database_path
+from proyecto import Proyecto
+
+STATE_FILE = ".lote_estado.json"
+# Extensiones de los proyectos que se buscan dentro de un directorio.
+PROJECT_EXTENSIONS = (".txt", ".rtb", ".db")
+
+
+def find_projects(paths):
+    """Expande directorios y patrones (*.txt, *.rtb, *.db) a la lista ordenada de proyectos."""
+    projects = []
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(os.listdir(path))
+            present = set(names)
+            for name in names:
+                stem, extension = os.path.splitext(name)
+                # Un .db junto a su .txt es el mismo proyecto ya migrado a SQLite.
+                if extension == ".db" and stem + ".txt" in present:
+                    continue
+                if extension in PROJECT_EXTENSIONS:
+                    projects.append(os.path.join(path, name))
+        elif glob.has_magic(path):
+            projects.extend(sorted(glob.glob(path)))
+        else:
+            projects.append(path)
+    return projects
+
+
+def fingerprint(path):
+    """Fecha de modificación y tamaño del proyecto y de su diario o base de datos, si existen."""
+    result = []
+    candidates = [path, path + JournalStorage.suffix, path + JournalStorage.compacting_suffix]
+    if database_path(path) != path:
+        candidates.append(database_path(path))
+    for candidate in candidates:
+        try:
+            stat = os.stat(candidate)
+        except FileNotFoundError:
+            continue
+        result.append([os.path.basename(candidate), stat.st_mtime_ns, stat.st_size])
+    return result
+
+
+def report_paths(path, output_dir):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return (os.path.join(output_dir, f"{stem}_actividades.pdf"),
+            os.path.join(output_dir, f"{stem}_defectos.pdf"))
+
+
+def load_state(output_dir):
+    try:
+        with open(os.path.join(output_dir, STATE_FILE), "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_state(output_dir, state):
+    with open(os.path.join(output_dir, STATE_FILE), "w", encoding="utf-8") as file:
+        json.dump(state, file, indent=4, ensure_ascii=False)
+
+
+def process_project(path, output_dir, validate_only=False):
+    """
+    Carga, valida y genera los reportes de un proyecto. Se ejecuta en un
+    proceso del grupo, así que solo recibe y devuelve datos simples.
+    """
+    started = time.perf_counter()
+    proyecto = Proyecto.load(path)
+    proyecto.close()
+    if not proyecto.project_name:
+        raise ValueError("no es un proyecto válido (no tiene nombre)")
+    result = {
+        'path': path,
+        'problems': proyecto.validate(),
+        'minutes': proyecto.time_summary()['total_minutes'],
+        'logs': len(proyecto.activity_logs),
+        'defects': len(proyecto.defects),
+        'by_type': {code: n for code, n in proyecto.defect_summary()['by_type'].items() if n},
+    }
+    if not validate_only:
+        # Se importa aquí para que --validar no necesite matplotlib ni ReportLab.
+        import reportes
+        pdf_file, defects_pdf_file = report_paths(path, output_dir)
+        reportes.produce_pdf(proyecto, pdf_file)
+        reportes.produce_defects_pdf(proyecto, defects_pdf_file)
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m lote",
+                                     description="Valida y genera los reportes de varios proyectos.")
+    parser.add_argument("rutas", nargs="+", help="directorios, patrones o archivos de proyecto (.txt, .rtb o .db)")
+    parser.add_argument("--salida", help="directorio para los PDF (por defecto, junto a cada proyecto)")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count(), help="número de procesos")
+    parser.add_argument("--forzar", action="store_true", help="regenera aunque el proyecto no haya cambiado")
+    parser.add_argument("--validar", action="store_true", help="solo valida y resume, sin generar PDF")
+    args = parser.parse_args(argv)
+
+    if args.salida:
+        os.makedirs(args.salida, exist_ok=True)
+
+    def output_dir_for(path):
+        return args.salida or os.path.dirname(path) or "."
+
+    # Proyectos que no cambiaron desde su último reporte.
+    states = {}
+    pending, skipped = [], 0
+    for path in find_projects(args.rutas):
+        output_dir = output_dir_for(path)
+        state = states.setdefault(output_dir, load_state(output_dir))
+        key = os.path.abspath(path)
+        if not (args.validar or args.forzar) and state.get(key) == fingerprint(path) \
+                and all(os.path.exists(p) for p in report_paths(path, output_dir)):
+            skipped += 1
+            print(f"OMITIDO {path}: sin cambios desde el último reporte")
+            continue
+        pending.append((path, fingerprint(path)))
+
+    started = time.perf_counter()
+    done = failures = 0
+    with ProcessPoolExecutor(max_workers=args.procesos) as pool:
+        futures = {pool.submit(process_project, path, output_dir_for(path), args.validar): (path, stamp)
+                   for path, stamp in pending}
+        for future in as_completed(futures):
+            path, stamp = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:
+                failures += 1
+                print(f"ERROR {path}: {exc}", file=sys.stderr)
+                continue
+            done += 1
+            print(f"{path}: {result['seconds']:.2f} s, {result['minutes']} min efectivos, "
+                  f"{result['logs']} registros, {result['defects']} defectos")
+            if result['by_type']:
+                print("  defectos por tipo: " + ", ".join(f"{code}: {n}" for code, n in result['by_type'].items()))
+            for problem in result['problems']:
+                print(f"  - {problem}")
+            if not args.validar:
+                states[output_dir_for(path)][os.path.abspath(path)] = stamp
+
+    if not args.validar:
+        for output_dir, state in states.items():
+            save_state(output_dir, state)
+    print(f"{done} procesados, {skipped} omitidos, {failures} con error en "
+          f"{time.perf_counter() - started:.2f} s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Mide el costo de importar la aplicación y falla si vuelve a subir.
+
+Importa RegistroTiempo en un intérprete limpio (con -X importtime) y
+comprueba que:
+- no se cargan matplotlib, ReportLab ni NumPy al arrancar, y
+- el tiempo acumulado de importación no pasa del límite (en segundos).
+
+Uso:
+    python -m medir_arranque [--limite 0.5]
+
+Devuelve 0 si todo está bien y 1 si el arranque se volvió a hacer pesado.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Módulos que solo deben cargarse al dibujar gráficas o generar PDF.
+HEAVY_MODULES = ("matplotlib", "reportlab", "numpy")
+DEFAULT_LIMIT = 0.5
+
+PROBE = (
+    "import sys, RegistroTiempo; "
+    "print(','.join(sorted({m.split('.')[0] for m in sys.modules})))"
+)
+
+
+def measure_startup():
+    """Devuelve (segundos de importación, conjunto de paquetes cargados)."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=here, capture_output=True, text=True, check=True
+    )
+    # Cada línea de -X importtime es "import time: self | cumulative | módulo";
+    # el costo total es la suma de los acumulados de los módulos de primer nivel.
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith(" " * 2):
+            total_us += int(cumulative)
+    loaded = set(result.stdout.strip().split(","))
+    return total_us / 1e6, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m medir_arranque",
+                                     description="Mide el tiempo de importación de RegistroTiempo.")
+    parser.add_argument("--limite", type=float, default=DEFAULT_LIMIT,
+                        help=f"tiempo máximo de importación en segundos (por defecto {DEFAULT_LIMIT})")
+    args = parser.parse_args(argv)
+
+    seconds, loaded = measure_startup()
+    heavy = sorted(loaded.intersection(HEAVY_MODULES))
+    print(f"Importación de RegistroTiempo: {seconds:.3f} s (límite {args.limite:.3f} s)")
+    failed = False
+    if heavy:
+        print(f"FALLA: se cargan al arrancar: {', '.join(heavy)}")
+        failed = True
+    if seconds > args.limite:
+        print("FALLA: el arranque supera el límite.")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
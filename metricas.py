@@ -0,0 +1,226 @@
+"""
+Métricas de proceso PSP de un proyecto.
+
+Se calculan con operaciones vectorizadas (NumPy) sobre las columnas de los
+registros y de los defectos (Proyecto.columns y Proyecto.defect_columns,
+ver columnas.py), que se mantienen al día con cada registro nuevo; así se
+pueden recalcular al instante aunque la historia sea muy grande.
+
+- Tiempo en cada fase y su porcentaje del total.
+- Defectos inyectados (campo 'encontrado') y removidos ('removido') por
+  fase, y por hora de trabajo en esa fase.
+- Defectos por hora del proyecto.
+- Rendimiento (yield) del proceso: de los defectos inyectados antes de
+  las pruebas (en PRE_TEST_PHASES), el porcentaje que también se removió
+  antes de las pruebas. Los que siguen sin remover cuentan como escapados.
+- Tiempos de compostura: estadísticas, histograma y resumen por tipo.
+- Revisiones: minutos de revisión por minuto de codificación, defectos
+  removidos por hora de revisión y de prueba, y la razón entre ambos
+  (palanca de remoción de defectos). El proyecto no registra líneas de
+  código, así que la tasa de revisión se mide contra el tiempo de
+  codificación en lugar de contra LOC/hora.
+
+Este módulo importa NumPy; la ventana y los reportes lo cargan al usarlo.
+"""
+import numpy as np
+
+from proyecto import ACTIVITIES_LIST, DEFECT_TYPES, DEFECT_TYPE_CODES
+
+REVIEW_PHASES = ("Revisión del código", "Evaluación del código")
+CODING_PHASE = "Codificar"
+TEST_PHASES = ("Testear",)
+# Fases que van antes de las pruebas: todas salvo las de prueba y el
+# lanzamiento (lo que se remueve al liberar no se encontró antes de probar).
+PRE_TEST_PHASES = tuple(phase for phase in ACTIVITIES_LIST if phase not in TEST_PHASES + ("Lanzamiento",))
+# Límites inferiores (en minutos) de los grupos del histograma de compostura.
+FIX_TIME_EDGES = (1, 5, 10, 30, 60)
+FIX_TIME_LABELS = ("< 1", "1 - 4", "5 - 9", "10 - 29", "30 - 59", "60 o más")
+
+
+def _per_hour(counts, minutes):
+    """counts / horas, con NaN donde no hay tiempo registrado."""
+    hours = minutes / 60.0
+    return np.divide(counts, hours, out=np.full(len(counts), np.nan), where=hours > 0)
+
+
+def _group_stats(keys, values, groups):
+    """
+    Número, total, media, mediana y máximo de 'values' por cada clave en
+    range(groups), con un solo ordenamiento en lugar de un ciclo por grupo.
+    """
+    counts = np.bincount(keys, minlength=groups)[:groups]
+    totals = np.bincount(keys, weights=values, minlength=groups)[:groups]
+    order = np.lexsort((values, keys))
+    sorted_keys, sorted_values = keys[order], values[order]
+    codes = np.arange(groups)
+    first = np.searchsorted(sorted_keys, codes, side="left")
+    last = np.searchsorted(sorted_keys, codes, side="right")
+    present = counts > 0
+    lower = np.where(present, (first + last - 1) // 2, 0)
+    upper = np.where(present, (first + last) // 2, 0)
+    if len(sorted_values):
+        medians = np.where(present, (sorted_values[lower] + sorted_values[np.minimum(upper, len(sorted_values) - 1)]) / 2, np.nan)
+        maxima = np.where(present, sorted_values[np.maximum(last - 1, 0)], 0)
+    else:
+        medians = np.full(groups, np.nan)
+        maxima = np.zeros(groups)
+    means = np.divide(totals, counts, out=np.full(groups, np.nan), where=present)
+    return counts, totals, means, medians, maxima
+
+
+def compute(proyecto):
+    """Calcula las métricas PSP del proyecto completo; devuelve un diccionario de valores simples."""
+    logs = proyecto.columns
+    defects = proyecto.defect_columns
+    phases = list(ACTIVITIES_LIST)
+    n_phases = len(phases)
+
+    all_minutes = np.bincount(logs.activity, weights=logs.active, minlength=len(logs.categories))
+    minutes = all_minutes[:n_phases]
+    total_minutes = float(all_minutes.sum())
+    time_share = minutes * 100.0 / total_minutes if total_minutes else np.zeros(n_phases)
+
+    injected = np.bincount(defects.found, minlength=len(defects.phases))[:n_phases]
+    removed_all = np.bincount(defects.removed, minlength=len(defects.phases))
+    removed = removed_all[:n_phases]
+
+    phase_code = {name: code for code, name in enumerate(phases)}
+    test_codes = [phase_code[name] for name in TEST_PHASES]
+    review_codes = [phase_code[name] for name in REVIEW_PHASES]
+    removed_in_test = int(removed[test_codes].sum())
+    # Yield: inyectados antes de probar y removidos también antes de probar.
+    pre_test = np.zeros(len(defects.phases), dtype=bool)
+    pre_test[[phase_code[name] for name in PRE_TEST_PHASES]] = True
+    injected_before = pre_test[defects.found]
+    injected_before_test = int(injected_before.sum())
+    removed_before_test = int((injected_before & pre_test[defects.removed]).sum())
+    total_defects = len(defects)
+    total_hours = total_minutes / 60.0
+
+    review_minutes = float(minutes[review_codes].sum())
+    test_minutes = float(minutes[test_codes].sum())
+    coding_minutes = float(minutes[phase_code[CODING_PHASE]])
+    removed_in_review = int(removed[review_codes].sum())
+    review_rate = removed_in_review * 60.0 / review_minutes if review_minutes else None
+    test_rate = removed_in_test * 60.0 / test_minutes if test_minutes else None
+
+    fix = defects.fix_minutes.astype(np.float64)
+    histogram = np.bincount(np.digitize(fix, FIX_TIME_EDGES), minlength=len(FIX_TIME_LABELS))
+    n_types = len(DEFECT_TYPE_CODES)
+    type_count, type_total, type_mean, type_median, type_max = _group_stats(
+        defects.type.astype(np.intp), fix, n_types)
+    phase_count, phase_total, phase_mean, phase_median, _ = _group_stats(
+        defects.removed.astype(np.intp), fix, n_phases)
+
+    def values(array):
+        return [None if np.isnan(value) else float(value) for value in np.asarray(array, dtype=np.float64)]
+
+    return {
+        'phases': phases,
+        'minutes': [int(m) for m in minutes],
+        'time_share': values(time_share),
+        'injected': [int(n) for n in injected],
+        'removed': [int(n) for n in removed],
+        'injected_per_hour': values(_per_hour(injected, minutes)),
+        'removed_per_hour': values(_per_hour(removed, minutes)),
+        'total_minutes': int(total_minutes),
+        'total_defects': total_defects,
+        'defects_per_hour': total_defects / total_hours if total_hours else None,
+        'yield': removed_before_test * 100.0 / injected_before_test if injected_before_test else None,
+        'injected_before_test': injected_before_test,
+        'removed_before_test': removed_before_test,
+        'removed_in_test': removed_in_test,
+        'fix': {
+            'count': total_defects,
+            'total': int(fix.sum()),
+            'mean': float(fix.mean()) if total_defects else None,
+            'median': float(np.median(fix)) if total_defects else None,
+            'p90': float(np.percentile(fix, 90)) if total_defects else None,
+            'max': int(fix.max()) if total_defects else None,
+            'histogram': [int(n) for n in histogram],
+        },
+        'fix_by_type': {
+            'types': list(DEFECT_TYPES),
+            'count': [int(n) for n in type_count],
+            'total': [int(n) for n in type_total],
+            'mean': values(type_mean),
+            'median': values(type_median),
+            'max': [int(n) for n in type_max],
+        },
+        'fix_by_phase': {
+            'count': [int(n) for n in phase_count],
+            'mean': values(phase_mean),
+            'median': values(phase_median),
+        },
+        'review': {
+            'review_minutes': int(review_minutes),
+            'coding_minutes': int(coding_minutes),
+            'review_to_coding': review_minutes / coding_minutes if coding_minutes else None,
+            'removed_in_review': removed_in_review,
+            'review_defects_per_hour': review_rate,
+            'test_defects_per_hour': test_rate,
+            'removal_leverage': review_rate / test_rate if review_rate is not None and test_rate else None,
+        },
+    }
+
+
+# -------------------------------
+# Tablas de texto (ventana y PDF)
+# -------------------------------
+
+def _number(value, decimals=2, suffix=""):
+    return "-" if value is None else f"{value:.{decimals}f}{suffix}"
+
+
+PHASE_HEADERS = ["Fase", "Minutos", "% del tiempo", "Inyectados", "Removidos", "Inyect./hora",
+                 "Remov./hora", "Compostura media (min)"]
+
+
+def phase_rows(metrics):
+    """Una fila por fase con tiempo, defectos y tasas."""
+    return [
+        [phase, str(metrics['minutes'][i]), _number(metrics['time_share'][i], 1, "%"),
+         str(metrics['injected'][i]), str(metrics['removed'][i]),
+         _number(metrics['injected_per_hour'][i]), _number(metrics['removed_per_hour'][i]),
+         _number(metrics['fix_by_phase']['mean'][i], 1)]
+        for i, phase in enumerate(metrics['phases'])
+    ]
+
+
+FIX_TYPE_HEADERS = ["Tipo", "Defectos", "Minutos", "Media (min)", "Mediana (min)", "Máximo (min)"]
+
+
+def fix_type_rows(metrics):
+    by_type = metrics['fix_by_type']
+    return [
+        [tipo, str(by_type['count'][i]), str(by_type['total'][i]), _number(by_type['mean'][i], 1),
+         _number(by_type['median'][i], 1), str(by_type['max'][i]) if by_type['count'][i] else "-"]
+        for i, tipo in enumerate(by_type['types'])
+    ]
+
+
+FIX_HISTOGRAM_HEADERS = ["Compostura (min)", "Defectos"]
+
+
+def fix_histogram_rows(metrics):
+    return [[label, str(n)] for label, n in zip(FIX_TIME_LABELS, metrics['fix']['histogram'])]
+
+
+def summary_lines(metrics):
+    """(etiqueta, valor) de las métricas generales del proyecto."""
+    fix, review = metrics['fix'], metrics['review']
+    return [
+        ("Tiempo total", f"{metrics['total_minutes']} min"),
+        ("Defectos", str(metrics['total_defects'])),
+        ("Defectos por hora", _number(metrics['defects_per_hour'])),
+        ("Rendimiento (yield)", _number(metrics['yield'], 1, "%")
+         + f" ({metrics['removed_before_test']} de {metrics['injected_before_test']} inyectados antes de probar"
+           f" se removieron antes de probar; {metrics['removed_in_test']} removidos en pruebas)"),
+        ("Compostura", f"media {_number(fix['mean'], 1)} min, mediana {_number(fix['median'], 1)} min, "
+                       f"p90 {_number(fix['p90'], 1)} min, máximo {fix['max'] if fix['max'] is not None else '-'} min"),
+        ("Revisión / codificación", _number(review['review_to_coding'])
+         + f" ({review['review_minutes']} min de revisión, {review['coding_minutes']} min de codificación)"),
+        ("Defectos por hora de revisión", _number(review['review_defects_per_hour'])),
+        ("Defectos por hora de prueba", _number(review['test_defects_per_hour'])),
+        ("Palanca de remoción (revisión / prueba)", _number(review['removal_leverage'])),
+    ]
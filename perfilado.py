@@ -0,0 +1,123 @@
+"""
+Medición de tiempos de las operaciones de la aplicación.
+
+Se activa con la variable de entorno REGISTRO_PERFIL:
+    REGISTRO_PERFIL=1              mide y al salir guarda registro_perfil.json
+    REGISTRO_PERFIL=perfil.json    mide y al salir guarda en ese archivo
+
+Las funciones marcadas con @timed() registran cuántas veces se llamaron y
+cuánto tardó cada llamada. La ventana muestra los percentiles en el panel
+"Perfil" (solo aparece con la medición activa) y el archivo JSON tiene lo
+mismo para compararlo entre versiones.
+
+Sin la variable, timed() devuelve la función original sin envolver, así que
+no cuesta nada. Por eso la variable se lee una sola vez, al importar.
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+SETTING = os.environ.get("REGISTRO_PERFIL", "")
+ENABLED = SETTING not in ("", "0")
+DEFAULT_DUMP_FILE = "registro_perfil.json"
+DUMP_FILE = SETTING if SETTING.lower().endswith(".json") else DEFAULT_DUMP_FILE
+# Duraciones que se conservan por operación para los percentiles.
+MAX_SAMPLES = 10000
+PERCENTILES = (50, 90, 99)
+
+_lock = threading.Lock()
+_samples = {}
+_counts = {}
+_totals = {}
+
+
+def record(name, seconds):
+    """Registra una duración (en segundos) para la operación 'name'."""
+    with _lock:
+        samples = _samples.get(name)
+        if samples is None:
+            samples = _samples[name] = deque(maxlen=MAX_SAMPLES)
+            _counts[name] = 0
+            _totals[name] = 0.0
+        samples.append(seconds)
+        _counts[name] += 1
+        _totals[name] += seconds
+
+
+def timed(name=None):
+    """
+    Decorador que mide cada llamada. El nombre por omisión es
+    Clase.método o módulo.función.
+    """
+    def decorate(function):
+        if not ENABLED:
+            return function
+        label = name or (function.__qualname__ if "." in function.__qualname__
+                         else f"{function.__module__}.{function.__name__}")
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(label, time.perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+def percentile(ordered, p):
+    """Percentil p (0-100) de una lista ordenada, por rango más cercano."""
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-p * len(ordered) // 100))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summary():
+    """
+    {operación: {'count', 'total', 'mean', 'p50', 'p90', 'p99', 'max'}} en
+    segundos; los percentiles se calculan con las últimas MAX_SAMPLES llamadas.
+    """
+    with _lock:
+        snapshot = {name: (sorted(samples), _counts[name], _totals[name]) for name, samples in _samples.items()}
+    result = {}
+    for name, (ordered, count, total) in sorted(snapshot.items()):
+        entry = {'count': count, 'total': total, 'mean': total / count}
+        for p in PERCENTILES:
+            entry[f'p{p}'] = percentile(ordered, p)
+        entry['max'] = ordered[-1]
+        result[name] = entry
+    return result
+
+
+def dump(filename=None):
+    """Guarda el resumen en JSON y devuelve la ruta del archivo."""
+    filename = filename or DUMP_FILE
+    with open(filename, "w", encoding="utf-8") as file:
+        json.dump({'generated': time.strftime("%Y-%m-%dT%H:%M:%S"), 'operations': summary()},
+                  file, indent=4, ensure_ascii=False)
+    return filename
+
+
+def reset():
+    with _lock:
+        _samples.clear()
+        _counts.clear()
+        _totals.clear()
+
+
+def _dump_at_exit():
+    if _samples:
+        try:
+            dump()
+        except OSError:
+            pass
+
+
+if ENABLED:
+    atexit.register(_dump_at_exit)
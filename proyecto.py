@@ -0,0 +1,613 @@
+"""
+Modelo de un proyecto del Registro de Tiempo, independiente de Tk.
+
+Carga, valida y suma los datos de un proyecto sin necesitar pantalla ni
+diálogos, de modo que lo pueden usar tanto la ventana (RegistroTiempo.py)
+como los procesos por lotes (lote.py).
+"""
+import bisect
+import threading
+from datetime import datetime, timedelta
+
+from almacenamiento import BackgroundWriter, JsonStorage, open_storage
+from perfilado import timed
+
+ACTIVITIES_LIST = ["Analizar", "Planificar", "Codificar", "Testear",
+                   "Evaluación del código", "Revisión del código", "Lanzamiento",
+                   "Diagramar", "Reunión"]
+
+DEFECT_TYPES = ["10.- Documentación", "20.- Sintáxis", "30.- Construcción, Empacar", "40.- Asignación",
+                "50.- Interfaz", "60.- Chequeo", "70.- Datos", "80.- Función", "90.- Sistema", "100.- Ambiente"]
+
+# Solo el número de cada tipo de defecto ("10", "20", ..., "100").
+DEFECT_TYPE_CODES = [tipo.split('.-')[0].strip() for tipo in DEFECT_TYPES]
+
+DIAS_SEMANA = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+MESES = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto",
+         "septiembre", "octubre", "noviembre", "diciembre"]
+
+
+def _add(counter, key, amount=1):
+    counter[key] = counter.get(key, 0) + amount
+
+
+class AggregateIndex:
+    """
+    Totales del proyecto que se actualizan en O(1) con cada registro nuevo.
+
+    Se guarda en el archivo del proyecto (clave 'aggregates') junto con el
+    número de registros y defectos que ya incluye; al abrir el proyecto solo
+    se procesan los registros que hayan llegado después (por ejemplo, desde
+    el diario), nunca toda la historia.
+    """
+
+    version = 1
+
+    def __init__(self):
+        self.log_count = 0
+        self.defect_count = 0
+        self.effective_minutes = 0
+        self.paused_minutes = 0
+        # Por actividad: minutos efectivos, minutos en pausa y número de sesiones.
+        self.activity_minutes = {}
+        self.activity_paused = {}
+        self.activity_sessions = {}
+        # Por defecto: cuántos hay de cada tipo, en qué fase se encontraron y
+        # en cuál se removieron, y los minutos de compostura por tipo.
+        self.defects_by_type = {}
+        self.defects_found = {}
+        self.defects_removed = {}
+        self.fix_minutes_by_type = {}
+
+    def add_log(self, log):
+        activity = log.get("actividad", "")
+        active = log.get("tiempo_no_pausado_min") or 0
+        paused = log.get("tiempo_en_pausa_min") or 0
+        self.log_count += 1
+        self.effective_minutes += active
+        self.paused_minutes += paused
+        _add(self.activity_minutes, activity, active)
+        _add(self.activity_paused, activity, paused)
+        _add(self.activity_sessions, activity)
+
+    def add_defect(self, defect):
+        tipo = str(defect.get("tipo", ""))
+        self.defect_count += 1
+        _add(self.defects_by_type, tipo)
+        _add(self.defects_found, defect.get("encontrado", ""))
+        _add(self.defects_removed, defect.get("removido", ""))
+        _add(self.fix_minutes_by_type, tipo, defect.get("tiempo_compostura") or 0)
+
+    def catch_up(self, logs, defects):
+        """Incorpora los registros y defectos posteriores a los ya contados."""
+        for log in logs[self.log_count:]:
+            self.add_log(log)
+        for defect in defects[self.defect_count:]:
+            self.add_defect(defect)
+
+    def to_dict(self):
+        data = {key: dict(value) if isinstance(value, dict) else value for key, value in vars(self).items()}
+        data['version'] = self.version
+        return data
+
+    @classmethod
+    def from_data(cls, data):
+        """
+        Recupera el índice guardado en los datos del proyecto y lo pone al día.
+        Si no existe o no corresponde con los registros, se reconstruye.
+        """
+        index = cls()
+        saved = data.get('aggregates')
+        logs = data.get('activity_logs', [])
+        defects = data.get('defects', [])
+        if saved and saved.get('version') == cls.version \
+                and saved.get('log_count', 0) <= len(logs) and saved.get('defect_count', 0) <= len(defects):
+            for key in vars(index):
+                if key in saved:
+                    setattr(index, key, saved[key])
+        index.catch_up(logs, defects)
+        return index
+
+    @classmethod
+    def refresh(cls, data):
+        """Actualiza la clave 'aggregates' de unos datos de proyecto (p. ej. al compactar el diario)."""
+        data['aggregates'] = cls.from_data(data).to_dict()
+
+
+def formatear_fecha(dt):
+    """
+    Formatea un objeto datetime a una cadena con el formato:
+    "Día, dd mes aaaa" usando arreglos con los nombres correctos en español.
+    """
+    return f"{DIAS_SEMANA[dt.weekday()]}, {dt.day:02d} {MESES[dt.month - 1]} {dt.year}"
+
+
+def parse_log_times(log):
+    """
+    Recupera el inicio y el fin (datetime) de un registro. Si tiene las marcas
+    'ts_inicio' y 'ts_fin' (segundos desde la época) se usan esas; si no, se
+    leen sus cadenas "Lunes, 03 marzo 2025", "%H:%M:%S", y si la hora de fin
+    es menor que la de inicio, la actividad cruzó la medianoche. Devuelve None
+    si las cadenas no tienen el formato esperado.
+    """
+    stamps = _log_stamps(log)
+    if stamps is not None:
+        return datetime.fromtimestamp(stamps[0]), datetime.fromtimestamp(stamps[1])
+    try:
+        _, rest = log["fecha_inicio"].split(", ", 1)
+        day, month_name, year = rest.split()
+        date = datetime(int(year), MESES.index(month_name) + 1, int(day))
+        start = datetime.combine(date, datetime.strptime(log["hora_inicio"], "%H:%M:%S").time())
+        end = datetime.combine(date, datetime.strptime(log["hora_fin"], "%H:%M:%S").time())
+    except (KeyError, ValueError, AttributeError):
+        return None
+    if end < start:
+        end += timedelta(days=1)
+    return start, end
+
+
+def _log_stamps(log):
+    start, end = log.get("ts_inicio"), log.get("ts_fin")
+    if isinstance(start, int) and isinstance(end, int):
+        return start, end
+    return None
+
+
+def log_timestamps(log):
+    """(inicio, fin) de un registro en segundos desde la época, o None si no se puede saber."""
+    stamps = _log_stamps(log)
+    if stamps is not None:
+        return stamps
+    times = parse_log_times(log)
+    if times is None:
+        return None
+    return int(times[0].timestamp()), int(times[1].timestamp())
+
+
+def day_period(day):
+    """Periodo [inicio, fin) del día de 'day' (date o datetime)."""
+    start = datetime(day.year, day.month, day.day)
+    return start, start + timedelta(days=1)
+
+
+def week_period(day):
+    """Periodo [inicio, fin) de la semana (de lunes a domingo) que contiene 'day'."""
+    start = day_period(day)[0] - timedelta(days=day.weekday())
+    return start, start + timedelta(days=7)
+
+
+def parse_period(desde, hasta):
+    """
+    Periodo [inicio, fin) de días completos a partir de dos fechas "dd/mm/aaaa"
+    (ambas incluidas). Lanza ValueError si alguna no es válida o están invertidas.
+    """
+    start = datetime.strptime(desde.strip(), "%d/%m/%Y")
+    end = datetime.strptime(hasta.strip(), "%d/%m/%Y") + timedelta(days=1)
+    if end <= start:
+        raise ValueError("la fecha final es anterior a la inicial")
+    return start, end
+
+
+def period_label(start, end):
+    """Texto de un periodo [inicio, fin) de días completos, p. ej. para títulos."""
+    last = end - timedelta(seconds=1)
+    if last.date() == start.date():
+        return formatear_fecha(start)
+    return f"{formatear_fecha(start)} a {formatear_fecha(last)}"
+
+
+class TimeIndex:
+    """
+    Posiciones de los registros ordenadas por su inicio. Las consultas por
+    periodo son dos bisecciones; los registros nuevos casi siempre van al
+    final, así que agregarlos es O(1).
+    """
+
+    def __init__(self, logs):
+        self.logs = logs
+        pairs = sorted((stamps[0], position) for position, stamps
+                       in enumerate(log_timestamps(log) for log in logs) if stamps is not None)
+        self.starts = [start for start, _ in pairs]
+        self.positions = [position for _, position in pairs]
+        self.size = len(logs)
+
+    def copy(self, logs):
+        index = TimeIndex.__new__(TimeIndex)
+        index.logs = logs
+        index.starts = list(self.starts)
+        index.positions = list(self.positions)
+        index.size = self.size
+        return index
+
+    def catch_up(self):
+        """Agrega al índice los registros nuevos al final de la lista."""
+        for position in range(self.size, len(self.logs)):
+            stamps = log_timestamps(self.logs[position])
+            if stamps is None:
+                continue
+            if not self.starts or stamps[0] >= self.starts[-1]:
+                self.starts.append(stamps[0])
+                self.positions.append(position)
+            else:
+                i = bisect.bisect_right(self.starts, stamps[0])
+                self.starts.insert(i, stamps[0])
+                self.positions.insert(i, position)
+        self.size = len(self.logs)
+
+    def between(self, start=None, end=None):
+        """Posiciones de los registros que empiezan en [start, end) (datetime o None), por fecha."""
+        lo = 0 if start is None else bisect.bisect_left(self.starts, int(start.timestamp()))
+        hi = len(self.starts) if end is None else bisect.bisect_left(self.starts, int(end.timestamp()))
+        return self.positions[lo:hi]
+
+
+def build_time_summary(minutes_by_activity, paused_minutes):
+    """
+    Arma el resumen que usan las gráficas y el PDF a partir de los minutos
+    efectivos por actividad ({actividad: minutos}) y los minutos en pausa.
+    """
+    activities = list(ACTIVITIES_LIST)
+    minutes = [minutes_by_activity.get(activity, 0) for activity in activities]
+    total_minutes = sum(minutes)
+    if total_minutes > 0:
+        percentages = [f"{(m / total_minutes) * 100:.2f}%" for m in minutes]
+    else:
+        percentages = ["0.00%" for _ in activities]
+    return {
+        'activities': activities,
+        'minutes': minutes,
+        'total_minutes': total_minutes,
+        'paused_minutes': paused_minutes,
+        'percentages': percentages
+    }
+
+
+class Proyecto:
+    """
+    Datos de un proyecto: actividades, registros, pausas y defectos.
+
+    self.data es la única copia de los datos; los atributos como
+    activities o activity_logs son vistas sobre ese diccionario.
+    """
+
+    def __init__(self, filename, storage=None, background=False):
+        """
+        Con background=True los cambios se guardan desde un hilo aparte
+        (almacenamiento.BackgroundWriter), salvo en SQLite, donde cada
+        registro ya es un INSERT en una transacción.
+        """
+        self.filename = filename
+        self.storage = storage if storage is not None else open_storage(filename)
+        self.storage.on_fold = AggregateIndex.refresh
+        # Candado de los datos: los cambios y las copias (para escribir o
+        # generar reportes desde otro hilo) lo toman.
+        self.lock = threading.RLock()
+        if background and self.storage.mode != "sqlite":
+            self.storage = BackgroundWriter(self.storage, self.copy_data)
+        self.data = {}
+        self.index = AggregateIndex()
+        self._columns = None
+        self._defect_columns = None
+        self._time_index = None
+
+    @classmethod
+    def load(cls, filename, lazy=False):
+        proyecto = cls(filename)
+        proyecto.reload(lazy)
+        return proyecto
+
+    def reload(self, lazy=False):
+        """
+        Lee el proyecto. Con lazy=True los registros y defectos se leen del
+        archivo hasta que algo los necesita (tabla, PDF, validación); para
+        iniciar y parar actividades bastan la cabecera y los totales.
+        """
+        self.data = self.storage.load(lazy=lazy)
+        self.index = AggregateIndex.from_data(self.data)
+        self._columns = None
+        self._defect_columns = None
+        self._time_index = None
+
+    def close(self):
+        self.storage.close()
+        # Las vistas de un snapshot en SQLite tienen su propia conexión.
+        for rows in (self.data.get('activity_logs'), self.data.get('defects')):
+            storage = getattr(rows, "storage", None)
+            if storage is not None and storage is not self.storage:
+                storage.close()
+
+    # -------------------------------
+    # Acceso a los datos
+    # -------------------------------
+
+    @property
+    def project_name(self):
+        return self.data.get('project_name')
+
+    @property
+    def start_date(self):
+        return self.data.get('start_date')
+
+    @property
+    def student_name(self):
+        return self.data.get('student_name', '')
+
+    @property
+    def instructor_name(self):
+        return self.data.get('instructor_name', '')
+
+    @property
+    def activities(self):
+        return self.data['activities']
+
+    @property
+    def activity_logs(self):
+        return self.data['activity_logs']
+
+    @property
+    def defects(self):
+        return self.data['defects']
+
+    @property
+    def total_paused_minutes(self):
+        return self.data.get('total_paused_minutes', 0)
+
+    @property
+    def columns(self):
+        """
+        Registros en forma columnar (columnas.ActivityColumns). Se construye la
+        primera vez que se pide y después se mantiene al día con cada registro.
+        """
+        if self._columns is None:
+            from columnas import ActivityColumns
+            self._columns = ActivityColumns.from_logs(self.activity_logs)
+        return self._columns
+
+    @property
+    def defect_columns(self):
+        """Defectos en forma columnar (columnas.DefectColumns), igual que columns."""
+        if self._defect_columns is None:
+            from columnas import DefectColumns
+            self._defect_columns = DefectColumns.from_defects(self.defects)
+        return self._defect_columns
+
+    @property
+    def time_index(self):
+        """Índice de los registros por fecha de inicio (TimeIndex); se construye la primera vez."""
+        if self._time_index is None:
+            self._time_index = TimeIndex(self.activity_logs)
+        return self._time_index
+
+    def logs_in_period(self, start=None, end=None):
+        """
+        Posiciones en activity_logs de los registros que empiezan en [start, end),
+        ordenadas por fecha. Sin periodo, todas en el orden del historial.
+        """
+        if start is None and end is None:
+            return range(len(self.activity_logs))
+        if hasattr(self.storage, "period_positions") and self._time_index is None:
+            # En SQLite se consulta el índice de la base de datos.
+            return self.storage.period_positions(start, end)
+        return self.time_index.between(start, end)
+
+    def snapshot(self):
+        """
+        Copia de los datos actuales para generar reportes en otro hilo mientras
+        la ventana sigue registrando. Solo se copian las listas y diccionarios
+        de primer nivel (los registros no se modifican una vez agregados).
+        No se debe guardar. Su almacenamiento es un JsonStorage que nunca se
+        usa. En SQLite los registros y defectos no se copian: son vistas
+        (SqlRows.snapshot) que abren su propia conexión en el hilo que las lee;
+        ese hilo las cierra con close().
+        """
+        copy = Proyecto(self.filename, storage=JsonStorage(self.filename))
+        with self.lock:
+            copy.data = dict(self.data)
+            copy.data['activities'] = dict(self.activities)
+            for key in ('activity_logs', 'defects'):
+                rows = self.data[key]
+                copy.data[key] = rows.snapshot() if hasattr(rows, "snapshot") else list(rows)
+            copy.index = AggregateIndex.from_data(dict(copy.data, aggregates=self.index.to_dict()))
+            if self._time_index is not None:
+                copy._time_index = self._time_index.copy(copy.activity_logs)
+            if self._columns is not None:
+                copy._columns = self._columns.copy()
+            if self._defect_columns is not None:
+                copy._defect_columns = self._defect_columns.copy()
+        return copy
+
+    def copy_data(self):
+        """
+        project_data() con copias de las listas y del diccionario de totales,
+        para que el hilo que escribe el archivo no vea cambios a medias.
+        """
+        with self.lock:
+            data = self.project_data()
+            data['activities'] = dict(data['activities'])
+            data['activity_logs'] = list(data['activity_logs'])
+            data['defects'] = list(data['defects'])
+            return data
+
+    def project_data(self):
+        """Devuelve los datos del proyecto tal como se guardan en el archivo."""
+        return {
+            'project_name': self.project_name,
+            'start_date': self.start_date,
+            'student_name': self.student_name,
+            'instructor_name': self.instructor_name,
+            'activities': self.activities,
+            'total_paused_minutes': self.total_paused_minutes,
+            'aggregates': self.index.to_dict(),
+            'activity_logs': self.activity_logs,
+            'defects': self.defects
+        }
+
+    # -------------------------------
+    # Persistencia
+    # -------------------------------
+
+    @timed()
+    def save(self):
+        self.storage.save(self.project_data())
+
+    @timed()
+    def append_record(self, op, **payload):
+        """
+        Guarda un cambio incremental (registro de actividad, defecto o metadatos).
+        En modo diario solo se agrega una línea; en modo JSON se reescribe el archivo.
+        """
+        self.storage.append(op, payload, self.project_data())
+
+    def set_details(self, project_name, start_date, student_name, instructor_name):
+        """Asigna los datos de un proyecto nuevo y guarda el archivo completo."""
+        with self.lock:
+            self.data['project_name'] = project_name
+            self.data['start_date'] = start_date
+            self.data['student_name'] = student_name
+            self.data['instructor_name'] = instructor_name
+        self.save()
+
+    def set_instructor(self, instructor_name):
+        with self.lock:
+            self.data['instructor_name'] = instructor_name
+        self.append_record("meta", fields={'instructor_name': instructor_name})
+
+    def add_paused_minutes(self, minutes):
+        with self.lock:
+            self.data['total_paused_minutes'] = self.total_paused_minutes + minutes
+        self.append_record("meta", fields={'total_paused_minutes': self.total_paused_minutes})
+
+    def record_activity(self, activity, start_time, end_time, paused_minutes, active_minutes, comments):
+        """Agrega un registro de actividad, actualiza el total de la actividad y lo guarda."""
+        log_entry = {
+            "fecha_inicio": formatear_fecha(start_time),
+            "hora_inicio": start_time.strftime("%H:%M:%S"),
+            "hora_fin": end_time.strftime("%H:%M:%S"),
+            # Segundos desde la época: para ordenar y consultar por periodo
+            # sin interpretar las cadenas (y sin ambigüedad a medianoche).
+            "ts_inicio": int(start_time.timestamp()),
+            "ts_fin": int(end_time.timestamp()),
+            "tiempo_en_pausa_min": paused_minutes,
+            "tiempo_no_pausado_min": active_minutes,
+            "actividad": activity,
+            "comentarios": comments
+        }
+        with self.lock:
+            self.activities[activity] = self.activities.get(activity, 0) + active_minutes
+            self.activity_logs.append(log_entry)
+            self.index.add_log(log_entry)
+            if self._columns is not None:
+                self._columns.append(log_entry)
+            if self._time_index is not None:
+                self._time_index.catch_up()
+        self.append_record("log", entry=log_entry, activity=activity, minutes=self.activities[activity])
+        return log_entry
+
+    def next_defect_number(self):
+        return len(self.defects) + 1
+
+    def record_defect(self, defect_record):
+        with self.lock:
+            self.defects.append(defect_record)
+            self.index.add_defect(defect_record)
+            if self._defect_columns is not None:
+                self._defect_columns.append(defect_record)
+        self.append_record("defect", record=defect_record)
+
+    def import_records(self, logs=(), defects=()):
+        """
+        Agrega muchos registros de actividad y defectos ya validados (ver
+        importar.py) y guarda el proyecto con una sola escritura completa en
+        lugar de una línea de diario por registro. Los totales por actividad,
+        las pausas, el índice de totales y las columnas se actualizan en la
+        misma pasada; los defectos se numeran después de los existentes.
+        """
+        with self.lock:
+            for log_entry in logs:
+                activity = log_entry["actividad"]
+                self.activities[activity] = self.activities.get(activity, 0) + log_entry["tiempo_no_pausado_min"]
+                self.data['total_paused_minutes'] = self.total_paused_minutes + log_entry["tiempo_en_pausa_min"]
+                self.index.add_log(log_entry)
+                if self._columns is not None:
+                    self._columns.append(log_entry)
+            self.activity_logs.extend(logs)
+            if logs:
+                # Los importados pueden ser de cualquier fecha: el índice por
+                # fecha se reconstruye (un solo ordenamiento) cuando se pida.
+                self._time_index = None
+            number = self.next_defect_number()
+            for defect in defects:
+                defect["numero"] = str(number)
+                number += 1
+                self.index.add_defect(defect)
+                if self._defect_columns is not None:
+                    self._defect_columns.append(defect)
+            self.defects.extend(defects)
+        self.save()
+
+    # -------------------------------
+    # Validación y totales
+    # -------------------------------
+
+    def validate(self):
+        """Devuelve una lista con los problemas encontrados en los datos del proyecto."""
+        problems = []
+        if not self.project_name:
+            problems.append("El proyecto no tiene nombre.")
+        try:
+            datetime.strptime(self.start_date or "", "%d/%m/%Y")
+        except ValueError:
+            problems.append(f"La fecha de inicio '{self.start_date}' no tiene el formato dd/mm/aaaa.")
+
+        for i, log in enumerate(self.activity_logs, start=1):
+            activity = log.get("actividad")
+            if activity not in ACTIVITIES_LIST:
+                problems.append(f"Registro {i}: actividad desconocida '{activity}'.")
+            for key in ("tiempo_en_pausa_min", "tiempo_no_pausado_min"):
+                value = log.get(key)
+                if not isinstance(value, int) or value < 0:
+                    problems.append(f"Registro {i}: '{key}' no es un número de minutos válido ({value!r}).")
+        minutes_by_activity = self.columns.minutes_by_activity()
+        for activity, minutes in self.activities.items():
+            if minutes != minutes_by_activity.get(activity, 0):
+                problems.append(f"El total de '{activity}' ({minutes} min) no coincide con sus registros "
+                                f"({minutes_by_activity.get(activity, 0)} min).")
+
+        for defect in self.defects:
+            numero = defect.get("numero", "?")
+            if str(defect.get("tipo")) not in DEFECT_TYPE_CODES:
+                problems.append(f"Defecto {numero}: tipo desconocido '{defect.get('tipo')}'.")
+            for key in ("encontrado", "removido"):
+                if defect.get(key) and defect[key] not in ACTIVITIES_LIST:
+                    problems.append(f"Defecto {numero}: actividad '{defect[key]}' desconocida en '{key}'.")
+        return problems
+
+    def time_summary(self, start=None, end=None):
+        """
+        Calcula los datos que comparten las gráficas y el PDF:
+        minutos por actividad, total efectivo, total en pausa y porcentajes.
+
+        Sin periodo se usan los totales guardados del proyecto. Con un periodo
+        (start/end como datetime) solo se suman los registros que empiezan
+        dentro de él, que se buscan en el índice por fecha (o en SQLite, con
+        su índice por fecha).
+        """
+        if start is None and end is None:
+            return build_time_summary(self.activities, self.total_paused_minutes)
+        if hasattr(self.storage, "period_totals"):
+            return build_time_summary(*self.storage.period_totals(start, end))
+        minutes, paused = {}, 0
+        for position in self.logs_in_period(start, end):
+            log = self.activity_logs[position]
+            _add(minutes, log.get("actividad", ""), log.get("tiempo_no_pausado_min") or 0)
+            paused += log.get("tiempo_en_pausa_min") or 0
+        return build_time_summary(minutes, paused)
+
+    def defect_summary(self):
+        """Número de defectos por tipo, por fase en que se encontraron y por fase en que se removieron."""
+        return {
+            'by_type': {code: self.index.defects_by_type.get(code, 0) for code in DEFECT_TYPE_CODES},
+            'found': {activity: self.index.defects_found.get(activity, 0) for activity in ACTIVITIES_LIST},
+            'removed': {activity: self.index.defects_removed.get(activity, 0) for activity in ACTIVITIES_LIST},
+            'fix_minutes': sum(self.index.fix_minutes_by_type.values())
+        }
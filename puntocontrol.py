@@ -0,0 +1,187 @@
+"""
+Punto de control de la actividad en curso (<proyecto>.ckpt).
+
+Mientras una actividad está corriendo, su inicio, sus pausas, la actividad y
+los comentarios solo existen en memoria hasta que se para. Para no perder la
+sesión si el programa se cierra de golpe o se va la luz, la ventana guarda
+cada pocos segundos el estado de la sesión en un archivo de tamaño fijo que
+se reescribe en su lugar. Escribirlo cuesta lo mismo con diez registros que
+con un millón: no depende de la historia del proyecto.
+
+El archivo tiene dos ranuras de RECORD.size bytes. Cada escritura va a la
+ranura que no tiene la copia más reciente, con un número de secuencia y un
+CRC32, así que una escritura interrumpida nunca deja sin una copia válida.
+Al leer se usa la ranura válida con la secuencia mayor.
+
+Con background=True la escritura (y su fsync) se hace en un hilo aparte:
+write() solo deja el estado más reciente y regresa, así la ventana nunca
+espera al disco. Si se piden varias escrituras antes de que el hilo termine
+la anterior, solo se escribe la última.
+
+Los comentarios y el nombre de la actividad tienen un largo máximo (en bytes
+UTF-8); si no caben se recortan solo en el punto de control.
+"""
+import os
+import struct
+import threading
+import zlib
+
+SUFFIX = ".ckpt"
+MAGIC = b"RTC1"
+ACTIVITY_BYTES = 64
+COMMENTS_BYTES = 1024
+# magic, secuencia, activa, en pausa, hora del punto de control (época),
+# inicio (época), segundos transcurridos, segundos de pausas terminadas,
+# segundos de la pausa en curso, actividad, comentarios
+BODY = struct.Struct(f"<4sQBBddddd{ACTIVITY_BYTES}s{COMMENTS_BYTES}s")
+CRC = struct.Struct("<I")
+RECORD_SIZE = BODY.size + CRC.size
+
+
+def _fit(text, size):
+    """Texto en UTF-8 recortado a 'size' bytes sin partir un carácter."""
+    return (text or "").encode("utf-8")[:size].decode("utf-8", "ignore").encode("utf-8")
+
+
+def _text(raw):
+    return raw.rstrip(b"\0").decode("utf-8", "ignore")
+
+
+def pack(seq, state):
+    """Empaqueta el estado (o None, sin actividad) en una ranura con su CRC."""
+    if state is None:
+        body = BODY.pack(MAGIC, seq, 0, 0, 0.0, 0.0, 0.0, 0.0, 0.0, b"", b"")
+    else:
+        body = BODY.pack(MAGIC, seq, 1, 1 if state['is_paused'] else 0, state['saved_at'], state['start'],
+                         state['elapsed'], state['paused'], state['pause_elapsed'],
+                         _fit(state['activity'], ACTIVITY_BYTES), _fit(state['comments'], COMMENTS_BYTES))
+    return body + CRC.pack(zlib.crc32(body))
+
+
+def unpack(record):
+    """Devuelve (secuencia, estado o None), o None si la ranura no es válida."""
+    if len(record) != RECORD_SIZE:
+        return None
+    body = record[:BODY.size]
+    (crc,) = CRC.unpack_from(record, BODY.size)
+    if crc != zlib.crc32(body):
+        return None
+    magic, seq, active, is_paused, saved_at, start, elapsed, paused, pause_elapsed, activity, comments = \
+        BODY.unpack(body)
+    if magic != MAGIC:
+        return None
+    if not active:
+        return seq, None
+    return seq, {
+        'activity': _text(activity),
+        'comments': _text(comments),
+        'start': start,
+        'saved_at': saved_at,
+        'elapsed': elapsed,
+        'paused': paused,
+        'pause_elapsed': pause_elapsed,
+        'is_paused': bool(is_paused),
+    }
+
+
+class Checkpoint:
+    """
+    Punto de control de un proyecto. El estado es un diccionario con:
+    activity, comments, start y saved_at (segundos desde la época), elapsed
+    (segundos desde el inicio), paused (segundos de las pausas terminadas),
+    pause_elapsed (segundos de la pausa en curso) e is_paused.
+    """
+
+    def __init__(self, project_filename, background=False):
+        self.filename = project_filename + SUFFIX
+        self._file = None
+        self._seq = 0
+        # Último error del hilo que escribe (solo con background=True).
+        self.error = None
+        # Estado pendiente de escribir, como (estado,); None: no hay nada pendiente.
+        self._pending = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def read(self):
+        """Estado guardado de una actividad interrumpida, o None si no hay."""
+        try:
+            with open(self.filename, "rb") as file:
+                content = file.read(2 * RECORD_SIZE)
+        except FileNotFoundError:
+            return None
+        slots = [unpack(content[i * RECORD_SIZE:(i + 1) * RECORD_SIZE]) for i in range(2)]
+        valid = [slot for slot in slots if slot is not None]
+        if not valid:
+            return None
+        seq, state = max(valid, key=lambda slot: slot[0])
+        self._seq = max(self._seq, seq)
+        return state
+
+    def _open(self):
+        if self._file is None:
+            if not os.path.exists(self.filename):
+                with open(self.filename, "wb") as file:
+                    file.write(pack(0, None) * 2)
+            self._file = open(self.filename, "r+b")
+            self.read()
+        return self._file
+
+    def write(self, state):
+        """
+        Reescribe en su lugar la ranura más antigua con el estado (None: sin
+        actividad). Con background=True solo lo deja pendiente para el hilo.
+        """
+        if self._thread is None:
+            self._write(state)
+            return
+        with self._condition:
+            self._pending = (state,)
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                (state,), self._pending = self._pending, None
+            try:
+                self._write(state)
+                self.error = None
+            except OSError as exc:
+                # Es solo un respaldo: si no se puede escribir, la actividad sigue igual.
+                self.error = exc
+
+    def _write(self, state):
+        file = self._open()
+        self._seq += 1
+        file.seek((self._seq % 2) * RECORD_SIZE)
+        file.write(pack(self._seq, state))
+        file.flush()
+        os.fsync(file.fileno())
+
+    def close(self, remove=False):
+        """
+        Escribe lo pendiente y cierra el archivo; con remove=True también lo
+        borra (no hay nada que recuperar).
+        """
+        if self._thread is not None:
+            with self._condition:
+                self._closed = True
+                self._condition.notify_all()
+            self._thread.join()
+            self._thread = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if remove:
+            try:
+                os.remove(self.filename)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,82 @@
+"""
+Un solo reloj para todas las etiquetas de tiempo de la ventana.
+
+En lugar de un ciclo de after(1000) por etiqueta, TickScheduler programa un
+único after alineado al inicio de cada segundo y llama a todas las funciones
+suscritas con el valor de time.monotonic(), que no se ve afectado por los
+cambios de hora del sistema.
+
+Mientras la ventana está minimizada no se actualizan las etiquetas; solo se
+despierta cada 'idle_interval' segundos para las suscripciones marcadas como
+background (por ejemplo, el aviso de los 60 minutos). Al restaurarla se hace
+un tick inmediato, así que las etiquetas se ponen al día de una vez.
+"""
+import time
+
+
+class TickScheduler:
+
+    # Segundos entre ticks mientras la ventana está minimizada.
+    idle_interval = 30
+
+    def __init__(self, root):
+        self.root = root
+        self.visible = True
+        self._subscribers = {}
+        self._next_token = 0
+        self._after_id = None
+        root.bind("<Unmap>", self._on_unmap, add="+")
+        root.bind("<Map>", self._on_map, add="+")
+
+    def subscribe(self, callback, background=False):
+        """
+        Llama a callback(monotonic) en cada tick, empezando ahora mismo.
+        Devuelve una clave para cancelar la suscripción con unsubscribe().
+        """
+        self._next_token += 1
+        token = self._next_token
+        self._subscribers[token] = (callback, background)
+        callback(time.monotonic())
+        if self._after_id is None:
+            self._schedule()
+        return token
+
+    def unsubscribe(self, token):
+        self._subscribers.pop(token, None)
+        if not self._subscribers and self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _schedule(self):
+        if self.visible:
+            # Milisegundos que faltan para el siguiente segundo exacto del reloj.
+            delay = 1000 - int((time.time() % 1) * 1000)
+        else:
+            delay = self.idle_interval * 1000
+        self._after_id = self.root.after(max(delay, 1), self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        now = time.monotonic()
+        for callback, background in list(self._subscribers.values()):
+            if self.visible or background:
+                callback(now)
+        if self._subscribers:
+            self._schedule()
+
+    def _reschedule(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self._subscribers:
+            self._tick()
+
+    def _on_unmap(self, event):
+        if event.widget is self.root and self.visible:
+            self.visible = False
+            self._reschedule()
+
+    def _on_map(self, event):
+        if event.widget is self.root and not self.visible:
+            self.visible = True
+            self._reschedule()
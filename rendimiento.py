@@ -0,0 +1,239 @@
+"""
+Mide cómo crecen con la historia del proyecto las operaciones de la ventana.
+
+Para cada tamaño (número de registros de actividad) genera un proyecto
+sintético con generar_proyecto.py (o reutiliza el que ya generó antes) y
+mide, sin interfaz gráfica, lo mismo que hace cada acción de la ventana:
+
+    load_data            abrir el proyecto (carga diferida, como la ventana)
+    load_full            leer el proyecto completo
+    save_data            reescribir el proyecto completo
+    show_statistics      resumen de tiempos y PNG de las gráficas
+    show_table           abrir la tabla de registros (primera y última página)
+    show_defects_table   índices, filtros y primera página de la tabla de defectos
+    produce_pdf          PDF de actividades
+    produce_defects_pdf  PDF de defectos
+
+Cada operación se repite --repeticiones veces sobre un proyecto recién
+abierto (abrirlo no cuenta, salvo en load_data y load_full) y después una
+vez más con tracemalloc para el pico de memoria; así tracemalloc no altera
+los tiempos. Las operaciones que necesitan matplotlib o ReportLab se
+marcan con su error si no están instalados.
+
+Los resultados se guardan en JSON; con --comparar se muestra la razón
+contra los de otra versión.
+
+Uso:
+    python -m rendimiento
+    python -m rendimiento --tamanos 10000 100000 --formato rtb
+    python -m rendimiento --operaciones load_data show_table --comparar anterior.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import generar_proyecto
+from proyecto import Proyecto
+
+DEFAULT_SIZES = (10000, 100000, 1000000)
+DEFAULT_DIRECTORY = ".rendimiento"
+DEFAULT_OUTPUT = "rendimiento.json"
+RESULTS_VERSION = 1
+# Filas que se consideran visibles al abrir una tabla.
+PAGE = 30
+
+
+def _opened(path, lazy=True):
+    proyecto = Proyecto(path)
+    proyecto.reload(lazy=lazy)
+    return proyecto
+
+
+def prepare_load_data(path, workdir):
+    def run():
+        _opened(path).close()
+    return run, None
+
+
+def prepare_load_full(path, workdir):
+    def run():
+        _opened(path, lazy=False).close()
+    return run, None
+
+
+def prepare_save_data(path, workdir):
+    copy = os.path.join(workdir, "copia" + os.path.splitext(path)[1])
+    shutil.copyfile(path, copy)
+    proyecto = _opened(copy, lazy=False)
+    return proyecto.save, proyecto
+
+
+def prepare_show_statistics(path, workdir):
+    import reportes
+    proyecto = _opened(path)
+    return lambda: reportes.statistics_png(proyecto.time_summary()), proyecto
+
+
+def prepare_show_table(path, workdir):
+    from tablas import log_row
+    proyecto = _opened(path)
+
+    def run():
+        logs = proyecto.activity_logs
+        count = len(logs)
+        for first in (0, max(0, count - PAGE)):
+            [log_row(log) for log in logs[first:first + PAGE]]
+    return run, proyecto
+
+
+def prepare_show_defects_table(path, workdir):
+    from tablas import DEFECT_FILTER_COLUMNS, DefectIndex, defect_row
+    proyecto = _opened(path)
+
+    def run():
+        index = DefectIndex(proyecto.defects)
+        for column_id in DEFECT_FILTER_COLUMNS:
+            index.values(column_id)
+        rows = index.query()
+        [defect_row(proyecto.defects[position]) for position in rows[:PAGE]]
+    return run, proyecto
+
+
+def prepare_produce_pdf(path, workdir):
+    import reportes
+    proyecto = _opened(path)
+    return lambda: reportes.produce_pdf(proyecto, os.path.join(workdir, "actividades.pdf")), proyecto
+
+
+def prepare_produce_defects_pdf(path, workdir):
+    import reportes
+    proyecto = _opened(path)
+    return lambda: reportes.produce_defects_pdf(proyecto, os.path.join(workdir, "defectos.pdf")), proyecto
+
+
+OPERATIONS = {
+    'load_data': prepare_load_data,
+    'load_full': prepare_load_full,
+    'save_data': prepare_save_data,
+    'show_statistics': prepare_show_statistics,
+    'show_table': prepare_show_table,
+    'show_defects_table': prepare_show_defects_table,
+    'produce_pdf': prepare_produce_pdf,
+    'produce_defects_pdf': prepare_produce_defects_pdf,
+}
+
+
+def dataset(directory, size, extension):
+    """Ruta del proyecto sintético de 'size' registros; se genera si no existe."""
+    path = os.path.join(directory, f"sintetico_{size}{extension}")
+    if not os.path.exists(path):
+        started = time.perf_counter()
+        generar_proyecto.write(path, generar_proyecto.generate(size))
+        print(f"Generado {path} en {time.perf_counter() - started:.1f} s")
+    return path
+
+
+def _measure_once(prepare, path, workdir, trace):
+    run, proyecto = prepare(path, workdir)
+    try:
+        if trace:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            run()
+        finally:
+            seconds = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1] if trace else None
+            if trace:
+                tracemalloc.stop()
+    finally:
+        if proyecto is not None:
+            proyecto.close()
+    return seconds, peak
+
+
+def measure(operation, path, workdir, repeats):
+    """Resultado de una operación: tiempos de cada repetición, mejor, mediana y pico de memoria."""
+    result = {'operation': operation, 'seconds': [], 'best': None, 'median': None,
+              'peak_bytes': None, 'error': None}
+    prepare = OPERATIONS[operation]
+    try:
+        for _ in range(repeats):
+            result['seconds'].append(_measure_once(prepare, path, workdir, trace=False)[0])
+        result['peak_bytes'] = _measure_once(prepare, path, workdir, trace=True)[1]
+    except Exception as exc:
+        result['error'] = f"{type(exc).__name__}: {exc}"
+    if result['seconds']:
+        result['best'] = min(result['seconds'])
+        result['median'] = statistics.median(result['seconds'])
+    return result
+
+
+def load_results(filename):
+    with open(filename, "r", encoding="utf-8") as file:
+        results = json.load(file)
+    return {(entry['size'], entry['operation']): entry for entry in results.get('results', [])}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m rendimiento",
+                                     description="Mide las operaciones de la aplicación con proyectos sintéticos.")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="número de registros de cada proyecto sintético")
+    parser.add_argument("--operaciones", nargs="+", choices=list(OPERATIONS), default=list(OPERATIONS),
+                        help="operaciones que se miden (por defecto, todas)")
+    parser.add_argument("--formato", choices=("txt", "rtb", "db"), default="txt",
+                        help="formato de los proyectos sintéticos")
+    parser.add_argument("--repeticiones", type=int, default=1, help="veces que se mide cada operación")
+    parser.add_argument("--directorio", default=DEFAULT_DIRECTORY,
+                        help=f"dónde se guardan los proyectos generados (por defecto, {DEFAULT_DIRECTORY})")
+    parser.add_argument("--salida", default=DEFAULT_OUTPUT, help=f"archivo JSON de resultados (por defecto, {DEFAULT_OUTPUT})")
+    parser.add_argument("--comparar", help="resultados anteriores (JSON) para comparar los tiempos")
+    args = parser.parse_args(argv)
+
+    previous = load_results(args.comparar) if args.comparar else {}
+    workdir = os.path.join(args.directorio, "trabajo")
+    os.makedirs(workdir, exist_ok=True)
+
+    results = []
+    for size in args.tamanos:
+        path = dataset(args.directorio, size, "." + args.formato)
+        for operation in args.operaciones:
+            result = dict(measure(operation, path, workdir, max(1, args.repeticiones)), size=size)
+            results.append(result)
+            if result['best'] is None:
+                print(f"{size:>9} {operation:<20} ERROR {result['error']}")
+                continue
+            line = f"{size:>9} {operation:<20} {result['best'] * 1000:10.1f} ms"
+            if result['peak_bytes'] is not None:
+                line += f" {result['peak_bytes'] / 2 ** 20:9.1f} MiB"
+            before = previous.get((size, operation))
+            if before and before.get('best'):
+                line += f"  x{result['best'] / before['best']:.2f} vs. anterior"
+            if result['error']:
+                line += f"  ({result['error']})"
+            print(line)
+
+    with open(args.salida, "w", encoding="utf-8") as file:
+        json.dump({
+            'version': RESULTS_VERSION,
+            'generated': datetime.now().isoformat(timespec="seconds"),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'format': args.formato,
+            'repeats': args.repeticiones,
+            'results': results,
+        }, file, indent=4, ensure_ascii=False)
+    print(f"Resultados en {args.salida}")
+    return 1 if any(result['best'] is None for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,498 @@
+"""
+Gráficas y reportes PDF de un proyecto, sin interfaz gráfica.
+
+matplotlib y ReportLab tardan en importarse, así que no se cargan al
+importar este módulo sino la primera vez que se dibuja una gráfica o se
+genera un PDF (o antes, en segundo plano, con warm_up()).
+
+Uso desde la línea de comandos:
+    python -m reportes proyecto.txt --pdf actividades.pdf --defectos defectos.pdf
+"""
+import argparse
+import hashlib
+import io
+import json
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from perfilado import timed
+from proyecto import Proyecto, formatear_fecha, parse_period, period_label
+
+# Imágenes PNG de las gráficas ya dibujadas, por hash de sus datos (LRU).
+CHART_CACHE_SIZE = 16
+_chart_cache = OrderedDict()
+_chart_cache_lock = threading.Lock()
+
+
+def warm_up():
+    """
+    Importa matplotlib y ReportLab para que el primer reporte no tenga que esperarlos.
+    Se puede llamar desde un hilo: no importa pyplot, que debe cargarse en el hilo de Tk.
+    """
+    import matplotlib.figure  # noqa: F401
+    import matplotlib.backends.backend_agg  # noqa: F401
+    import reportlab.platypus  # noqa: F401
+    import reportlab.lib.styles  # noqa: F401
+
+
+def make_autopct(values):
+    def my_autopct(pct):
+        total = sum(values)
+        val = int(round(pct * total / 100.0))
+        return f'{pct:.1f}%\n({val} min)'
+    return my_autopct
+
+
+def bar_chart_title(summary):
+    total_time_effective = f"{int(summary['total_minutes'])} minutos"
+    total_paused_time_str = f"{summary['paused_minutes']} minutos en pausa"
+    return f'Tiempo empleado en actividades\nTiempo total efectivo: {total_time_effective}\n{total_paused_time_str}'
+
+
+def draw_bar_chart(ax, summary, with_labels=True):
+    """Dibuja la gráfica de barras de minutos por actividad en los ejes 'ax'."""
+    bars = ax.bar(summary['activities'], summary['minutes'], color='blue')
+    ax.set_xlabel('Actividad')
+    ax.set_ylabel('Minutos')
+    ax.set_title(bar_chart_title(summary))
+    ax.set_xticks(range(len(summary['activities'])))
+    ax.set_xticklabels(summary['activities'], rotation=45)
+    if with_labels:
+        for bar, m, percentage in zip(bars, summary['minutes'], summary['percentages']):
+            yval = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2, yval, f"{m} min\n{percentage}", ha='center', va='bottom', fontsize=10)
+    return bars
+
+
+def draw_pie_chart(ax, summary):
+    """Dibuja la gráfica de pastel de tiempo efectivo contra tiempo en pausa."""
+    values = [summary['total_minutes'], summary['paused_minutes']]
+    result = ax.pie(
+        values,
+        labels=["Tiempo Efectivo", "Tiempo en Pausa"],
+        autopct=make_autopct(values),
+        colors=['green', 'red'],
+        startangle=90
+    )
+    ax.set_title("Comparación: Tiempo Efectivo vs en Pausa")
+    return result
+
+
+def has_pie_data(summary):
+    return summary['total_minutes'] + summary['paused_minutes'] > 0
+
+
+def draw_statistics(fig, summary):
+    """
+    Dibuja en 'fig' las gráficas de "Visualizar Gráficos": barras y pastel
+    lado a lado, o solo las barras si no hay minutos para el pastel.
+    """
+    if not has_pie_data(summary):
+        draw_bar_chart(fig.add_subplot(), summary)
+    else:
+        ax1, ax2 = fig.subplots(1, 2)
+        draw_bar_chart(ax1, summary)
+        draw_pie_chart(ax2, summary)
+    fig.tight_layout()
+
+
+@timed()
+def statistics_png(summary):
+    """Imagen PNG de draw_statistics(), sin pyplot (se puede llamar desde un hilo)."""
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(14, 5) if has_pie_data(summary) else (7, 5))
+    FigureCanvasAgg(fig)
+    draw_statistics(fig, summary)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+
+def _draw_bar_chart_image(ax, summary):
+    draw_bar_chart(ax, summary, with_labels=False)
+
+
+# Gráficas que se pueden generar como imagen para el PDF.
+CHART_KINDS = {
+    'bar': _draw_bar_chart_image,
+    'pie': draw_pie_chart,
+}
+
+
+@timed()
+def render_chart_png(kind, summary):
+    """
+    Dibuja una gráfica y devuelve la imagen PNG en bytes. Usa la API de
+    Figure directamente (sin pyplot), así que se puede llamar desde un hilo.
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(10, 5))
+    FigureCanvasAgg(fig)
+    CHART_KINDS[kind](fig.add_subplot(), summary)
+    fig.tight_layout()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+
+def chart_png(kind, summary):
+    """
+    Devuelve la imagen PNG de una gráfica, tomándola del caché si ya se
+    dibujó con los mismos datos. La clave es un hash del tipo de gráfica y
+    de los datos agregados, no del proyecto, así que dos exportaciones con
+    los mismos totales comparten la imagen y no se toca matplotlib.
+    """
+    key = hashlib.sha256(json.dumps([kind, summary], sort_keys=True).encode("utf-8")).hexdigest()
+    with _chart_cache_lock:
+        if key in _chart_cache:
+            _chart_cache.move_to_end(key)
+            return _chart_cache[key]
+    png = render_chart_png(kind, summary)
+    with _chart_cache_lock:
+        _chart_cache[key] = png
+        while len(_chart_cache) > CHART_CACHE_SIZE:
+            _chart_cache.popitem(last=False)
+    return png
+
+
+class ExportCancelled(Exception):
+    """La función de progreso la lanza para interrumpir la generación de un PDF."""
+
+
+def track_progress(doc, progress):
+    """
+    Conecta la función progress(hechas, total, unidad) a las páginas que va
+    generando ReportLab. Si progress lanza ExportCancelled, doc.build se
+    interrumpe en la siguiente página.
+    """
+    if progress is None:
+        return
+    doc.setPageCallBack(lambda page: progress(page, None, "páginas"))
+
+
+def fit_image(image, doc):
+    """Ajusta una imagen al área disponible de la página conservando su proporción."""
+    available_width = doc.width
+    available_height = doc.height
+    aspect_ratio = image.imageWidth / image.imageHeight
+    if available_width / aspect_ratio <= available_height:
+        image.drawWidth = available_width
+        image.drawHeight = available_width / aspect_ratio
+    else:
+        image.drawHeight = available_height
+        image.drawWidth = available_height * aspect_ratio
+    image.hAlign = 'CENTER'
+    return image
+
+
+def log_cells(log):
+    """Textos de una fila de la tabla de registros del PDF."""
+    return (
+        log.get("fecha_inicio", ""),
+        log.get("hora_inicio", ""),
+        log.get("hora_fin", ""),
+        str(log.get("tiempo_en_pausa_min", "")),
+        str(log.get("tiempo_no_pausado_min", "")),
+        log.get("actividad", ""),
+        log.get("comentarios") or ""
+    )
+
+
+@timed()
+def produce_pdf(proyecto, pdf_file, progress=None, period=None):
+    """
+    Genera el PDF de actividades (gráficas y tabla de registros) en 'pdf_file'.
+    'progress', si se da, recibe progress(filas hechas, total de filas, "filas").
+    'period', si se da, es (inicio, fin): las gráficas y la tabla solo incluyen
+    los registros que empiezan en ese periodo (buscados en el índice por fecha).
+    """
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Image, TableStyle, PageBreak
+    from reportlab.lib.pagesizes import letter, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib import colors
+    from reportlab.lib.units import cm
+
+    # Configurar el documento en orientación horizontal con márgenes de 2 cm
+    doc = SimpleDocTemplate(
+        pdf_file,
+        pagesize=landscape(letter),
+        title="Reporte de Actividades",
+        author="Registro de Tiempo",
+        leftMargin=2 * cm,
+        rightMargin=2 * cm,
+        topMargin=2 * cm,
+        bottomMargin=2 * cm
+    )
+    start, end = period or (None, None)
+    positions = proyecto.logs_in_period(start, end)
+    # El avance de este reporte se mide en filas de la tabla de registros.
+    if progress is not None:
+        progress(0, len(positions), "filas")
+
+    styles = getSampleStyleSheet()
+    body_style = styles["BodyText"]
+
+    # Función para dibujar el encabezado en cada página
+    def header(canvas, doc):
+        canvas.saveState()
+        project_text = f"Proyecto: {proyecto.project_name}"
+        fecha_inicio_dt = datetime.strptime(proyecto.start_date, '%d/%m/%Y')
+        date_text = (
+            f"Fecha de inicio: {formatear_fecha(fecha_inicio_dt)}    "
+            f"Fecha de generación: {formatear_fecha(datetime.now())}"
+        )
+        canvas.setFont('Helvetica-Bold', 10)
+        width, height = doc.pagesize
+        canvas.drawCentredString(width / 2.0, height - 40, project_text)
+        canvas.drawCentredString(width / 2.0, height - 55, date_text)
+        if period:
+            canvas.drawCentredString(width / 2.0, height - 25, f"Periodo: {period_label(start, end)}")
+        canvas.restoreState()
+
+    Story = []
+    summary = proyecto.time_summary(start, end)
+
+    # --- Primera Página: Gráfica de Barras ---
+    # Las gráficas se insertan desde memoria; no se escriben archivos temporales.
+    Story.append(fit_image(Image(io.BytesIO(chart_png('bar', summary))), doc))
+
+    # Salto de página para la gráfica de pastel o mensaje
+    Story.append(PageBreak())
+
+    # --- Segunda Página: Gráfica de Pastel o Mensaje ---
+    if summary['total_minutes'] + summary['paused_minutes'] == 0:
+        # No hay datos suficientes para la gráfica de pastel
+        Story.append(Paragraph("No se puede mostrar la gráfica de pastel debido a que no hay datos suficientes.", body_style))
+    else:
+        Story.append(fit_image(Image(io.BytesIO(chart_png('pie', summary))), doc))
+
+    # Salto de página para que la tabla inicie en la siguiente página
+    Story.append(PageBreak())
+
+    # --- Tercera Página en Adelante: Tabla de Registros ---
+    # La tabla se arma por bloques de filas mientras se genera el documento
+    # (ver tabla_pdf.StreamingTable), así la memoria no crece con el historial.
+    from tabla_pdf import StreamingTable
+
+    headers = ["Fecha", "Inicio", "Fin", "Interrupción (min)", "A Tiempo(min)", "Actividad", "Comentarios"]
+    logs = proyecto.activity_logs
+    rows = (log_cells(logs[position]) for position in positions)
+
+    total_width = doc.width
+    num_columns = len(headers)
+    col_widths = [total_width / num_columns] * num_columns
+
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+    ])
+    Story.append(StreamingTable(headers, rows, col_widths, table_style, body_style,
+                                total=len(positions), progress=progress))
+
+    doc.build(Story, onFirstPage=header, onLaterPages=header)
+
+
+@timed()
+def produce_defects_pdf(proyecto, pdf_file, progress=None):
+    """
+    Genera un PDF en orientación horizontal con:
+    - Tipos de defectos en la parte superior.
+    - Datos de estudiante, instructor, fecha de generación, proyecto.
+    - Tabla de defectos: Fecha, Número, Tipo, Encontrado, Removido, Tiempo de compostura, Defecto arreglado, Descripción
+    - Métricas PSP del proyecto (metrics_story)
+    'progress', si se da, recibe el avance (ver track_progress).
+    """
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib.pagesizes import letter, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib import colors
+    from reportlab.lib.units import cm
+
+    # Configurar el documento en orientación horizontal (landscape)
+    doc = SimpleDocTemplate(
+        pdf_file,
+        pagesize=landscape(letter),
+        title="Reporte de Defectos",
+        author="Registro de Tiempo",
+        leftMargin=2 * cm,
+        rightMargin=2 * cm,
+        topMargin=2 * cm,
+        bottomMargin=2 * cm
+    )
+    track_progress(doc, progress)
+
+    styles = getSampleStyleSheet()
+    style_normal = styles["Normal"]
+    style_heading = styles["Heading2"]
+
+    # Función para dibujar el encabezado en cada página
+    def header(canvas, doc):
+        canvas.saveState()
+        width, height = doc.pagesize
+
+        # Encabezado principal
+        text_encabezado = f"Reporte de Defectos - Proyecto: {proyecto.project_name}"
+        canvas.setFont('Helvetica-Bold', 12)
+        canvas.drawCentredString(width / 2.0, height - 30, text_encabezado)
+
+        # Fecha de generación
+        fecha_hoy = datetime.now().strftime("%d/%m/%Y")
+        text_fecha = f"Fecha de generación: {fecha_hoy}"
+        canvas.setFont('Helvetica', 10)
+        canvas.drawCentredString(width / 2.0, height - 45, text_fecha)
+
+        canvas.restoreState()
+
+    Story = []
+
+    # Agregar datos del alumno, instructor, fecha inicio y tipos de defectos en la parte superior
+    estudiante = proyecto.data.get('student_name', 'No especificado')
+    instructor = proyecto.data.get('instructor_name', 'No especificado')
+    fecha_inicio = proyecto.data.get('start_date', 'No especificada')
+
+    # Título del PDF
+    Story.append(Paragraph("Formato del Registro de Defectos", style_heading))
+    Story.append(Spacer(1, 12))
+
+    # Datos de alumno, instructor, fecha, proyecto
+    info_text = (
+        f"<b>Estudiante:</b> {estudiante} &nbsp;&nbsp;&nbsp;"
+        f"<b>Instructor:</b> {instructor} &nbsp;&nbsp;&nbsp;"
+        f"<b>Fecha Inicio:</b> {fecha_inicio} &nbsp;&nbsp;&nbsp;"
+        f"<b>Proyecto:</b> {proyecto.project_name}"
+    )
+    Story.append(Paragraph(info_text, style_normal))
+    Story.append(Spacer(1, 12))
+
+    # Lista de tipos de defectos (sección superior)
+    tipos_defectos_text = (
+        "Tipos de Defectos:<br/>"
+        "10 Documentación &nbsp;&nbsp; 20 Sintáxis &nbsp;&nbsp; 30 Construcción, Empacar &nbsp;&nbsp; 40 Asignación<br/>"
+        "50 Interfaz &nbsp;&nbsp; 60 Chequeo &nbsp;&nbsp; 70 Datos &nbsp;&nbsp; 80 Función &nbsp;&nbsp; 90 Sistema &nbsp;&nbsp; 100 Ambiente"
+    )
+    Story.append(Paragraph(tipos_defectos_text, style_normal))
+    Story.append(Spacer(1, 12))
+
+    # Construir la tabla de defectos
+    headers = [
+        "Fecha",
+        "Número",
+        "Tipo",
+        "Encontrado",
+        "Removido",
+        "T. de compostura",
+        "Defecto arreglado",
+        "Descripción"
+    ]
+    table_data = [headers]
+
+    for defect in proyecto.defects:
+        row = [
+            Paragraph(defect.get("fecha", ""), style_normal),
+            Paragraph(defect.get("numero", ""), style_normal),
+            Paragraph(str(defect.get("tipo", "")), style_normal),
+            Paragraph(defect.get("encontrado", ""), style_normal),
+            Paragraph(defect.get("removido", ""), style_normal),
+            Paragraph(str(defect.get("tiempo_compostura", "")), style_normal),
+            Paragraph(defect.get("defecto_arreglado", ""), style_normal),
+            Paragraph(defect.get("descripcion", ""), style_normal)
+        ]
+        table_data.append(row)
+
+    defect_table = Table(table_data, repeatRows=1)
+    defect_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ]))
+
+    Story.append(defect_table)
+    Story.extend(metrics_story(proyecto, style_heading, style_normal))
+
+    doc.build(Story, onFirstPage=header, onLaterPages=header)
+
+
+def metrics_story(proyecto, style_heading, style_normal):
+    """Sección "Métricas PSP" del PDF de defectos (ver metricas.py)."""
+    from reportlab.platypus import PageBreak, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib import colors
+    import metricas
+
+    metrics = metricas.compute(proyecto)
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.darkblue),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ])
+    story = [PageBreak(), Paragraph("Métricas PSP", style_heading), Spacer(1, 12)]
+    for label, value in metricas.summary_lines(metrics):
+        story.append(Paragraph(f"<b>{label}:</b> {value}", style_normal))
+    for headers, rows in ((metricas.PHASE_HEADERS, metricas.phase_rows(metrics)),
+                          (metricas.FIX_TYPE_HEADERS, metricas.fix_type_rows(metrics)),
+                          (metricas.FIX_HISTOGRAM_HEADERS, metricas.fix_histogram_rows(metrics))):
+        table = Table([headers] + rows, repeatRows=1)
+        table.setStyle(table_style)
+        story.append(Spacer(1, 12))
+        story.append(table)
+    return story
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m reportes",
+                                     description="Genera los PDF de un proyecto sin abrir la ventana.")
+    parser.add_argument("proyecto", help="archivo de proyecto (.txt)")
+    parser.add_argument("--pdf", help="ruta del PDF de actividades")
+    parser.add_argument("--defectos", help="ruta del PDF de defectos")
+    parser.add_argument("--desde", help="primer día del periodo del PDF de actividades (dd/mm/aaaa)")
+    parser.add_argument("--hasta", help="último día del periodo (dd/mm/aaaa)")
+    args = parser.parse_args(argv)
+
+    period = None
+    if args.desde or args.hasta:
+        if not (args.desde and args.hasta):
+            parser.error("--desde y --hasta se usan juntos")
+        try:
+            period = parse_period(args.desde, args.hasta)
+        except ValueError as exc:
+            parser.error(f"periodo inválido: {exc}")
+
+    import matplotlib
+    matplotlib.use("Agg")
+    proyecto = Proyecto.load(args.proyecto)
+    try:
+        if not proyecto.project_name:
+            print(f"{args.proyecto}: no es un proyecto válido.", file=sys.stderr)
+            return 1
+        if args.pdf:
+            produce_pdf(proyecto, args.pdf, period=period)
+        if args.defectos:
+            produce_defects_pdf(proyecto, args.defectos)
+    finally:
+        proyecto.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Tabla de ReportLab que se genera por bloques mientras se arma el PDF.
+
+Una sola Table con decenas de miles de filas obliga a ReportLab a medir y
+guardar todas las celdas antes de dibujar la primera página. StreamingTable
+es un flowable que no ocupa nada por sí mismo: cada vez que ReportLab le pide
+dividirse, toma el siguiente bloque de filas del iterador, arma una Table con
+el mismo encabezado y estilo, entrega la parte que cabe en la página y se
+vuelve a poner detrás. Así solo hay en memoria el bloque que se está dibujando.
+
+Este módulo importa ReportLab; reportes.py lo carga solo al generar un PDF.
+"""
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import Flowable, Paragraph, Table
+
+# Relleno horizontal por omisión de las celdas de una Table (LEFTPADDING + RIGHTPADDING).
+CELL_PADDING = 12
+# Marca de fin del iterador de filas.
+_END = object()
+
+
+class StreamingTable(Flowable):
+
+    def __init__(self, headers, rows, col_widths, style, cell_style,
+                 chunk_size=50, total=None, progress=None):
+        super().__init__()
+        self.headers = headers
+        self.rows = iter(rows)
+        self.col_widths = col_widths
+        self.style = style
+        self.cell_style = cell_style
+        self.chunk_size = chunk_size
+        self.total = total
+        self.progress = progress
+        self.done = 0
+        # Filas tomadas del iterador que todavía no se han dibujado.
+        self._carry = []
+        self._advance()
+
+    def _advance(self):
+        """
+        Lee una fila por adelantado: así, al entregar el último bloque ya se
+        sabe que no hay más y wrap() devuelve (0, 0) sin pedir otro marco.
+        """
+        self._next = next(self.rows, _END)
+        self._exhausted = self._next is _END
+
+    def _take(self):
+        chunk = self._carry
+        self._carry = []
+        while len(chunk) < self.chunk_size and not self._exhausted:
+            chunk.append(self._next)
+            self._advance()
+        return chunk
+
+    def cell(self, text, width):
+        """Texto simple si cabe en una línea; Paragraph (que se ajusta) si no."""
+        text = "" if text is None else str(text)
+        if stringWidth(text, self.cell_style.fontName, self.cell_style.fontSize) <= width - CELL_PADDING:
+            return text
+        return Paragraph(text, self.cell_style)
+
+    def _table(self, chunk):
+        data = [self.headers]
+        for row in chunk:
+            data.append([self.cell(text, width) for text, width in zip(row, self.col_widths)])
+        table = Table(data, colWidths=self.col_widths, repeatRows=1)
+        table.setStyle(self.style)
+        return table
+
+    def wrap(self, availWidth, availHeight):
+        if self._exhausted and not self._carry:
+            return 0, 0
+        # Siempre "no cabe", para que ReportLab llame a split() con el espacio disponible.
+        return availWidth, availHeight + 1
+
+    def draw(self):
+        pass
+
+    def split(self, availWidth, availHeight):
+        chunk = self._take()
+        if not chunk:
+            return []
+        table = self._table(chunk)
+        _, height = table.wrap(availWidth, availHeight)
+        if height <= availHeight:
+            parts = [table]
+        else:
+            parts = table.split(availWidth, availHeight)
+            if not parts:
+                # No cabe ni una fila en lo que queda de la página: se intenta en la siguiente.
+                self._carry = chunk
+                return []
+        if hasattr(self, "_postponed"):
+            del self._postponed
+        self.done += len(chunk)
+        if self.progress is not None:
+            self.progress(self.done, self.total, "filas")
+        if self._exhausted and not self._carry:
+            return parts
+        return parts + [self]
@@ -0,0 +1,330 @@
+"""
+Tablas virtuales para Tk.
+
+Un ttk.Treeview con miles de filas tarda en abrirse y consume memoria de Tk
+por cada fila insertada. VirtualTable solo crea los renglones que caben en
+pantalla más un margen ('overscan') arriba y abajo. Los desplazamientos
+cortos solo mueven el Treeview dentro de ese margen; al salir de él se
+reemplazan los valores con los de las filas que ahora están a la vista. Los
+datos se piden a dos funciones: una que da el número de filas y otra que da
+los valores de la fila i.
+
+DefectIndex mantiene índices por columna sobre los defectos para ordenar y
+filtrar la tabla de defectos sin recorrer ni volver a insertar todas las filas.
+"""
+import bisect
+from datetime import datetime
+from tkinter import ttk
+
+# Columnas de la tabla de registros: (id, encabezado, ancho).
+LOG_COLUMNS = [
+    ("fecha", "Fecha", 100),
+    ("inicio", "Inicio", 100),
+    ("fin", "Fin", 100),
+    ("interrupcion", "Interrupción (min)", 120),
+    ("tiempo", "A Tiempo (min)", 120),
+    ("actividad", "Actividad", 120),
+    ("comentarios", "Comentarios", 300),
+]
+
+
+def log_row(log):
+    """Valores de un registro de actividad tal como se muestran en la tabla."""
+    return (
+        log.get("fecha_inicio", ""),
+        log.get("hora_inicio", ""),
+        log.get("hora_fin", ""),
+        log.get("tiempo_en_pausa_min", ""),
+        log.get("tiempo_no_pausado_min", ""),
+        log.get("actividad", ""),
+        log.get("comentarios") or ""
+    )
+
+
+# Columnas de la tabla de defectos: (id, encabezado, ancho).
+DEFECT_COLUMNS = [
+    ("fecha", "Fecha", 200),
+    ("numero", "Número", 200),
+    ("tipo", "Tipo", 200),
+    ("encontrado", "Encontrado", 200),
+    ("removido", "Removido", 200),
+    ("tiempo", "Tiempo de compostura (min)", 200),
+    ("arreglado", "Arreglado", 200),
+    ("descripcion", "Descripción", 200),
+]
+
+# Clave de cada columna de la tabla de defectos dentro de un registro de defecto.
+DEFECT_FIELDS = {
+    "fecha": "fecha",
+    "numero": "numero",
+    "tipo": "tipo",
+    "encontrado": "encontrado",
+    "removido": "removido",
+    "tiempo": "tiempo_compostura",
+    "arreglado": "defecto_arreglado",
+    "descripcion": "descripcion",
+}
+
+# Columnas de la tabla de defectos que se pueden filtrar por valor.
+DEFECT_FILTER_COLUMNS = ("tipo", "encontrado", "removido", "arreglado", "fecha")
+
+
+def defect_row(defect):
+    """Valores de un defecto tal como se muestran en la tabla."""
+    return tuple(defect.get(DEFECT_FIELDS[column_id], "") for column_id, _, _ in DEFECT_COLUMNS)
+
+
+def _number_key(value):
+    try:
+        return (0, float(value), "")
+    except (TypeError, ValueError):
+        return (1, 0.0, str(value))
+
+
+def _date_key(value):
+    try:
+        return (0, datetime.strptime(value, "%d/%m/%Y"), "")
+    except (TypeError, ValueError):
+        return (1, datetime.min, str(value))
+
+
+def _text_key(value):
+    return str(value).casefold()
+
+
+# Cómo se comparan los valores de cada columna al ordenar.
+DEFECT_SORT_KEYS = {
+    "fecha": _date_key,
+    "numero": _number_key,
+    "tipo": _number_key,
+    "tiempo": _number_key,
+}
+
+
+class DefectIndex:
+    """
+    Índices secundarios sobre una lista de defectos.
+
+    - Para cada columna filtrable, un diccionario valor -> posiciones (en orden).
+    - Para cada columna por la que se haya ordenado, la lista de posiciones
+      ordenada por esa columna; se calcula la primera vez y después se
+      mantiene con inserciones por bisección.
+    """
+
+    def __init__(self, defects):
+        self.defects = defects
+        self.size = 0
+        self.postings = {column_id: {} for column_id in DEFECT_FILTER_COLUMNS}
+        self.orders = {}
+        self.catch_up()
+
+    def value(self, position, column_id):
+        return self.defects[position].get(DEFECT_FIELDS[column_id], "")
+
+    def sort_key(self, column_id):
+        key = DEFECT_SORT_KEYS.get(column_id, _text_key)
+        return lambda position: (key(self.value(position, column_id)), position)
+
+    def catch_up(self):
+        """Agrega al índice los defectos nuevos al final de la lista."""
+        for position in range(self.size, len(self.defects)):
+            for column_id, postings in self.postings.items():
+                postings.setdefault(str(self.value(position, column_id)), []).append(position)
+            for column_id, order in self.orders.items():
+                bisect.insort(order, position, key=self.sort_key(column_id))
+        self.size = len(self.defects)
+
+    def values(self, column_id):
+        """Valores distintos de una columna filtrable, ordenados."""
+        key = DEFECT_SORT_KEYS.get(column_id, _text_key)
+        return sorted(self.postings[column_id], key=key)
+
+    def order(self, column_id):
+        if column_id not in self.orders:
+            self.orders[column_id] = sorted(range(self.size), key=self.sort_key(column_id))
+        return self.orders[column_id]
+
+    def query(self, filters=None, sort_column=None, descending=False):
+        """
+        Devuelve las posiciones de los defectos que cumplen los filtros
+        ({columna: valor}) en el orden pedido.
+        """
+        filters = {column_id: value for column_id, value in (filters or {}).items() if value is not None}
+        if filters:
+            # Se intersecta empezando por la lista más corta.
+            lists = sorted((self.postings[column_id].get(value, []) for column_id, value in filters.items()), key=len)
+            matches = set(lists[0])
+            for positions in lists[1:]:
+                matches.intersection_update(positions)
+                if not matches:
+                    break
+        else:
+            matches = None
+
+        if sort_column is None:
+            result = sorted(matches) if matches is not None else list(range(self.size))
+        elif matches is None:
+            result = list(self.order(sort_column))
+        elif len(matches) * 8 < self.size:
+            # Pocos resultados: es más barato ordenarlos que recorrer el orden completo.
+            result = sorted(matches, key=self.sort_key(sort_column))
+        else:
+            result = [position for position in self.order(sort_column) if position in matches]
+        if descending:
+            result.reverse()
+        return result
+
+
+class VirtualTable(ttk.Frame):
+    """Treeview que solo materializa las filas visibles y un margen alrededor."""
+
+    # Alto aproximado del encabezado del Treeview, en pixeles.
+    header_height = 25
+    # Filas que se materializan de más arriba y abajo de las visibles.
+    overscan = 20
+
+    def __init__(self, master, columns, row_count, row_values, anchor="center", horizontal=False):
+        super().__init__(master)
+        self.row_count = row_count
+        self.row_values = row_values
+        self.first = 0
+        self.visible = 1
+        self.total = 0
+        # Filas [inicio, fin) que tienen renglón en el Treeview; None: hay que volver a leerlas.
+        self.window = None
+
+        self.tree = ttk.Treeview(self, columns=[c[0] for c in columns], show="headings", selectmode="browse")
+        for column_id, heading, width in columns:
+            self.tree.heading(column_id, text=heading)
+            self.tree.column(column_id, width=width, anchor=anchor)
+
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        if horizontal:
+            h_scrollbar = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+            self.tree.configure(xscrollcommand=h_scrollbar.set)
+            h_scrollbar.pack(side="bottom", fill="x")
+        self.tree.configure(yscrollcommand=self.on_tree_scrolled)
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        style = ttk.Style(self)
+        self.row_height = int(style.lookup("Treeview", "rowheight") or 20)
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll_by(3))
+        self.tree.bind("<Prior>", lambda event: self.scroll_by(-self.visible))
+        self.tree.bind("<Next>", lambda event: self.scroll_by(self.visible))
+        self.tree.bind("<Home>", lambda event: self.scroll_to(0))
+        self.tree.bind("<End>", lambda event: self.scroll_to(self.row_count()))
+
+    def on_resize(self, event):
+        visible = max(1, (event.height - self.header_height) // self.row_height)
+        if visible != self.visible:
+            # Si se estaban viendo las últimas filas, se siguen viendo al crecer la ventana.
+            anchored = self.total > 0 and self.first + self.visible >= self.total
+            self.visible = visible
+            if anchored:
+                self.first = max(0, self.total - self.visible)
+            self.show()
+
+    def on_mousewheel(self, event):
+        return self.scroll_by(-1 if event.delta > 0 else 1)
+
+    def on_tree_scrolled(self, top, bottom):
+        """
+        El Treeview se desplazó (por ejemplo, con las flechas del teclado):
+        se actualiza la primera fila visible y, si se acerca al borde del
+        margen, se materializa una ventana nueva.
+        """
+        if self.window is None or not self.tree.winfo_ismapped():
+            return
+        start, end = self.window
+        if end <= start:
+            return
+        first = start + round(float(top) * (end - start))
+        if first != self.first:
+            self.first = first
+            self.show()
+        else:
+            self.update_scrollbar()
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.row_count()))
+        elif unit == "pages":
+            self.scroll_by(int(amount) * self.visible)
+        else:
+            self.scroll_by(int(amount))
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.first + rows)
+        return "break"
+
+    def scroll_to(self, first):
+        last_first = max(0, self.row_count() - self.visible)
+        first = min(max(0, first), last_first)
+        if first != self.first:
+            self.first = first
+            self.show()
+        return "break"
+
+    def render(self):
+        """Vuelve a leer las filas (los datos cambiaron) y muestra las de [first, first + visible)."""
+        self.window = None
+        self.show()
+
+    def show(self):
+        """
+        Muestra las filas [first, first + visible). Si ya tienen renglón (están
+        dentro del margen), solo se desplaza el Treeview; si no, se
+        materializan de nuevo reutilizando los renglones existentes.
+        """
+        total = self.total = self.row_count()
+        self.first = max(0, min(self.first, total - self.visible))
+        if self.needs_window(total):
+            start = max(0, self.first - self.overscan)
+            end = min(total, self.first + self.visible + self.overscan)
+            items = self.tree.get_children()
+            for iid in items[end - start:]:
+                self.tree.delete(iid)
+            for offset in range(end - start):
+                values = self.row_values(start + offset)
+                if offset < len(items):
+                    self.tree.item(items[offset], values=values)
+                else:
+                    self.tree.insert("", "end", values=values)
+            self.window = (start, end)
+        start, end = self.window
+        if end > start:
+            self.tree.yview_moveto((self.first - start) / (end - start))
+        self.update_scrollbar()
+
+    def needs_window(self, total):
+        """True si las filas visibles no tienen renglón o están cerca del borde del margen."""
+        if self.window is None:
+            return True
+        start, end = self.window
+        wanted_end = min(total, self.first + self.visible)
+        if self.first < start or wanted_end > end:
+            return True
+        # A menos de medio margen de un borde que no es el principio o el fin de los datos.
+        margin = self.overscan // 2
+        return (start > 0 and self.first - start < margin) or (end < total and end - wanted_end < margin)
+
+    def update_scrollbar(self):
+        total = self.total
+        if total:
+            self.scrollbar.set(self.first / total, min(total, self.first + self.visible) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def rows_added(self):
+        """
+        Avisa que hay filas nuevas al final. Si la vista estaba al final,
+        se desplaza para mostrarlas; si no, solo se actualiza la barra.
+        """
+        if self.first + self.visible >= self.total:
+            self.first = max(0, self.row_count() - self.visible)
+        self.render()
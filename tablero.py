@@ -0,0 +1,128 @@
+"""
+Tablero de estadísticas que se actualiza sin volver a dibujarse.
+
+"Visualizar Gráficos" abría cada vez una figura nueva con plt.show() y
+reconstruía barras, etiquetas y pastel desde cero. Dashboard es una sola
+ventana con un canvas de matplotlib incrustado: las barras, sus etiquetas,
+el título y las rebanadas del pastel se crean una vez y después solo se les
+cambian la altura, el texto o los ángulos, y se pide un draw_idle().
+
+La actividad en curso se muestra como una barra naranja encima de la de su
+actividad; su altura se actualiza como mucho cada 'live_interval' segundos.
+
+matplotlib se importa al abrir el tablero, no al importar este módulo.
+"""
+import math
+import time
+import tkinter as tk
+
+from perfilado import timed
+from proyecto import ACTIVITIES_LIST, build_time_summary
+from reportes import bar_chart_title, make_autopct
+
+PIE_LABELS = ["Tiempo Efectivo", "Tiempo en Pausa"]
+
+
+class Dashboard(tk.Toplevel):
+
+    # Segundos mínimos entre dos actualizaciones de la barra en curso.
+    live_interval = 5
+
+    def __init__(self, master):
+        super().__init__(master)
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        self.title("Estadísticas")
+        self.figure = Figure(figsize=(14, 5))
+        self.ax_bar, self.ax_pie = self.figure.subplots(1, 2)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+
+        positions = range(len(ACTIVITIES_LIST))
+        zeros = [0] * len(ACTIVITIES_LIST)
+        self.bars = self.ax_bar.bar(positions, zeros, color='blue')
+        self.live_bars = self.ax_bar.bar(positions, zeros, color='orange')
+        self.bar_labels = [self.ax_bar.text(i, 0, "", ha='center', va='bottom', fontsize=10) for i in positions]
+        self.ax_bar.set_xlabel('Actividad')
+        self.ax_bar.set_ylabel('Minutos')
+        self.ax_bar.set_xticks(list(positions))
+        self.ax_bar.set_xticklabels(ACTIVITIES_LIST, rotation=45)
+
+        # Rebanadas con valores provisionales; show() les pone sus ángulos.
+        self.wedges, self.pie_labels, self.pie_values = self.ax_pie.pie(
+            [1, 1], labels=PIE_LABELS, autopct=lambda pct: "", colors=['green', 'red'], startangle=90)
+        self.pie_empty = self.ax_pie.text(0, 0, "Sin datos", ha='center', va='center', fontsize=12, visible=False)
+        self.ax_pie.set_title("Comparación: Tiempo Efectivo vs en Pausa")
+
+        self.summary = None
+        self.live = None
+        self._live_drawn = None
+        self.figure.tight_layout()
+
+    def show(self, summary, live=None):
+        """
+        Muestra el resumen de tiempos (como Proyecto.time_summary) y, si se
+        da, la actividad en curso como (actividad, minutos efectivos).
+        """
+        self.summary = summary
+        self.live = live
+        self._render()
+
+    def set_live(self, live):
+        """Actualiza la actividad en curso; se redibuja como mucho cada live_interval segundos."""
+        self.live = live
+        now = time.monotonic()
+        if self.summary is None or (self._live_drawn is not None and now - self._live_drawn < self.live_interval):
+            return
+        self._render()
+
+    @timed()
+    def _render(self):
+        self._live_drawn = time.monotonic()
+        live_activity, live_minutes = self.live or (None, 0)
+        base = dict(zip(self.summary['activities'], self.summary['minutes']))
+        totals = dict(base)
+        if live_activity is not None:
+            totals[live_activity] = totals.get(live_activity, 0) + live_minutes
+        shown = build_time_summary(totals, self.summary['paused_minutes'])
+
+        for i, activity in enumerate(ACTIVITIES_LIST):
+            height = base.get(activity, 0)
+            extra = live_minutes if activity == live_activity else 0
+            self.bars[i].set_height(height)
+            self.live_bars[i].set_y(height)
+            self.live_bars[i].set_height(extra)
+            self.bar_labels[i].set_position((i, height + extra))
+            self.bar_labels[i].set_text(f"{int(shown['minutes'][i])} min\n{shown['percentages'][i]}")
+        self.ax_bar.set_ylim(0, max(max(shown['minutes']) * 1.25, 1))
+        title = bar_chart_title(shown)
+        if live_activity is not None:
+            title += f"\nEn curso: {live_activity} ({int(live_minutes)} min)"
+        self.ax_bar.set_title(title)
+
+        self._update_pie([shown['total_minutes'], shown['paused_minutes']])
+        self.canvas.draw_idle()
+
+    def _update_pie(self, values):
+        """Cambia los ángulos de las rebanadas y mueve sus textos (como ax.pie con startangle=90)."""
+        total = sum(values)
+        self.pie_empty.set_visible(total <= 0)
+        autopct = make_autopct(values)
+        angle = 90.0
+        for wedge, label, value_text, value in zip(self.wedges, self.pie_labels, self.pie_values, values):
+            visible = total > 0 and value > 0
+            for artist in (wedge, label, value_text):
+                artist.set_visible(visible)
+            if not visible:
+                continue
+            span = 360.0 * value / total
+            wedge.set_theta1(angle)
+            wedge.set_theta2(angle + span)
+            middle = math.radians(angle + span / 2)
+            x, y = math.cos(middle), math.sin(middle)
+            label.set_position((1.1 * x, 1.1 * y))
+            label.set_horizontalalignment('left' if x >= 0 else 'right')
+            value_text.set_position((0.6 * x, 0.6 * y))
+            value_text.set_text(autopct(100.0 * value / total))
+            angle += span
@@ -0,0 +1,100 @@
+"""
+Pruebas de almacenamiento.py: la carga diferida de proyectos JSON y la
+elección del almacenamiento de un proyecto.
+
+    python -m unittest discover tests
+"""
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from almacenamiento import JsonStorage, open_storage  # noqa: E402
+from basedatos import SqliteStorage  # noqa: E402
+from proyecto import Proyecto  # noqa: E402
+
+
+class LazyLoadTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.filename = os.path.join(directory.name, "proyecto.txt")
+
+    def write(self, data):
+        with open(self.filename, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+
+    def read(self):
+        with open(self.filename, "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def test_header_keys_after_lists_survive_save(self):
+        self.write({"project_name": "x", "activity_logs": [], "defects": [], "student_name": "Ana",
+                    "activities": {"Codificar": 5}, "total_paused_minutes": 7})
+        proyecto = Proyecto(self.filename)
+        proyecto.reload(lazy=True)
+        self.assertEqual(proyecto.student_name, "Ana")
+        proyecto.save()
+        data = self.read()
+        self.assertEqual(data["student_name"], "Ana")
+        self.assertEqual(data["activities"], {"Codificar": 5})
+        self.assertEqual(data["total_paused_minutes"], 7)
+
+    def test_unknown_keys_after_lists_survive_save(self):
+        self.write({"project_name": "x", "start_date": "01/01/2025", "student_name": "Ana",
+                    "instructor_name": "", "activities": {}, "total_paused_minutes": 0,
+                    "activity_logs": [], "defects": [], "notas": "guardar"})
+        proyecto = Proyecto(self.filename)
+        proyecto.reload(lazy=True)
+        proyecto.save()
+        self.assertEqual(self.read()["notas"], "guardar")
+
+
+class OpenStorageTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.filename = os.path.join(self.directory, "proyecto.txt")
+        with open(self.filename, "w", encoding="utf-8") as file:
+            json.dump({"project_name": "x", "activity_logs": [], "defects": []}, file)
+        environ = os.environ.pop("REGISTRO_ALMACENAMIENTO", None)
+        if environ is not None:
+            self.addCleanup(os.environ.__setitem__, "REGISTRO_ALMACENAMIENTO", environ)
+
+    def migrate(self, filename):
+        os.environ["REGISTRO_ALMACENAMIENTO"] = "sqlite"
+        try:
+            Proyecto.load(filename).close()
+        finally:
+            del os.environ["REGISTRO_ALMACENAMIENTO"]
+
+    def test_unrelated_sibling_db_is_ignored(self):
+        connection = sqlite3.connect(os.path.join(self.directory, "proyecto.db"))
+        connection.execute("CREATE TABLE otra (valor)")
+        connection.commit()
+        connection.close()
+        self.assertIsInstance(open_storage(self.filename), JsonStorage)
+        self.assertNotIsInstance(open_storage(self.filename), SqliteStorage)
+
+    def test_migrated_sibling_db_is_used(self):
+        self.migrate(self.filename)
+        self.assertIsInstance(open_storage(self.filename), SqliteStorage)
+
+    def test_db_migrated_from_another_project_is_ignored(self):
+        other = os.path.join(self.directory, "otro.txt")
+        shutil.copy(self.filename, other)
+        self.migrate(other)
+        shutil.copy(os.path.join(self.directory, "otro.db"), os.path.join(self.directory, "proyecto.db"))
+        self.assertNotIsInstance(open_storage(self.filename), SqliteStorage)
+
+
+if __name__ == "__main__":
+    unittest.main()